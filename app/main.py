@@ -53,7 +53,7 @@ async def shutdown_event():
     logger.info("Shutting down services...")
     try:
         redis_manager = get_redis_queue_manager()
-        await redis_manager.disconnect()
+        await redis_manager.disconnect(close_pool=True)
         logger.info("Redis queue manager disconnected successfully")
     except Exception as e:
         logger.error(f"Error during shutdown: {e}")
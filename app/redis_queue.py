@@ -2,16 +2,150 @@
 Redis-based queue manager for OCR processing
 Replaces in-memory task storage with persistent Redis storage
 """
+import asyncio
+import os
 import uuid
 import json
+import time
+import weakref
 from redis import asyncio as aioredis
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional, List, Dict, Tuple
 import logging
 from .models import TaskStatus, TaskStatusResponse, OCRResult
 
 logger = logging.getLogger(__name__)
 
+# Stored status string -> TaskStatus, a plain dict lookup instead of the
+# enum constructor for every task read
+_STATUS_BY_VALUE: Dict[str, TaskStatus] = {status.value: status for status in TaskStatus}
+
+# Connection pools shared by all managers, per event loop and Redis URL.
+# redis.asyncio connections belong to the loop that opened them, so a pool
+# is never handed to another loop; a loop's pools go away with the loop.
+_connection_pools: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+# Seconds a pooled connection may sit idle before it is PINGed on reuse, so
+# connections dropped by Redis or the network are replaced transparently
+HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+
+
+def get_connection_pool(
+    redis_url: str,
+    max_connections: int = 50,
+    pubsub: bool = False
+) -> aioredis.ConnectionPool:
+    """
+    Get the running event loop's shared pool for a Redis URL, creating it on
+    first use
+
+    Connections use TCP keepalive and are health-checked after sitting idle
+    for HEALTH_CHECK_INTERVAL seconds. Must be called from a running event
+    loop.
+
+    Args:
+        redis_url: Redis connection URL
+        max_connections: Maximum connections in a newly created pool; a
+            different value for an existing pool is logged and ignored
+        pubsub: Get the separate pool for pub/sub subscriptions, which hold
+            a connection for as long as they stay subscribed and so must not
+            use up the pool that serves commands
+
+    Returns:
+        Connection pool for the URL
+    """
+    pools = _connection_pools.setdefault(asyncio.get_running_loop(), {})
+    pool = pools.get((redis_url, pubsub))
+    if pool is not None and pool.max_connections != max_connections:
+        logger.warning(
+            f"Connection pool for {redis_url} already allows {pool.max_connections} "
+            f"connections; ignoring max_connections={max_connections}"
+        )
+    if pool is None:
+        pool = aioredis.ConnectionPool.from_url(
+            redis_url,
+            max_connections=max_connections,
+            encoding="utf-8",
+            decode_responses=True,
+            socket_keepalive=True,
+            health_check_interval=HEALTH_CHECK_INTERVAL
+        )
+        pools[(redis_url, pubsub)] = pool
+    return pool
+
+
+# Atomically re-queue a task if it is below its retry limit, otherwise
+# move it to the dead letter queue.
+# KEYS: task hash, high/normal/low priority queues, dead letter queue,
+# in-flight (processing) index
+# ARGV: max_retries, queued status, updated_at timestamp, task_id
+# Returns {code, retry_count}: 1 = re-queued, 0 = task not found,
+# -1 = task is in the dead letter queue, -2 = max retries exceeded
+# (task moved to the dead letter queue)
+RETRY_TASK_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {0, 0}
+end
+local fields = redis.call('HMGET', KEYS[1], 'in_dead_letter_queue', 'retry_count', 'priority')
+if fields[1] == 'true' then
+    return {-1, 0}
+end
+local retry_count = tonumber(fields[2] or '0')
+redis.call('ZREM', KEYS[6], ARGV[4])
+if retry_count >= tonumber(ARGV[1]) then
+    redis.call('LPUSH', KEYS[5], ARGV[4])
+    redis.call('HSET', KEYS[1],
+        'in_dead_letter_queue', 'true',
+        'dead_letter_reason', 'Max retries exceeded (' .. retry_count .. '/' .. ARGV[1] .. ')',
+        'moved_to_dlq_at', ARGV[3])
+    return {-2, retry_count}
+end
+retry_count = redis.call('HINCRBY', KEYS[1], 'retry_count', 1)
+local queue = KEYS[3]
+if fields[3] == 'high' then
+    queue = KEYS[2]
+elseif fields[3] == 'low' then
+    queue = KEYS[4]
+end
+redis.call('HSET', KEYS[1],
+    'status', ARGV[2],
+    'progress', '0',
+    'message', 'Retrying (attempt ' .. retry_count .. ')',
+    'updated_at', ARGV[3])
+redis.call('LPUSH', queue, ARGV[4])
+return {1, retry_count}
+"""
+
+
+# Filter candidate task hashes down to the tasks still in PROCESSING status,
+# server-side in one round trip. Missing and non-hash keys are skipped.
+# Candidates that are not processing are dropped from the in-flight index,
+# but only while their entry is still older than the cutoff: a task that was
+# re-dequeued since the index was read has a fresh entry, which is kept.
+# KEYS: in-flight (processing) index, candidate task hashes
+# ARGV: processing status, cutoff (exclusive), candidate task IDs in KEYS order
+# Returns the task IDs of the tasks still processing
+FIND_STUCK_TASKS_SCRIPT = """
+local result = {}
+local cutoff = tonumber(ARGV[2])
+for i = 2, #KEYS do
+    local fields = {}
+    if redis.call('TYPE', KEYS[i]).ok == 'hash' then
+        fields = redis.call('HMGET', KEYS[i], 'task_id', 'status')
+    end
+    if fields[1] and fields[2] == ARGV[1] then
+        table.insert(result, fields[1])
+    else
+        local task_id = ARGV[i + 1]
+        local started_at = redis.call('ZSCORE', KEYS[1], task_id)
+        if started_at and tonumber(started_at) < cutoff then
+            redis.call('ZREM', KEYS[1], task_id)
+        end
+    end
+end
+return result
+"""
+
 
 class RedisQueueManager:
     """
@@ -32,6 +166,12 @@ class RedisQueueManager:
     BATCH_PREFIX = "batch:"
     QUEUE_PREFIX = "queue:"
 
+    # Pub/sub channel prefix for live task progress (progress:<task_id>);
+    # events are JSON text, as the shared pool decodes every response
+    PROGRESS_CHANNEL_PREFIX = "progress:"
+    # Seconds subscribe_progress() waits for an event before yielding None
+    PROGRESS_IDLE_TIMEOUT = 15.0
+
     # Queue names by priority
     QUEUE_HIGH = "queue:high"
     QUEUE_NORMAL = "queue:normal"
@@ -40,39 +180,84 @@ class RedisQueueManager:
     # Dead letter queue for permanently failed tasks
     DEAD_LETTER_QUEUE = "queue:dead_letter"
 
+    # Sorted set of completed task IDs scored by completed_at_ms
+    COMPLETED_INDEX = "tasks:completed_at"
+    PROCESSING_INDEX = "tasks:processing"
+
     # Configuration
     RESULT_TTL = 86400  # Results expire after 24 hours
+    # Task hashes expire after 7 days without a state change
+    TASK_TTL = int(os.getenv("TASK_TTL_SECONDS", "604800"))
     MAX_RETRIES = 3  # Maximum retry attempts for failed tasks
-
-    def __init__(self, redis_url: str):
+    # Keys per SCAN call when iterating task keys; larger batches mean fewer
+    # round trips on big keyspaces
+    SCAN_COUNT = int(os.getenv("REDIS_SCAN_COUNT", "1000"))
+    # Progress subscriptions (status streams) open at once; each holds a
+    # connection from the separate pub/sub pool while subscribed
+    MAX_PROGRESS_SUBSCRIPTIONS = int(os.getenv("REDIS_MAX_PROGRESS_SUBSCRIPTIONS", "20"))
+
+    def __init__(self, redis_url: str, max_connections: int = 50):
         """
         Initialize Redis queue manager
 
         Args:
             redis_url: Redis connection URL (e.g., redis://localhost:6379/0)
+            max_connections: Maximum connections in the shared pool for this URL
         """
         self.redis_url = redis_url
+        self.max_connections = max_connections
         self.redis: Optional[aioredis.Redis] = None
+        # Client for progress subscriptions, on its own capped pool
+        self._pubsub_redis: Optional[aioredis.Redis] = None
+        self._retry_script = None
+        self._find_stuck_script = None
 
     async def connect(self):
         """Establish connection to Redis"""
         try:
-            self.redis = await aioredis.from_url(
-                self.redis_url,
-                encoding="utf-8",
-                decode_responses=False
+            # Reuse the process-wide pool so managers don't reconnect
+            self.redis = aioredis.Redis(
+                connection_pool=get_connection_pool(self.redis_url, self.max_connections)
             )
             # Test connection
             await self.redis.ping()
+            self._pubsub_redis = aioredis.Redis(
+                connection_pool=get_connection_pool(
+                    self.redis_url, self.MAX_PROGRESS_SUBSCRIPTIONS, pubsub=True
+                )
+            )
+            # Register Lua scripts. Calls use EVALSHA with the locally computed
+            # SHA and fall back to SCRIPT LOAD on NOSCRIPT (e.g. after a Redis
+            # restart); preloading here keeps that extra round trip off the
+            # first call.
+            self._retry_script = self.redis.register_script(RETRY_TASK_SCRIPT)
+            self._find_stuck_script = self.redis.register_script(FIND_STUCK_TASKS_SCRIPT)
+            for script in (RETRY_TASK_SCRIPT, FIND_STUCK_TASKS_SCRIPT):
+                await self.redis.script_load(script)
             logger.info(f"Connected to Redis: {self.redis_url}")
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
             raise
 
-    async def disconnect(self):
-        """Close Redis connection"""
+    async def disconnect(self, close_pool: bool = False):
+        """
+        Close Redis connection
+
+        The shared connection pools stay open for other managers unless
+        close_pool is set.
+
+        Args:
+            close_pool: Also disconnect and discard the shared pools (command
+                and pub/sub) for this URL
+        """
         if self.redis:
             await self.redis.close()
+            if close_pool:
+                pools = _connection_pools.get(asyncio.get_running_loop(), {})
+                for pubsub in (False, True):
+                    pool = pools.pop((self.redis_url, pubsub), None)
+                    if pool is not None:
+                        await pool.disconnect()
             logger.info("Disconnected from Redis")
 
     async def create_task(
@@ -96,7 +281,7 @@ class RedisQueueManager:
         Returns:
             task_id: Unique task identifier
         """
-        task_id = str(uuid.uuid4())
+        task_id = uuid.uuid4().hex
         now = datetime.utcnow()
 
         task_data = {
@@ -119,16 +304,18 @@ class RedisQueueManager:
         if document_id:
             task_data["document_id"] = document_id
 
-        # Store task data in Redis hash
+        # Store task data in Redis hash and add task to appropriate priority
+        # queue together, so a worker can't pop the ID before the hash exists
         task_key = f"{self.TASK_PREFIX}{task_id}"
-        await self.redis.hset(
-            task_key,
-            mapping={k: str(v) for k, v in task_data.items()}
-        )
-
-        # Add task to appropriate priority queue
         queue_name = self._get_queue_name(priority)
-        await self.redis.lpush(queue_name, task_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                task_key,
+                mapping={k: str(v) for k, v in task_data.items()}
+            )
+            pipe.expire(task_key, self.TASK_TTL)
+            pipe.lpush(queue_name, task_id)
+            await pipe.execute()
 
         logger.info(f"Created task {task_id} with priority {priority}")
         return task_id
@@ -154,35 +341,71 @@ class RedisQueueManager:
         Returns:
             task_id or None if no tasks available
         """
-        task_id_bytes = None
+        task_id = None
 
         if priority:
             # Check specific priority queue
             queue_name = self._get_queue_name(priority)
-            task_id_bytes = await self.redis.rpop(queue_name)
+            task_id = await self.redis.rpop(queue_name)
         else:
             # Check all queues in priority order
             for queue in [self.QUEUE_HIGH, self.QUEUE_NORMAL, self.QUEUE_LOW]:
-                task_id_bytes = await self.redis.rpop(queue)
-                if task_id_bytes:
+                task_id = await self.redis.rpop(queue)
+                if task_id:
                     break
 
-        if not task_id_bytes:
+        if not task_id:
             return None
 
-        task_id = task_id_bytes.decode()
+        await self._mark_task_started(task_id)
+        return task_id
 
-        # Set task_started_at timestamp when task is dequeued
-        task_key = f"{self.TASK_PREFIX}{task_id}"
-        await self.redis.hset(
-            task_key,
-            "task_started_at",
-            datetime.utcnow().isoformat()
+    async def blocking_dequeue(self, timeout: float = 5) -> Optional[str]:
+        """
+        Block until a task is available and dequeue it
+
+        Uses BRPOP across all priority queues, so idle workers wait
+        server-side instead of polling. BRPOP checks keys in the order
+        given, preserving high -> normal -> low priority.
+
+        Args:
+            timeout: Seconds to wait for a task (0 blocks indefinitely)
+
+        Returns:
+            task_id or None if the timeout expired
+        """
+        result = await self.redis.brpop(
+            [self.QUEUE_HIGH, self.QUEUE_NORMAL, self.QUEUE_LOW],
+            timeout=timeout
         )
 
-        logger.info(f"Dequeued task {task_id} and set task_started_at timestamp")
+        if not result:
+            return None
+
+        _, task_id = result
+        await self._mark_task_started(task_id)
         return task_id
 
+    async def _mark_task_started(self, task_id: str):
+        """
+        Set task_started_at (epoch seconds) when task is dequeued
+
+        The task is also added to the in-flight index, scored by the same
+        timestamp, which is what stuck-task detection reads.
+
+        Args:
+            task_id: Task identifier
+        """
+        task_key = f"{self.TASK_PREFIX}{task_id}"
+        started_at = int(time.time())
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(task_key, "task_started_at", started_at)
+            pipe.expire(task_key, self.TASK_TTL)
+            pipe.zadd(self.PROCESSING_INDEX, {task_id: started_at})
+            await pipe.execute()
+
+        logger.info(f"Dequeued task {task_id} and set task_started_at timestamp")
+
     async def get_task_status(self, task_id: str) -> Optional[TaskStatusResponse]:
         """
         Get status of a task
@@ -199,21 +422,14 @@ class RedisQueueManager:
         if not task_data:
             return None
 
-        # Decode bytes and convert to proper types
-        decoded_data = {}
-        for key, value in task_data.items():
-            key_str = key.decode() if isinstance(key, bytes) else key
-            value_str = value.decode() if isinstance(value, bytes) else value
-            decoded_data[key_str] = value_str
-
         # Convert string values to proper types
         return TaskStatusResponse(
-            task_id=decoded_data["task_id"],
-            status=TaskStatus(decoded_data["status"]),
-            progress=int(decoded_data["progress"]),
-            message=decoded_data["message"],
-            created_at=decoded_data.get("created_at"),
-            updated_at=decoded_data.get("updated_at"),
+            task_id=task_data["task_id"],
+            status=_STATUS_BY_VALUE.get(task_data["status"]) or TaskStatus(task_data["status"]),
+            progress=int(task_data["progress"]),
+            message=task_data["message"],
+            created_at=task_data.get("created_at"),
+            updated_at=task_data.get("updated_at"),
         )
 
     async def update_task_status(
@@ -226,6 +442,8 @@ class RedisQueueManager:
         """
         Update task status
 
+        The change is also published on the task's progress channel.
+
         Args:
             task_id: Task identifier
             status: New status
@@ -254,10 +472,18 @@ class RedisQueueManager:
         if message is not None:
             update_data["message"] = message
 
-        await self.redis.hset(
-            task_key,
-            mapping={k: str(v) for k, v in update_data.items()}
-        )
+        # Every state change pushes the task's expiry back
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                task_key,
+                mapping={k: str(v) for k, v in update_data.items()}
+            )
+            pipe.expire(task_key, self.TASK_TTL)
+            if update_data["status"] != TaskStatus.PROCESSING.value:
+                # Task is no longer in flight; drop it from the in-flight index
+                pipe.zrem(self.PROCESSING_INDEX, task_id)
+            self._queue_progress_event(pipe, task_id, update_data)
+            await pipe.execute()
 
         logger.info(f"Updated task {task_id}: {status}")
         return True
@@ -287,18 +513,36 @@ class RedisQueueManager:
             result_json
         )
 
-        # Update task status and set completed_at timestamp
+        # Update task status and set completed_at timestamp. completed_at_ms
+        # (epoch milliseconds) is what cleanup compares against; the ISO
+        # string is kept for readability and older readers.
+        # The task is also indexed by completion time for cleanup and
+        # leaves the in-flight index.
+        now = datetime.utcnow()
+        completed_at_ms = self._to_epoch_ms(now)
         task_key = f"{self.TASK_PREFIX}{task_id}"
-        await self.redis.hset(
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(
             task_key,
             mapping={
                 "status": TaskStatus.COMPLETED,
                 "progress": "100",
                 "message": "Processing completed",
-                "completed_at": datetime.utcnow().isoformat(),
-                "updated_at": datetime.utcnow().isoformat()
+                "completed_at": now.isoformat(),
+                "completed_at_ms": completed_at_ms,
+                "updated_at": now.isoformat()
             }
         )
+        pipe.expire(task_key, self.TASK_TTL)
+        pipe.zadd(self.COMPLETED_INDEX, {task_id: completed_at_ms})
+        pipe.zrem(self.PROCESSING_INDEX, task_id)
+        self._queue_progress_event(pipe, task_id, {
+            "status": TaskStatus.COMPLETED.value,
+            "progress": 100,
+            "message": "Processing completed",
+            "updated_at": now.isoformat(),
+        })
+        await pipe.execute()
 
         logger.info(f"Stored result for task {task_id}")
         return True
@@ -319,12 +563,8 @@ class RedisQueueManager:
         if not result_json:
             return None
 
-        # Decode and parse JSON
-        if isinstance(result_json, bytes):
-            result_json = result_json.decode()
-
-        result_data = json.loads(result_json)
-        return OCRResult(**result_data)
+        # Validate straight from JSON (single pass, no intermediate dict)
+        return OCRResult.model_validate_json(result_json)
 
     async def get_result_ttl(self, task_id: str) -> int:
         """
@@ -349,22 +589,25 @@ class RedisQueueManager:
         Returns:
             batch_id: Unique batch identifier
         """
-        batch_id = str(uuid.uuid4())
+        batch_id = uuid.uuid4().hex
         now = datetime.utcnow()
 
         batch_data = {
             "batch_id": batch_id,
-            "task_ids": json.dumps(task_ids),
             "total": len(task_ids),
             "created_at": now.isoformat(),
         }
 
-        # Store batch data
+        # Store batch data and its task IDs (as a set) atomically
         batch_key = f"{self.BATCH_PREFIX}{batch_id}"
-        await self.redis.hset(
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(
             batch_key,
             mapping={k: str(v) for k, v in batch_data.items()}
         )
+        if task_ids:
+            pipe.sadd(f"{batch_key}:tasks", *task_ids)
+        await pipe.execute()
 
         logger.info(f"Created batch {batch_id} with {len(task_ids)} tasks")
         return batch_id
@@ -385,15 +628,12 @@ class RedisQueueManager:
         if not batch_data:
             return None
 
-        # Decode batch data
-        decoded_data = {}
-        for key, value in batch_data.items():
-            key_str = key.decode() if isinstance(key, bytes) else key
-            value_str = value.decode() if isinstance(value, bytes) else value
-            decoded_data[key_str] = value_str
+        # Get task IDs from the batch set
+        task_ids = await self.redis.smembers(f"{batch_key}:tasks")
 
-        # Parse task IDs
-        task_ids = json.loads(decoded_data["task_ids"])
+        # Legacy batches store task IDs as a JSON list in the hash
+        if not task_ids and "task_ids" in batch_data:
+            task_ids = json.loads(batch_data["task_ids"])
 
         # Count tasks by status
         completed = 0
@@ -414,8 +654,8 @@ class RedisQueueManager:
                     queued += 1
 
         return {
-            "batch_id": decoded_data["batch_id"],
-            "total": int(decoded_data["total"]),
+            "batch_id": batch_data["batch_id"],
+            "total": int(batch_data["total"]),
             "completed": completed,
             "failed": failed,
             "processing": processing,
@@ -479,51 +719,110 @@ class RedisQueueManager:
         if max_retries is None:
             max_retries = self.MAX_RETRIES
 
-        task_key = f"{self.TASK_PREFIX}{task_id}"
-        task_data = await self.redis.hgetall(task_key)
+        # Check, increment and re-queue (or dead-letter) in a single atomic
+        # round trip, so concurrent retries can't double-push to the DLQ
+        code, retry_count = await self._retry_script(
+            keys=self._retry_script_keys(task_id),
+            args=self._retry_script_args(task_id, max_retries)
+        )
+        return self._handle_retry_result(task_id, code, retry_count, max_retries)
 
-        if not task_data:
-            return False
+    async def retry_tasks_bulk(
+        self,
+        task_ids: List[str],
+        max_retries: Optional[int] = None
+    ) -> List[bool]:
+        """
+        Retry several tasks in one round trip
+
+        Queues one retry script call per task on a pipeline, so recovering
+        a batch of stuck tasks costs a single round trip instead of one
+        per task. Each task is still retried atomically.
+
+        Args:
+            task_ids: Task identifiers
+            max_retries: Maximum retry attempts (defaults to MAX_RETRIES)
+
+        Returns:
+            Per task, True if it was re-queued, False otherwise
+        """
+        if not task_ids:
+            return []
 
-        # Decode retry count
-        retry_count_bytes = task_data.get(b"retry_count", b"0")
-        retry_count = int(retry_count_bytes.decode() if isinstance(retry_count_bytes, bytes) else retry_count_bytes)
+        if max_retries is None:
+            max_retries = self.MAX_RETRIES
 
-        # Check if task is already in dead letter queue
-        in_dlq_bytes = task_data.get(b"in_dead_letter_queue", b"false")
-        in_dlq = (in_dlq_bytes.decode() if isinstance(in_dlq_bytes, bytes) else in_dlq_bytes) == "true"
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for task_id in task_ids:
+                await self._retry_script(
+                    keys=self._retry_script_keys(task_id),
+                    args=self._retry_script_args(task_id, max_retries),
+                    client=pipe
+                )
+            results = await pipe.execute()
+
+        return [
+            self._handle_retry_result(task_id, code, retry_count, max_retries)
+            for task_id, (code, retry_count) in zip(task_ids, results)
+        ]
+
+    def _retry_script_keys(self, task_id: str) -> List[str]:
+        """Keys for RETRY_TASK_SCRIPT"""
+        return [
+            f"{self.TASK_PREFIX}{task_id}",
+            self.QUEUE_HIGH,
+            self.QUEUE_NORMAL,
+            self.QUEUE_LOW,
+            self.DEAD_LETTER_QUEUE,
+            self.PROCESSING_INDEX,
+        ]
+
+    def _retry_script_args(self, task_id: str, max_retries: int) -> List:
+        """Arguments for RETRY_TASK_SCRIPT"""
+        return [
+            max_retries,
+            TaskStatus.QUEUED.value,
+            datetime.utcnow().isoformat(),
+            task_id,
+        ]
 
-        if in_dlq:
+    def _handle_retry_result(
+        self,
+        task_id: str,
+        code,
+        retry_count,
+        max_retries: int
+    ) -> bool:
+        """
+        Log the outcome of a retry script call
+
+        Args:
+            task_id: Task identifier
+            code: Script result code
+            retry_count: Retry count returned by the script
+            max_retries: Maximum retry attempts passed to the script
+
+        Returns:
+            True if task was re-queued
+        """
+        code = int(code)
+        retry_count = int(retry_count)
+
+        if code == 0:
+            return False
+
+        if code == -1:
             logger.warning(f"Task {task_id} is in dead letter queue and cannot be retried")
             return False
 
-        if retry_count >= max_retries:
-            logger.warning(f"Task {task_id} exceeded max retries ({max_retries})")
-            # Move to dead letter queue
-            await self.move_to_dead_letter_queue(
-                task_id,
+        if code == -2:
+            logger.warning(
+                f"Moved task {task_id} to dead letter queue: "
                 f"Max retries exceeded ({retry_count}/{max_retries})"
             )
             return False
 
-        # Increment retry count
-        await self.redis.hset(task_key, "retry_count", retry_count + 1)
-
-        # Reset status and re-queue
-        await self.update_task_status(
-            task_id,
-            TaskStatus.QUEUED,
-            progress=0,
-            message=f"Retrying (attempt {retry_count + 1})"
-        )
-
-        # Get priority and re-queue
-        priority_bytes = task_data.get(b"priority", b"normal")
-        priority = priority_bytes.decode() if isinstance(priority_bytes, bytes) else priority_bytes
-        queue_name = self._get_queue_name(priority)
-        await self.redis.lpush(queue_name, task_id)
-
-        logger.info(f"Retrying task {task_id} (attempt {retry_count + 1})")
+        logger.info(f"Retrying task {task_id} (attempt {retry_count})")
         return True
 
     async def cleanup_task(self, task_id: str) -> bool:
@@ -534,13 +833,20 @@ class RedisQueueManager:
             task_id: Task identifier
 
         Returns:
-            True if cleaned up successfully
+            True if the task or its result existed and was removed
         """
         task_key = f"{self.TASK_PREFIX}{task_id}"
         result_key = f"{self.RESULT_PREFIX}{task_id}"
 
-        # Delete both task and result
-        await self.redis.delete(task_key, result_key)
+        # Unlink both task and result (memory is reclaimed in the background)
+        # and drop the task from the in-flight index in the same round trip
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.unlink(task_key, result_key)
+            pipe.zrem(self.PROCESSING_INDEX, task_id)
+            unlinked, _ = await pipe.execute()
+
+        if not unlinked:
+            return False
 
         logger.info(f"Cleaned up task {task_id}")
         return True
@@ -584,10 +890,44 @@ class RedisQueueManager:
         task_key = f"{self.TASK_PREFIX}{task_id}"
         file_path = await self.redis.hget(task_key, "file_path")
 
-        if file_path:
-            return file_path.decode() if isinstance(file_path, bytes) else file_path
+        return file_path or None
+
+    @staticmethod
+    def _to_epoch_ms(value: datetime) -> int:
+        """
+        Convert a datetime to epoch milliseconds
+
+        Args:
+            value: Datetime; naive values are treated as UTC
+
+        Returns:
+            Milliseconds since the Unix epoch
+        """
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+
+    @staticmethod
+    def _parse_started_at(value: str) -> float:
+        """
+        Parse a task_started_at field into epoch seconds
+
+        New tasks store an integer epoch; tasks dequeued before that change
+        store a naive UTC ISO-8601 string, which is still accepted.
+
+        Args:
+            value: Raw task_started_at field value
+
+        Returns:
+            Epoch seconds
 
-        return None
+        Raises:
+            ValueError: If the value is neither an integer nor an ISO timestamp
+        """
+        try:
+            return int(value)
+        except ValueError:
+            return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp()
 
     async def find_stuck_tasks(
         self,
@@ -605,50 +945,35 @@ class RedisQueueManager:
             List of task IDs that are stuck
         """
         stuck_task_ids = []
-        timeout_threshold = datetime.utcnow() - timedelta(minutes=timeout_minutes)
-
-        # Get all task keys from Redis
-        task_keys = await self.redis.keys(f"{self.TASK_PREFIX}*")
-
-        for task_key in task_keys:
-            # Get task data
-            task_data = await self.redis.hgetall(task_key)
-
-            if not task_data:
-                continue
-
-            # Decode task data
-            decoded_data = {}
-            for key, value in task_data.items():
-                key_str = key.decode() if isinstance(key, bytes) else key
-                value_str = value.decode() if isinstance(value, bytes) else value
-                decoded_data[key_str] = value_str
-
-            # Only check tasks in PROCESSING status
-            if decoded_data.get("status") != TaskStatus.PROCESSING.value:
-                continue
-
-            # Skip tasks without task_started_at (legacy tasks)
-            if "task_started_at" not in decoded_data:
-                continue
+        timeout_threshold = int(time.time()) - timeout_minutes * 60
+        processing = TaskStatus.PROCESSING.value
+
+        # Tasks started before the cutoff, from the in-flight index rather
+        # than a walk over every task key
+        candidate_ids = await self.redis.zrangebyscore(
+            self.PROCESSING_INDEX,
+            "-inf",
+            f"({timeout_threshold}"
+        )
 
-            # Parse task_started_at timestamp
-            try:
-                task_started_at = datetime.fromisoformat(decoded_data["task_started_at"])
-            except (ValueError, KeyError):
-                # Skip if timestamp is invalid
-                logger.warning(f"Invalid task_started_at timestamp for task {decoded_data.get('task_id')}")
-                continue
+        # Confirm candidates are still processing in Redis, one script call
+        # per chunk instead of a round trip per task. The script also drops
+        # index entries for tasks that finished or were deleted without
+        # leaving the index.
+        for start in range(0, len(candidate_ids), self.SCAN_COUNT):
+            chunk = candidate_ids[start:start + self.SCAN_COUNT]
+            task_keys = [f"{self.TASK_PREFIX}{task_id}" for task_id in chunk]
+            still_processing = await self._find_stuck_script(
+                keys=[self.PROCESSING_INDEX, *task_keys],
+                args=[processing, timeout_threshold, *chunk]
+            )
 
-            # Check if task exceeded timeout
-            if task_started_at < timeout_threshold:
-                task_id = decoded_data.get("task_id")
-                if task_id:
-                    stuck_task_ids.append(task_id)
-                    logger.warning(
-                        f"Found stuck task {task_id}: started at {task_started_at}, "
-                        f"exceeded {timeout_minutes} minute timeout"
-                    )
+            for task_id in still_processing:
+                stuck_task_ids.append(task_id)
+                logger.warning(
+                    f"Found stuck task {task_id}: "
+                    f"exceeded {timeout_minutes} minute timeout"
+                )
 
         stuck_count = len(stuck_task_ids)
         logger.info(f"Found {stuck_count} stuck tasks with {timeout_minutes} minute timeout")
@@ -695,6 +1020,8 @@ class RedisQueueManager:
                 "moved_to_dlq_at": datetime.utcnow().isoformat(),
             }
         )
+        await self.redis.expire(task_key, self.TASK_TTL)
+        await self.redis.zrem(self.PROCESSING_INDEX, task_id)
 
         logger.warning(f"Moved task {task_id} to dead letter queue: {reason}")
         return True
@@ -709,16 +1036,44 @@ class RedisQueueManager:
         Returns:
             List of task IDs in DLQ
         """
-        task_ids_bytes = await self.redis.lrange(self.DEAD_LETTER_QUEUE, 0, limit - 1)
-
-        task_ids = []
-        for task_id_bytes in task_ids_bytes:
-            task_id = task_id_bytes.decode() if isinstance(task_id_bytes, bytes) else task_id_bytes
-            task_ids.append(task_id)
+        task_ids = await self.redis.lrange(self.DEAD_LETTER_QUEUE, 0, limit - 1)
 
         logger.info(f"Retrieved {len(task_ids)} tasks from dead letter queue")
         return task_ids
 
+    async def get_dead_letter_queue_tasks_with_details(
+        self,
+        offset: int = 0,
+        limit: int = 100
+    ) -> List[Dict]:
+        """
+        Get a page of dead letter queue tasks together with their task data
+
+        Task hashes are fetched in a single pipelined round trip rather than
+        one HGETALL per task.
+
+        Args:
+            offset: Index of the first DLQ entry to return (default: 0)
+            limit: Maximum number of tasks to return (default: 100)
+
+        Returns:
+            List of task data dictionaries, each including task_id
+        """
+        task_ids = await self.redis.lrange(
+            self.DEAD_LETTER_QUEUE, offset, offset + limit - 1
+        )
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for task_id in task_ids:
+                pipe.hgetall(f"{self.TASK_PREFIX}{task_id}")
+            details = await pipe.execute()
+
+        # Keep entries whose task hash has already been cleaned up
+        return [
+            {**task_data, "task_id": task_id}
+            for task_id, task_data in zip(task_ids, details)
+        ]
+
     async def get_dead_letter_queue_count(self) -> int:
         """
         Get count of tasks in the dead letter queue
@@ -729,6 +1084,30 @@ class RedisQueueManager:
         count = await self.redis.llen(self.DEAD_LETTER_QUEUE)
         return count
 
+    async def get_dead_letter_page(
+        self,
+        offset: int = 0,
+        limit: int = 100
+    ) -> Tuple[List[str], int]:
+        """
+        Get a page of dead letter queue task IDs and the total DLQ size
+
+        Both are read in one pipelined round trip, for paginated listings.
+
+        Args:
+            offset: Index of the first DLQ entry to return (default: 0)
+            limit: Maximum number of task IDs to return (default: 100)
+
+        Returns:
+            Tuple of (task IDs on this page, total tasks in DLQ)
+        """
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.lrange(self.DEAD_LETTER_QUEUE, offset, offset + limit - 1)
+            pipe.llen(self.DEAD_LETTER_QUEUE)
+            task_ids, total = await pipe.execute()
+
+        return task_ids, total
+
     async def remove_from_dead_letter_queue(self, task_id: str) -> bool:
         """
         Remove a task from the dead letter queue
@@ -761,55 +1140,156 @@ class RedisQueueManager:
         """
         Find completed tasks that were finished before the cutoff date
 
+        Reads the completion-time index, so the cost scales with the number
+        of matching tasks rather than the whole keyspace.
+
         Args:
             cutoff_date: Tasks completed before this date will be returned
 
         Returns:
             List of task IDs for old completed tasks
         """
-        old_task_ids = []
+        old_task_ids = await self.redis.zrangebyscore(
+            self.COMPLETED_INDEX,
+            "-inf",
+            f"({self._to_epoch_ms(cutoff_date)}"
+        )
 
-        # Get all task keys from Redis
-        task_keys = await self.redis.keys(f"{self.TASK_PREFIX}*")
+        logger.info(f"Found {len(old_task_ids)} completed tasks older than {cutoff_date}")
+        return old_task_ids
 
-        for task_key in task_keys:
-            # Get task data
-            task_data = await self.redis.hgetall(task_key)
+    async def backfill_completed_index(self) -> int:
+        """
+        Add completed tasks missing from the completion-time index
 
-            if not task_data:
-                continue
+        One-off migration for tasks completed before the index existed. Scans
+        task keys with SCAN.
 
-            # Decode task data
-            decoded_data = {}
-            for key, value in task_data.items():
-                key_str = key.decode() if isinstance(key, bytes) else key
-                value_str = value.decode() if isinstance(value, bytes) else value
-                decoded_data[key_str] = value_str
+        Returns:
+            Number of completed tasks indexed
+        """
+        indexed_count = 0
 
-            # Only check tasks with COMPLETED status
-            if decoded_data.get("status") != TaskStatus.COMPLETED.value:
+        async for task_keys in self._scan_task_key_chunks():
+            completed = await self._get_completion_times(task_keys)
+            if completed:
+                await self.redis.zadd(self.COMPLETED_INDEX, completed)
+            indexed_count += len(completed)
+
+        logger.info(f"Indexed {indexed_count} completed tasks by completion time")
+        return indexed_count
+
+    async def backfill_processing_index(self) -> int:
+        """
+        Add processing tasks missing from the in-flight index
+
+        One-off migration for tasks dequeued before the index existed, so
+        stuck-task detection still finds them. Scans task keys with SCAN.
+
+        Returns:
+            Number of processing tasks indexed
+        """
+        indexed_count = 0
+        processing = TaskStatus.PROCESSING.value
+
+        async for task_keys in self._scan_task_key_chunks():
+            started = {}
+
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for task_key in task_keys:
+                    pipe.hmget(task_key, "task_id", "status", "task_started_at")
+                results = await pipe.execute(raise_on_error=False)
+
+            for fields in results:
+                # Skip non-hash keys (WRONGTYPE errors)
+                if isinstance(fields, Exception):
+                    continue
+
+                task_id, status, started_at = fields
+                if status != processing or not task_id or started_at is None:
+                    continue
+
+                try:
+                    started[task_id] = int(self._parse_started_at(started_at))
+                except ValueError:
+                    logger.warning(f"Invalid task_started_at timestamp for task {task_id}")
+
+            if started:
+                await self.redis.zadd(self.PROCESSING_INDEX, started)
+            indexed_count += len(started)
+
+        logger.info(f"Indexed {indexed_count} processing tasks by start time")
+        return indexed_count
+
+    async def _scan_task_key_chunks(self):
+        """
+        Iterate over task keys in chunks of up to SCAN_COUNT keys
+
+        Uses SCAN rather than KEYS, which blocks Redis for the whole
+        keyspace walk.
+
+        Yields:
+            Lists of task keys
+        """
+        buffer = []
+
+        async for task_key in self.redis.scan_iter(
+            match=f"{self.TASK_PREFIX}*",
+            count=self.SCAN_COUNT
+        ):
+            buffer.append(task_key)
+            if len(buffer) >= self.SCAN_COUNT:
+                yield buffer
+                buffer = []
+
+        if buffer:
+            yield buffer
+
+    async def _get_completion_times(self, task_keys: List[str]) -> Dict[str, int]:
+        """
+        Get completion times of the completed tasks among task keys
+
+        Args:
+            task_keys: Task keys to check
+
+        Returns:
+            Dictionary mapping task ID to completed_at in epoch milliseconds
+        """
+        completion_times = {}
+        completed = TaskStatus.COMPLETED.value
+
+        # Fetch only the fields needed for filtering, in a single round
+        # trip. Non-hash keys under the task prefix (e.g. progress history
+        # lists) come back as WRONGTYPE errors and are skipped below.
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for task_key in task_keys:
+                pipe.hmget(task_key, "task_id", "status", "completed_at_ms", "completed_at")
+            results = await pipe.execute(raise_on_error=False)
+
+        for fields in results:
+            if isinstance(fields, Exception):
                 continue
 
-            # Skip tasks without completed_at timestamp
-            if "completed_at" not in decoded_data:
+            task_id, status, completed_at_ms, completed_at_str = fields
+
+            # Only check tasks with COMPLETED status
+            if status != completed or not task_id:
                 continue
 
-            # Parse completed_at timestamp
+            # Parse completed_at, preferring the numeric field; tasks
+            # completed before it was introduced only have the ISO string
             try:
-                completed_at = datetime.fromisoformat(decoded_data["completed_at"])
-            except (ValueError, KeyError):
+                if completed_at_ms:
+                    completion_times[task_id] = int(completed_at_ms)
+                elif completed_at_str:
+                    completion_times[task_id] = self._to_epoch_ms(
+                        datetime.fromisoformat(completed_at_str)
+                    )
+            except ValueError:
                 # Skip if timestamp is invalid
-                logger.warning(f"Invalid completed_at timestamp for task {decoded_data.get('task_id')}")
-                continue
-
-            # Check if task was completed before cutoff date
-            if completed_at < cutoff_date:
-                task_id = decoded_data.get("task_id")
-                if task_id:
-                    old_task_ids.append(task_id)
+                logger.warning(f"Invalid completed_at timestamp for task {task_id}")
 
-        logger.info(f"Found {len(old_task_ids)} completed tasks older than {cutoff_date}")
-        return old_task_ids
+        return completion_times
 
     async def delete_task(self, task_id: str) -> bool:
         """
@@ -825,48 +1305,106 @@ class RedisQueueManager:
         result_key = f"{self.RESULT_PREFIX}{task_id}"
         progress_history_key = f"{self.TASK_PREFIX}{task_id}:progress_history"
 
-        # Check if task exists
-        task_exists = await self.redis.exists(task_key)
-
-        if not task_exists:
+        # Delete task, result, and progress history (Task 5.8) and drop the
+        # task from both indexes in one round trip. UNLINK frees large result
+        # blobs in a background thread instead of blocking Redis, and its
+        # count tells whether the task existed.
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.unlink(task_key, result_key, progress_history_key)
+            pipe.zrem(self.COMPLETED_INDEX, task_id)
+            pipe.zrem(self.PROCESSING_INDEX, task_id)
+            unlinked, _, _ = await pipe.execute()
+
+        if not unlinked:
             logger.warning(f"Cannot delete non-existent task {task_id}")
             return False
 
-        # Delete task, result, and progress history (Task 5.8)
-        await self.redis.delete(task_key, result_key, progress_history_key)
-
         logger.info(f"Deleted task {task_id} and its progress history from Redis")
         return True
 
     async def cleanup_old_completed_tasks(
         self,
         cutoff_date: datetime,
-        dry_run: bool = False
+        dry_run: bool = False,
+        chunk_size: int = 500,
+        concurrency: int = 4
     ) -> int:
         """
         Clean up completed tasks older than cutoff date
 
+        Old tasks are read from the completion-time index and deleted in
+        chunks, with up to `concurrency` chunk pipelines in flight, so no
+        single pipeline grows with the number of tasks. Deleted tasks are
+        also removed from the index, so frequent scheduled runs only visit
+        tasks that passed the cutoff since the previous run.
+
         Args:
             cutoff_date: Tasks completed before this date will be deleted
             dry_run: If True, only report what would be deleted without deleting
+            chunk_size: Tasks deleted per pipeline (default: 500)
+            concurrency: Maximum chunks processed at once (default: 4)
 
         Returns:
             Number of tasks deleted (or that would be deleted in dry run)
         """
-        old_task_ids = await self.find_old_completed_tasks(cutoff_date)
-
         if dry_run:
-            logger.info(f"DRY RUN: Would delete {len(old_task_ids)} old completed tasks")
-            return len(old_task_ids)
+            count = await self.redis.zcount(
+                self.COMPLETED_INDEX,
+                "-inf",
+                f"({self._to_epoch_ms(cutoff_date)}"
+            )
+            logger.info(f"DRY RUN: Would delete {count} old completed tasks")
+            return count
+
+        old_task_ids = await self.find_old_completed_tasks(cutoff_date)
 
         deleted_count = 0
-        for task_id in old_task_ids:
-            if await self.delete_task(task_id):
-                deleted_count += 1
+        # Bounded working set: start a new chunk only as one finishes, so
+        # finished tasks are collected as we go instead of all at the end
+        pending = set()
+
+        for start in range(0, len(old_task_ids), chunk_size):
+            if len(pending) >= concurrency:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                deleted_count += sum(task.result() for task in done)
+            pending.add(asyncio.create_task(
+                self._delete_task_chunk(old_task_ids[start:start + chunk_size])
+            ))
+
+        if pending:
+            done, _ = await asyncio.wait(pending)
+            deleted_count += sum(task.result() for task in done)
 
         logger.info(f"Cleaned up {deleted_count} old completed tasks")
         return deleted_count
 
+    async def _delete_task_chunk(self, task_ids: List[str]) -> int:
+        """
+        Delete a chunk of tasks and drop them from the completion-time index
+
+        Args:
+            task_ids: Task identifiers
+
+        Returns:
+            Number of tasks that still existed and were deleted
+        """
+        # Unlink task, result and progress history for every task in one
+        # round trip. UNLINK is idempotent, so no EXISTS check is needed: a
+        # non-zero count means the task still existed.
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for task_id in task_ids:
+                pipe.unlink(
+                    f"{self.TASK_PREFIX}{task_id}",
+                    f"{self.RESULT_PREFIX}{task_id}",
+                    f"{self.TASK_PREFIX}{task_id}:progress_history"
+                )
+            pipe.zrem(self.COMPLETED_INDEX, *task_ids)
+            *counts, _ = await pipe.execute()
+
+        return sum(1 for count in counts if count > 0)
+
     async def record_task_completion(
         self,
         task_id: str,
@@ -903,7 +1441,7 @@ class RedisQueueManager:
             task_key = f"{self.TASK_PREFIX}{task_id}"
             retry_count = await self.redis.hget(task_key, "retry_count")
             if retry_count:
-                retry_count = int(retry_count.decode() if isinstance(retry_count, bytes) else retry_count)
+                retry_count = int(retry_count)
                 # Track retry distribution
                 await self.redis.incr(f"metrics:tasks:retry_{retry_count}")
 
@@ -930,32 +1468,27 @@ class RedisQueueManager:
         if not task_data:
             return None
 
-        # Decode task data
-        decoded_data = {}
-        for key, value in task_data.items():
-            key_str = key.decode() if isinstance(key, bytes) else key
-            value_str = value.decode() if isinstance(value, bytes) else value
-            decoded_data[key_str] = value_str
-
         metrics = {
             "task_id": task_id,
-            "status": decoded_data.get("status"),
-            "retry_count": int(decoded_data.get("retry_count", 0))
+            "status": task_data.get("status"),
+            "retry_count": int(task_data.get("retry_count", 0))
         }
 
         # Calculate duration if task has started
-        if "task_started_at" in decoded_data:
+        if "task_started_at" in task_data:
             try:
-                started_at = datetime.fromisoformat(decoded_data["task_started_at"])
+                started_at = self._parse_started_at(task_data["task_started_at"])
 
-                if decoded_data.get("status") == TaskStatus.COMPLETED.value and "completed_at" in decoded_data:
-                    completed_at = datetime.fromisoformat(decoded_data["completed_at"])
-                    duration = (completed_at - started_at).total_seconds()
+                if task_data.get("status") == TaskStatus.COMPLETED.value and "completed_at" in task_data:
+                    completed_at = datetime.fromisoformat(
+                        task_data["completed_at"]
+                    ).replace(tzinfo=timezone.utc).timestamp()
+                    duration = completed_at - started_at
                     metrics["duration_seconds"] = duration
                     metrics["processing_time"] = duration
                 else:
                     # Task still processing, calculate current duration
-                    current_duration = (datetime.utcnow() - started_at).total_seconds()
+                    current_duration = time.time() - started_at
                     metrics["current_duration_seconds"] = current_duration
 
             except (ValueError, KeyError):
@@ -980,11 +1513,11 @@ class RedisQueueManager:
             failed_tasks = await self.redis.get("metrics:tasks:failed")
             total_duration = await self.redis.get("metrics:tasks:total_duration")
 
-            # Decode bytes to integers
-            total_tasks = int(total_tasks.decode() if total_tasks else 0)
-            completed_tasks = int(completed_tasks.decode() if completed_tasks else 0)
-            failed_tasks = int(failed_tasks.decode() if failed_tasks else 0)
-            total_duration = float(total_duration.decode() if total_duration else 0)
+            # Convert to numbers
+            total_tasks = int(total_tasks or 0)
+            completed_tasks = int(completed_tasks or 0)
+            failed_tasks = int(failed_tasks or 0)
+            total_duration = float(total_duration or 0)
 
             metrics = {
                 "total_tasks": total_tasks,
@@ -1003,7 +1536,7 @@ class RedisQueueManager:
             for i in range(1, 4):  # Count tasks with 1-3 retries
                 retry_count = await self.redis.get(f"metrics:tasks:retry_{i}")
                 if retry_count:
-                    retried_tasks += int(retry_count.decode() if isinstance(retry_count, bytes) else retry_count)
+                    retried_tasks += int(retry_count)
 
             if total_tasks > 0:
                 metrics["retry_rate"] = (retried_tasks / total_tasks) * 100
@@ -1027,9 +1560,7 @@ class RedisQueueManager:
             for i in range(0, 4):
                 retry_count = await self.redis.get(f"metrics:tasks:retry_{i}")
                 if retry_count:
-                    retry_distribution[f"retry_{i}"] = int(
-                        retry_count.decode() if isinstance(retry_count, bytes) else retry_count
-                    )
+                    retry_distribution[f"retry_{i}"] = int(retry_count)
             metrics["retry_distribution"] = retry_distribution
 
             logger.debug(f"Retrieved aggregate metrics: {metrics}")
@@ -1089,25 +1620,9 @@ class RedisQueueManager:
             True if recorded successfully
         """
         try:
-            history_key = f"{self.TASK_PREFIX}{task_id}:progress_history"
-
-            # Create history entry
-            history_entry = {
-                "timestamp": datetime.utcnow().isoformat() + 'Z',
-                "progress": progress,
-                "operation": operation or "",
-                "status": status
-            }
-
-            # Serialize to JSON
-            import json
-            entry_json = json.dumps(history_entry)
-
-            # Add to history list (LPUSH adds to head of list - newest first)
-            await self.redis.lpush(history_key, entry_json)
-
-            # Trim to keep only last 10 entries (0-9 index)
-            await self.redis.ltrim(history_key, 0, 9)
+            async with self.redis.pipeline(transaction=False) as pipe:
+                self._queue_progress_history(pipe, task_id, progress, operation, status)
+                await pipe.execute()
 
             logger.debug(f"Recorded progress update for task {task_id}: {progress}% - {operation}")
             return True
@@ -1116,6 +1631,141 @@ class RedisQueueManager:
             logger.warning(f"Failed to record progress history for task {task_id}: {e}")
             return False
 
+    async def update_task_progress(
+        self,
+        task_id: str,
+        progress: int,
+        message: str,
+        record_history: bool = False,
+        operation: Optional[str] = None
+    ):
+        """
+        Update progress of an in-flight task in a single round trip
+
+        Unlike update_task_status(), there is no existence check: the
+        caller is processing the task, so the status, progress and message
+        fields, the expiry and optionally a progress history entry are all
+        written in one non-transactional pipeline. The update is also
+        published on the task's progress channel, so subscribers see every
+        step rather than only the webhook milestones.
+
+        Args:
+            task_id: Task identifier
+            progress: Progress percentage (0-100)
+            message: Status message
+            record_history: Also record the update in the progress history
+            operation: Operation recorded in the progress history (defaults
+                to message)
+        """
+        task_key = f"{self.TASK_PREFIX}{task_id}"
+        updated_at = datetime.utcnow().isoformat()
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(
+                task_key,
+                mapping={
+                    "status": TaskStatus.PROCESSING.value,
+                    "updated_at": updated_at,
+                    "progress": str(progress),
+                    "message": message,
+                }
+            )
+            pipe.expire(task_key, self.TASK_TTL)
+            self._queue_progress_event(pipe, task_id, {
+                "status": TaskStatus.PROCESSING.value,
+                "progress": progress,
+                "message": message,
+                "updated_at": updated_at,
+            })
+            if record_history:
+                self._queue_progress_history(
+                    pipe, task_id, progress, operation or message, TaskStatus.PROCESSING.value
+                )
+            await pipe.execute()
+
+        logger.debug(f"Updated task {task_id} progress: {progress}% - {message}")
+
+    def _queue_progress_event(self, pipe, task_id: str, fields: Dict):
+        """Queue publishing a task's changed fields on its progress channel"""
+        pipe.publish(
+            f"{self.PROGRESS_CHANNEL_PREFIX}{task_id}",
+            json.dumps({"task_id": task_id, **fields})
+        )
+
+    async def subscribe_progress(
+        self,
+        task_id: str,
+        timeout: float = PROGRESS_IDLE_TIMEOUT
+    ) -> AsyncIterator[Optional[Dict]]:
+        """
+        Stream the events published on a task's progress channel
+
+        Yields None once subscribed and again whenever timeout seconds pass
+        without an event. Events published before the subscription are not
+        replayed, so callers read the task status on each None to catch up,
+        e.g. on a task that finished in the meantime. The subscription holds
+        a connection from the pub/sub pool, capped at
+        MAX_PROGRESS_SUBSCRIPTIONS, until the iterator is closed.
+
+        Args:
+            task_id: Task identifier
+            timeout: Seconds to wait for an event before yielding None
+
+        Yields:
+            Event dict (task_id, status, updated_at and the changed fields),
+            or None
+
+        Raises:
+            redis.exceptions.ConnectionError: On the first iteration, if
+                MAX_PROGRESS_SUBSCRIPTIONS subscriptions are already open
+                or Redis can't be reached
+        """
+        pubsub = self._pubsub_redis.pubsub()
+        try:
+            await pubsub.subscribe(f"{self.PROGRESS_CHANNEL_PREFIX}{task_id}")
+            # Wait for the confirmation, so no later event can be missed
+            await pubsub.get_message(timeout=timeout)
+            yield None
+
+            while True:
+                message = await pubsub.get_message(timeout=timeout)
+                if message is None:
+                    yield None
+                elif message["type"] == "message":
+                    yield json.loads(message["data"])
+        finally:
+            try:
+                await pubsub.unsubscribe()
+            finally:
+                await pubsub.aclose()
+
+    def _queue_progress_history(
+        self,
+        pipe,
+        task_id: str,
+        progress: int,
+        operation: Optional[str],
+        status: str
+    ):
+        """Queue the commands appending a progress history entry on a pipeline"""
+        history_key = f"{self.TASK_PREFIX}{task_id}:progress_history"
+
+        history_entry = {
+            "timestamp": datetime.utcnow().isoformat() + 'Z',
+            "progress": progress,
+            "operation": operation or "",
+            "status": status
+        }
+
+        # Add to history list (LPUSH adds to head of list - newest first)
+        pipe.lpush(history_key, json.dumps(history_entry))
+
+        # Trim to keep only last 10 entries (0-9 index)
+        pipe.ltrim(history_key, 0, 9)
+
+        # Expire along with the task hash
+        pipe.expire(history_key, self.TASK_TTL)
+
     async def get_progress_history(
         self,
         task_id: str,
@@ -1141,12 +1791,8 @@ class RedisQueueManager:
                 return []
 
             # Parse JSON entries
-            import json
-            history = []
-            for entry_bytes in history_entries:
-                entry_json = entry_bytes.decode('utf-8')
-                entry = json.loads(entry_json)
-                history.append(entry)
+            loads = json.loads
+            history = [loads(entry_json) for entry_json in history_entries]
 
             logger.debug(f"Retrieved {len(history)} progress history entries for task {task_id}")
             return history
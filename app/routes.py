@@ -2,7 +2,10 @@
 API routes for OCR service
 """
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
-from typing import Optional, List
+from fastapi.responses import StreamingResponse
+from redis.exceptions import ConnectionError as RedisConnectionError
+from typing import AsyncIterator, Optional, List
+import json
 import os
 from datetime import datetime
 
@@ -224,6 +227,85 @@ async def get_task_status(task_id: str):
     return task_status
 
 
+# Statuses after which a task's progress stream ends
+FINISHED_STATUSES = (TaskStatus.COMPLETED.value, TaskStatus.FAILED.value)
+
+
+@router.get(
+    "/status/{task_id}/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/event-stream": {}}, "description": "Server-sent status events"},
+        404: {"model": ErrorResponse, "description": "Task not found"},
+        503: {"model": ErrorResponse, "description": "Too many open status streams"}
+    }
+)
+async def stream_task_status(task_id: str):
+    """
+    Stream status and progress changes of a task as server-sent events
+
+    Sends the current status first, then every change published by the
+    worker, and ends once the task has completed or failed. At most
+    REDIS_MAX_PROGRESS_SUBSCRIPTIONS streams can be open at once.
+
+    - **task_id**: Unique task identifier
+    """
+    redis_manager = get_redis_queue_manager()
+
+    if not await redis_manager.task_exists(task_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": "Task not found", "detail": f"No task found with ID: {task_id}"}
+        )
+
+    # Subscribe before responding, so a full subscription pool is a 503
+    events = redis_manager.subscribe_progress(task_id)
+    try:
+        await anext(events)
+    except RedisConnectionError as e:
+        await events.aclose()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"error": "Status stream unavailable", "detail": str(e)},
+            headers={"Retry-After": "30"}
+        )
+
+    return StreamingResponse(
+        _task_status_events(redis_manager, task_id, events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+async def _task_status_events(
+    redis_manager,
+    task_id: str,
+    events: AsyncIterator[Optional[dict]]
+) -> AsyncIterator[str]:
+    """Format a task's subscribed progress channel as server-sent events until it finishes"""
+    try:
+        # The subscription was just confirmed: start from the stored status
+        event = None
+        while True:
+            if event is None:
+                # Subscribed, or idle: send the stored status, which also
+                # catches a finish the channel didn't deliver
+                task_status = await redis_manager.get_task_status(task_id)
+                if task_status is None:
+                    return
+                yield f"data: {task_status.model_dump_json()}\n\n"
+                current_status = task_status.status.value
+            else:
+                yield f"data: {json.dumps(event)}\n\n"
+                current_status = event["status"]
+
+            if current_status in FINISHED_STATUSES:
+                return
+            event = await anext(events)
+    finally:
+        await events.aclose()
+
+
 @router.get(
     "/result/{task_id}",
     response_model=OCRResult,
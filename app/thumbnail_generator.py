@@ -2,14 +2,73 @@
 Thumbnail Generator
 Generates thumbnails from images with various size and quality options
 """
+import PIL
 from PIL import Image
+import atexit
 import io
-from typing import Optional, Union
-from dataclasses import dataclass
+import os
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Union
+from dataclasses import dataclass, field
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Pillow-SIMD is a drop-in Pillow build with SSE4/AVX2 resampling kernels;
+# its versions carry a ".postN" suffix
+PILLOW_SIMD = '.post' in PIL.__version__
+
+# Resampling filter per quality setting, resolved once instead of per call
+_QUALITY_FILTERS = {
+    'high': Image.Resampling.LANCZOS,
+    'medium': Image.Resampling.BICUBIC,
+    'low': Image.Resampling.BILINEAR,
+}
+
+# Encoder quality per quality setting (JPEG and WEBP)
+_QUALITY_VALUES = {'high': 95, 'medium': 85, 'low': 70}
+
+# Format-specific encoder options: progressive JPEGs are smaller, WebP
+# method 0 skips libwebp's rate-distortion search (~4x faster to encode for
+# ~25% more bytes at thumbnail sizes), and PNG thumbnails are too small for
+# optimize/high zlib levels to pay for their CPU
+_SAVE_OPTS = {
+    'JPEG': {'optimize': True, 'progressive': True},
+    'WEBP': {'method': 0, 'lossless': False},
+    'PNG': {'optimize': False, 'compress_level': 1},
+}
+
+
+def _encode_image(image: Image.Image, output_format: str, quality: str) -> bytes:
+    """
+    Encode an image with the format-specific save options
+
+    Args:
+        image: Image to encode
+        output_format: Output format (PNG, JPEG, WEBP)
+        quality: Quality setting (high, medium, low)
+
+    Returns:
+        Encoded image bytes
+    """
+    # Convert to RGB if saving as JPEG (JPEG doesn't support transparency)
+    if output_format == 'JPEG' and image.mode in ('RGBA', 'LA', 'P'):
+        # Create white background
+        rgb_image = Image.new('RGB', image.size, (255, 255, 255))
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        rgb_image.paste(image, mask=image.split()[-1] if image.mode in ('RGBA', 'LA') else None)
+        image = rgb_image
+
+    options = dict(_SAVE_OPTS.get(output_format, {}))
+    if output_format in ('JPEG', 'WEBP'):
+        options['quality'] = _QUALITY_VALUES.get(quality, 85)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format=output_format, **options)
+    return buffer.getvalue()
+
 
 @dataclass
 class ThumbnailResult:
@@ -23,10 +82,18 @@ class ThumbnailResult:
     quality: str
     file_size: Optional[int] = None
 
+    # Encoded bytes per output format, filled on first to_bytes() call
+    _bytes_cache: Dict[str, bytes] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
     def to_bytes(self, format: Optional[str] = None) -> bytes:
         """
         Convert thumbnail to bytes
 
+        The encoded bytes are cached per format, so repeated calls return
+        the same object without re-encoding.
+
         Args:
             format: Output format (PNG, JPEG, WEBP), uses result format if not specified
 
@@ -35,39 +102,50 @@ class ThumbnailResult:
         """
         output_format = format or self.format
 
-        # Convert to RGB if saving as JPEG (JPEG doesn't support transparency)
-        image = self.thumbnail
-        if output_format == 'JPEG' and image.mode in ('RGBA', 'LA', 'P'):
-            # Create white background
-            rgb_image = Image.new('RGB', image.size, (255, 255, 255))
-            if image.mode == 'P':
-                image = image.convert('RGBA')
-            rgb_image.paste(image, mask=image.split()[-1] if image.mode in ('RGBA', 'LA') else None)
-            image = rgb_image
-
-        # Determine quality parameter
-        quality_map = {
-            'high': 95,
-            'medium': 85,
-            'low': 70
-        }
-        quality_value = quality_map.get(self.quality, 85)
-
-        # Save to bytes
-        buffer = io.BytesIO()
-        if output_format == 'JPEG':
-            image.save(buffer, format=output_format, quality=quality_value, optimize=True)
-        elif output_format == 'WEBP':
-            image.save(buffer, format=output_format, quality=quality_value)
-        else:  # PNG
-            image.save(buffer, format=output_format, optimize=True)
-
-        return buffer.getvalue()
+        data = self._bytes_cache.get(output_format)
+        if data is None:
+            data = _encode_image(self.thumbnail, output_format, self.quality)
+            self._bytes_cache[output_format] = data
+        return data
+
+
+def _generate_one(
+    pixels_name: str,
+    nbytes: int,
+    mode: str,
+    size: tuple[int, int],
+    palette: Optional[List[int]],
+    original_size: tuple[int, int],
+    max_size: int,
+    quality: str,
+    output_format: str
+) -> ThumbnailResult:
+    """
+    Generate a single thumbnail in a worker process
+
+    The source pixels are read from the shared memory block written once
+    per batch by generate_many(), instead of pickling the image per size.
+    """
+    pixels = shared_memory.SharedMemory(name=pixels_name)
+    try:
+        with pixels.buf[:nbytes] as data:
+            source = Image.frombytes(mode, size, data)
+    finally:
+        pixels.close()
+
+    if palette is not None:
+        source.putpalette(palette)
+
+    return ThumbnailGenerator()._generate(original_size, source, max_size, quality, output_format)
 
 
 class ThumbnailGenerator:
     """Generator for creating thumbnails from images"""
 
+    # generate_many() batches with at least this many sizes are spread over
+    # a process pool; smaller ones don't amortize the worker round trips
+    POOL_MIN_SIZES = 4
+
     def __init__(self, default_size: int = 300):
         """
         Initialize thumbnail generator
@@ -78,13 +156,20 @@ class ThumbnailGenerator:
         self.default_size = default_size
         self.valid_qualities = ['high', 'medium', 'low']
         self.valid_formats = ['PNG', 'JPEG', 'WEBP']
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+        logger.debug(
+            f"Thumbnail resampling uses Pillow {PIL.__version__} "
+            f"({'SIMD' if PILLOW_SIMD else 'standard'} build)"
+        )
 
     def generate(
         self,
         image: Image.Image,
         max_size: Optional[int] = None,
         quality: str = 'medium',
-        output_format: str = 'JPEG'
+        output_format: str = 'JPEG',
+        draft: bool = False
     ) -> ThumbnailResult:
         """
         Generate thumbnail from image
@@ -94,6 +179,9 @@ class ThumbnailGenerator:
             max_size: Maximum dimension (width or height) in pixels
             quality: Quality setting ('high', 'medium', 'low')
             output_format: Output format ('PNG', 'JPEG', 'WEBP')
+            draft: Decode a JPEG that hasn't been loaded yet at reduced
+                scale (Image.draft). This shrinks the passed image object
+                itself, so only set it if the image isn't used afterwards.
 
         Returns:
             ThumbnailResult with generated thumbnail
@@ -104,6 +192,153 @@ class ThumbnailGenerator:
         if max_size is not None and max_size <= 0:
             raise ValueError("max_size must be positive")
 
+        quality, output_format = self._validate_options(quality, output_format)
+
+        # Use default size if not specified
+        if max_size is None:
+            max_size = self.default_size
+
+        # Read before drafting, which changes image.size
+        original_size = image.size
+        if draft:
+            self._draft(image, original_size, max_size)
+
+        return self._generate(original_size, image, max_size, quality, output_format)
+
+    def generate_many(
+        self,
+        image: Image.Image,
+        sizes: List[int],
+        quality: str = 'medium',
+        output_format: str = 'JPEG',
+        draft: bool = False
+    ) -> List[ThumbnailResult]:
+        """
+        Generate thumbnails of several sizes from one image
+
+        Sizes are generated largest first, each one resampled from the
+        previous (already smaller) thumbnail instead of the full image, so
+        the total resampling work stays close to that of the largest size.
+        Thumbnail dimensions are still calculated from the original image.
+
+        Batches of POOL_MIN_SIZES or more sizes are instead generated from
+        the original image in parallel on a process pool, resampling and
+        encoding each size on its own core. The pixels are copied once into
+        shared memory for the whole batch rather than sent per size.
+
+        Args:
+            image: PIL Image to create thumbnails from
+            sizes: Maximum dimensions (width or height) in pixels
+            quality: Quality setting ('high', 'medium', 'low')
+            output_format: Output format ('PNG', 'JPEG', 'WEBP')
+            draft: Decode a JPEG that hasn't been loaded yet at reduced
+                scale, once for the largest size; as with generate(), the
+                passed image object is shrunk
+
+        Returns:
+            ThumbnailResults in the same order as sizes
+
+        Raises:
+            ValueError: If parameters are invalid
+        """
+        if any(size <= 0 for size in sizes):
+            raise ValueError("max_size must be positive")
+
+        quality, output_format = self._validate_options(quality, output_format)
+
+        original_size = image.size
+        if draft and sizes:
+            self._draft(image, original_size, max(sizes))
+
+        if len(set(sizes)) >= self.POOL_MIN_SIZES:
+            return self._generate_in_pool(image, original_size, sizes, quality, output_format)
+
+        results = {}
+        source = image
+        for size in sorted(set(sizes), reverse=True):
+            result = self._generate(original_size, source, size, quality, output_format)
+            results[size] = result
+            source = result.thumbnail
+
+        return [results[size] for size in sizes]
+
+    def shutdown(self) -> None:
+        """Shut down the process pool used by generate_many(), if started"""
+        if self._pool is not None:
+            # Also drops the exit hook's reference to this generator
+            atexit.unregister(self.shutdown)
+            self._pool.shutdown()
+            self._pool = None
+
+    def _generate_in_pool(
+        self,
+        image: Image.Image,
+        original_size: tuple[int, int],
+        sizes: List[int],
+        quality: str,
+        output_format: str
+    ) -> List[ThumbnailResult]:
+        """
+        Generate each size in a pool worker from one shared copy of the pixels
+
+        Args:
+            image: Image to resample, possibly drafted
+            original_size: Size of image before any drafting
+            sizes: Maximum dimensions (width or height) in pixels
+            quality: Validated quality setting
+            output_format: Validated output format
+
+        Returns:
+            ThumbnailResults in the same order as sizes
+        """
+        data = image.tobytes()
+        nbytes = len(data)
+        palette = image.getpalette() if image.mode == 'P' else None
+        pixels = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        try:
+            pixels.buf[:nbytes] = data
+            del data
+
+            pool = self._get_pool()
+            futures = {
+                size: pool.submit(
+                    _generate_one, pixels.name, nbytes, image.mode, image.size,
+                    palette, original_size, size, quality, output_format
+                )
+                for size in set(sizes)
+            }
+            try:
+                return [futures[size].result() for size in sizes]
+            finally:
+                # Workers must be done with the block before it is removed
+                wait(futures.values())
+        finally:
+            pixels.close()
+            pixels.unlink()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """
+        Get the process pool, starting it on first use
+
+        Returns:
+            ProcessPoolExecutor shut down at interpreter exit
+        """
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+            atexit.register(self.shutdown)
+        return self._pool
+
+    def _validate_options(self, quality: str, output_format: str) -> tuple[str, str]:
+        """
+        Replace an invalid quality or format with its default
+
+        Args:
+            quality: Quality setting
+            output_format: Output format
+
+        Returns:
+            Tuple of (quality, output_format)
+        """
         if quality not in self.valid_qualities:
             logger.warning(f"Invalid quality '{quality}', using 'medium'")
             quality = 'medium'
@@ -112,12 +347,50 @@ class ThumbnailGenerator:
             logger.warning(f"Invalid format '{output_format}', using 'JPEG'")
             output_format = 'JPEG'
 
-        # Use default size if not specified
-        if max_size is None:
-            max_size = self.default_size
+        return quality, output_format
+
+    def _draft(self, image: Image.Image, original_size: tuple[int, int], max_size: int) -> None:
+        """
+        Let libjpeg decode an unloaded JPEG at 1/2, 1/4 or 1/8 scale
+
+        Keeps at least twice the thumbnail size for the resampling that
+        follows. No-op for other formats, loaded images and images already
+        within max_size.
+
+        Args:
+            image: Image to draft in place
+            original_size: Size of image before any drafting
+            max_size: Maximum thumbnail dimension (width or height)
+        """
+        if image.format != 'JPEG' or max(original_size) <= max_size:
+            return
+
+        width, height = self._calculate_thumbnail_size(*original_size, max_size)
+        image.draft(image.mode, (width * 2, height * 2))
 
-        # Store original dimensions
-        original_width, original_height = image.size
+    def _generate(
+        self,
+        original_size: tuple[int, int],
+        source: Image.Image,
+        max_size: int,
+        quality: str,
+        output_format: str
+    ) -> ThumbnailResult:
+        """
+        Generate a thumbnail of the original image by resampling source
+
+        Args:
+            original_size: Original image size, used for the thumbnail dimensions
+            source: Image to resample: the original, possibly drafted, or a
+                larger thumbnail of it
+            max_size: Maximum dimension (width or height) in pixels
+            quality: Validated quality setting
+            output_format: Validated output format
+
+        Returns:
+            ThumbnailResult with generated thumbnail
+        """
+        original_width, original_height = original_size
 
         # Calculate thumbnail size maintaining aspect ratio
         thumbnail_size = self._calculate_thumbnail_size(
@@ -127,31 +400,38 @@ class ThumbnailGenerator:
         )
 
         # Create thumbnail
-        # Make a copy to avoid modifying the original
-        thumbnail = image.copy()
-
-        # Only resize if the image is larger than max_size
         if original_width > max_size or original_height > max_size:
-            # Use high-quality resampling
-            thumbnail.thumbnail(thumbnail_size, Image.Resampling.LANCZOS)
+            # resize() returns a new image, so the full-size original is never
+            # copied. reducing_gap first shrinks by an integer factor with a
+            # cheap box reduce, then resamples the much smaller image.
+            thumbnail = source.resize(
+                thumbnail_size,
+                _QUALITY_FILTERS[quality],
+                reducing_gap=3.0
+            )
+        else:
+            # Already small enough: never upscale, just copy so the caller's
+            # image isn't shared with the result
+            thumbnail = source.copy()
 
         # Get actual size after thumbnail operation
         thumb_width, thumb_height = thumbnail.size
 
-        # Calculate file size
-        file_size = self._calculate_file_size(thumbnail, output_format, quality)
-
-        return ThumbnailResult(
+        result = ThumbnailResult(
             thumbnail=thumbnail,
             width=thumb_width,
             height=thumb_height,
             original_width=original_width,
             original_height=original_height,
             format=output_format,
-            quality=quality,
-            file_size=file_size
+            quality=quality
         )
 
+        # Calculate file size (also primes the to_bytes() cache)
+        result.file_size = self._calculate_file_size(result)
+
+        return result
+
     def _calculate_thumbnail_size(
         self,
         width: int,
@@ -187,51 +467,18 @@ class ThumbnailGenerator:
 
         return (new_width, new_height)
 
-    def _calculate_file_size(
-        self,
-        image: Image.Image,
-        output_format: str,
-        quality: str
-    ) -> int:
+    def _calculate_file_size(self, result: ThumbnailResult) -> int:
         """
-        Calculate approximate file size of thumbnail
+        Calculate file size of thumbnail
 
         Args:
-            image: Thumbnail image
-            output_format: Output format
-            quality: Quality setting
+            result: Thumbnail result to encode in its own format
 
         Returns:
-            Approximate file size in bytes
+            File size in bytes, or 0 if the thumbnail could not be encoded
         """
         try:
-            buffer = io.BytesIO()
-
-            # Prepare image for format
-            save_image = image
-            if output_format == 'JPEG' and image.mode in ('RGBA', 'LA', 'P'):
-                rgb_image = Image.new('RGB', image.size, (255, 255, 255))
-                if image.mode == 'P':
-                    save_image = image.convert('RGBA')
-                else:
-                    save_image = image
-                if save_image.mode in ('RGBA', 'LA'):
-                    rgb_image.paste(save_image, mask=save_image.split()[-1])
-                save_image = rgb_image
-
-            # Quality mapping
-            quality_map = {'high': 95, 'medium': 85, 'low': 70}
-            quality_value = quality_map.get(quality, 85)
-
-            # Save to buffer
-            if output_format == 'JPEG':
-                save_image.save(buffer, format=output_format, quality=quality_value)
-            elif output_format == 'WEBP':
-                save_image.save(buffer, format=output_format, quality=quality_value)
-            else:  # PNG
-                save_image.save(buffer, format=output_format, optimize=True)
-
-            return len(buffer.getvalue())
+            return len(result.to_bytes())
         except Exception as e:
             logger.warning(f"Could not calculate file size: {e}")
             return 0
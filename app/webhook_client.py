@@ -3,22 +3,112 @@ Webhook Client for OCR Service
 Sends webhook notifications to backend when OCR processing completes
 """
 import asyncio
+import base64
+import functools
 import hashlib
 import hmac
 import json
 import logging
 import os
+import time
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, NamedTuple, Tuple, Union
 from urllib.parse import urlparse
 
 import httpx
 
+# orjson emits UTF-8 bytes directly and is several times faster than json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 
+# Formatted "YYYY-MM-DDTHH:MM:SS" prefix of the current second
+_timestamp_prefix = (0, '')
+
+
+def _utc_timestamp() -> str:
+    """
+    Current UTC time as ISO 8601 with microseconds and a 'Z' suffix
+
+    The date/time prefix is formatted once per second; only the
+    microsecond part is rebuilt per call.
+
+    Returns:
+        Timestamp such as '2024-01-01T12:00:00.000123Z'
+    """
+    global _timestamp_prefix
+    now = time.time()
+    second = int(now)
+    cached_second, prefix = _timestamp_prefix
+    if second != cached_second:
+        prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second))
+        _timestamp_prefix = (second, prefix)
+    return f"{prefix}.{int((now - second) * 1_000_000):06d}Z"
+
+
+# Delivery outcome per HTTP status code, looked up instead of range checks:
+# 2xx is delivered, 4xx is a permanent rejection and anything else
+# (5xx, unexpected codes) is retried with backoff
+_DELIVERED, _RETRY, _REJECTED = 0, 1, 2
+_STATUS_ACTIONS = bytearray([_RETRY]) * 600
+_STATUS_ACTIONS[200:300] = bytes([_DELIVERED]) * 100
+_STATUS_ACTIONS[400:500] = bytes([_REJECTED]) * 100
+
+
+class _WebhookConfig(NamedTuple):
+    """Webhook client settings read from the environment"""
+    backend_url: str
+    webhook_secret: str
+    max_retries: int
+    timeout: int
+    signature_format: str
+    progress_interval: float
+    max_concurrency: int
+
+
+@functools.lru_cache(maxsize=1)
+def _load_env_config() -> _WebhookConfig:
+    """
+    Read and parse the webhook environment variables once per process
+
+    Call _load_env_config.cache_clear() to pick up changed variables.
+
+    Returns:
+        Parsed webhook settings
+
+    Raises:
+        ValueError: If required environment variables are missing
+    """
+    backend_url = os.getenv('BACKEND_URL')
+    if not backend_url:
+        raise ValueError("BACKEND_URL environment variable is required")
+
+    webhook_secret = os.getenv('OCR_WEBHOOK_SECRET')
+    if not webhook_secret:
+        raise ValueError("OCR_WEBHOOK_SECRET environment variable is required")
+
+    return _WebhookConfig(
+        backend_url=backend_url,
+        webhook_secret=webhook_secret,
+        max_retries=int(os.getenv('WEBHOOK_MAX_RETRIES', '3')),
+        timeout=int(os.getenv('WEBHOOK_TIMEOUT', '30')),
+        signature_format=os.getenv('WEBHOOK_SIGNATURE_FORMAT', 'hex'),
+        progress_interval=float(
+            os.getenv('WEBHOOK_PROGRESS_INTERVAL', str(WebhookClient.PROGRESS_INTERVAL))
+        ),
+        max_concurrency=int(
+            os.getenv('WEBHOOK_MAX_CONCURRENCY', str(WebhookClient.MAX_CONCURRENCY))
+        )
+    )
+
+
 class WebhookDeliveryError(Exception):
     """Exception raised when webhook delivery fails"""
     pass
@@ -35,17 +125,62 @@ class WebhookClient:
 
     Features:
     - HMAC-SHA256 signature generation for security
-    - Exponential backoff retry logic (1s, 5s, 15s)
+    - Exponential backoff retry logic (1s, 5s, 15s, ...)
     - Async context manager for resource cleanup
     - Configurable timeout and retry settings
+    - One pooled HTTP client, so retries and later webhooks reuse
+      keep-alive connections instead of reconnecting
+    - Coalesced progress updates via send_progress()
     """
 
+    # Backend endpoint receiving OCR callbacks, relative to backend_url
+    CALLBACK_PATH = '/api/webhooks/ocr/callback'
+
+    # Headers sent with every webhook; the signature is added per request
+    BASE_HEADERS = {
+        'Content-Type': 'application/json',
+        'User-Agent': 'docvault-ocr/1.0'
+    }
+
+    # Seconds to wait before each retry; attempts past the end reuse the last
+    BACKOFF_SCHEDULE = (1, 5, 15, 45, 135)
+
+    # Idle connections kept open to the backend, and for how long (seconds)
+    MAX_KEEPALIVE_CONNECTIONS = 10
+    KEEPALIVE_EXPIRY = 60
+
+    # Requests in flight to the backend at once; further sends wait
+    MAX_CONCURRENCY = 32
+
+    # X-Webhook-Signature encodings: bare hex digest (legacy) or
+    # "sha256=<base64 digest>", which is 44 rather than 64 characters
+    SIGNATURE_FORMATS = ('hex', 'b64')
+
+    # Payloads larger than this (bytes) are signed in a worker thread so
+    # hashing multi-MB OCR text does not stall the event loop
+    THREADED_SIGNATURE_BYTES = 64 * 1024
+
+    # Pending progress updates are sent at most once per interval (seconds);
+    # at most this many tasks' updates are buffered while the backend lags
+    PROGRESS_INTERVAL = 0.5
+    MAX_PENDING_PROGRESS = 1000
+
+    # Tasks whose last progress webhook is remembered to skip repeats; the
+    # least recently updated is forgotten first, e.g. a task that crashed
+    # before its terminal webhook
+    MAX_TRACKED_PROGRESS = 1000
+
     def __init__(
         self,
         backend_url: str,
         webhook_secret: str,
         max_retries: int = 3,
-        timeout: int = 30
+        timeout: int = 30,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        progress_interval: float = PROGRESS_INTERVAL,
+        signature_format: str = 'hex',
+        http_client: Optional[httpx.AsyncClient] = None,
+        max_concurrency: int = MAX_CONCURRENCY
     ):
         """
         Initialize webhook client
@@ -55,9 +190,20 @@ class WebhookClient:
             webhook_secret: Secret key for HMAC signature generation
             max_retries: Maximum number of retry attempts (default: 3)
             timeout: Request timeout in seconds (default: 30)
+            transport: httpx transport to send requests through instead of
+                the network (e.g. httpx.MockTransport in tests)
+            progress_interval: Seconds between coalesced progress
+                deliveries (default: 0.5)
+            signature_format: X-Webhook-Signature encoding, 'hex' or 'b64'
+                (default: 'hex')
+            http_client: Caller-owned HTTP client to share its connection
+                pool across webhook clients; it is not closed by aclose()
+            max_concurrency: Requests in flight to the backend at once;
+                further sends wait for a slot (default: 32)
 
         Raises:
-            ValueError: If backend_url is invalid or webhook_secret is empty
+            ValueError: If backend_url is invalid, webhook_secret is empty
+                or signature_format is unknown
         """
         # Validate backend URL
         if not backend_url:
@@ -74,11 +220,31 @@ class WebhookClient:
         if not webhook_secret or not webhook_secret.strip():
             raise ValueError("Webhook secret is required")
 
+        if signature_format not in self.SIGNATURE_FORMATS:
+            raise ValueError(f"Unknown signature format: {signature_format}")
+
         self.backend_url = backend_url.rstrip('/')
+        self._callback_url = f"{self.backend_url}{self.CALLBACK_PATH}"
         self.webhook_secret = webhook_secret
+        # HMAC keyed once; each signature copies its precomputed key state
+        self._hmac_template = hmac.new(webhook_secret.encode(), digestmod=hashlib.sha256)
+        self.signature_format = signature_format
         self.max_retries = max_retries
         self.timeout = timeout
-        self._http_client: Optional[httpx.AsyncClient] = None
+        self._transport = transport
+        self._http_client: Optional[httpx.AsyncClient] = http_client
+        self._owns_http_client = http_client is None
+        self.max_concurrency = max_concurrency
+        # Held only for each POST, not during retry backoff
+        self._request_slots = asyncio.Semaphore(max_concurrency)
+        self.progress_interval = progress_interval
+        # Latest (progress, current_operation) per (task_id, document_id)
+        self._pending_progress: Dict[Tuple[str, str], Tuple[int, Optional[str]]] = {}
+        self._progress_task: Optional[asyncio.Task] = None
+        # Progress delivery in flight (POST or retry backoff) per task_id
+        self._progress_sends: Dict[str, asyncio.Task] = {}
+        # Last sent (progress, current_operation) per task, oldest first
+        self._last_progress: Dict[str, Tuple[Optional[int], Optional[str]]] = {}
 
     @classmethod
     def from_env(cls) -> 'WebhookClient':
@@ -90,6 +256,13 @@ class WebhookClient:
             OCR_WEBHOOK_SECRET: Webhook secret key
             WEBHOOK_TIMEOUT: Request timeout (optional, default: 30)
             WEBHOOK_MAX_RETRIES: Max retry attempts (optional, default: 3)
+            WEBHOOK_SIGNATURE_FORMAT: 'hex' or 'b64' (optional, default: hex)
+            WEBHOOK_PROGRESS_INTERVAL: Seconds between coalesced progress
+                deliveries (optional, default: 0.5)
+            WEBHOOK_MAX_CONCURRENCY: Requests in flight at once (optional,
+                default: 32)
+
+        The variables are parsed once per process and reused by later calls.
 
         Returns:
             WebhookClient instance
@@ -97,41 +270,46 @@ class WebhookClient:
         Raises:
             ValueError: If required environment variables are missing
         """
-        backend_url = os.getenv('BACKEND_URL')
-        if not backend_url:
-            raise ValueError("BACKEND_URL environment variable is required")
+        return cls(**_load_env_config()._asdict())
 
-        webhook_secret = os.getenv('OCR_WEBHOOK_SECRET')
-        if not webhook_secret:
-            raise ValueError("OCR_WEBHOOK_SECRET environment variable is required")
+    def _generate_signature(self, payload: Union[str, bytes]) -> str:
+        """
+        Generate HMAC-SHA256 signature for webhook payload
 
-        timeout = int(os.getenv('WEBHOOK_TIMEOUT', '30'))
-        max_retries = int(os.getenv('WEBHOOK_MAX_RETRIES', '3'))
+        Args:
+            payload: Serialized JSON webhook payload (str or UTF-8 bytes)
 
-        return cls(
-            backend_url=backend_url,
-            webhook_secret=webhook_secret,
-            max_retries=max_retries,
-            timeout=timeout
-        )
+        Returns:
+            X-Webhook-Signature value: the hex-encoded HMAC, or
+            'sha256=<base64 HMAC>' when signature_format is 'b64'
+        """
+        if isinstance(payload, str):
+            payload = payload.encode()
+
+        signature = self._hmac_template.copy()
+        signature.update(payload)
+        if self.signature_format == 'b64':
+            return 'sha256=' + base64.b64encode(signature.digest()).decode('ascii')
+        return signature.hexdigest()
 
-    def _generate_signature(self, payload: str) -> str:
+    @staticmethod
+    def _serialize_payload(payload: Dict[str, Any]) -> bytes:
         """
-        Generate HMAC-SHA256 signature for webhook payload
+        Serialize a webhook payload to the bytes that are signed and sent
+
+        Non-ASCII text (e.g. umlauts in OCR results) is emitted as UTF-8
+        rather than \\uXXXX escapes, which keeps bodies smaller. Uses orjson
+        when installed, falling back to the json module.
 
         Args:
-            payload: JSON string of the webhook payload
+            payload: Webhook payload dictionary
 
         Returns:
-            Hex-encoded HMAC signature
+            Compact UTF-8 encoded JSON
         """
-        signature = hmac.new(
-            self.webhook_secret.encode(),
-            payload.encode(),
-            hashlib.sha256
-        ).hexdigest()
-
-        return signature
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
 
     def _build_payload(
         self,
@@ -162,14 +340,14 @@ class WebhookClient:
             ValueError: If progress is not between 0 and 100
         """
         # Validate progress if provided
-        if progress is not None and (progress < 0 or progress > 100):
+        if progress is not None and not 0 <= progress <= 100:
             raise ValueError("Progress must be between 0 and 100")
 
         payload = {
             'task_id': task_id,
             'document_id': document_id,
             'status': status,
-            'timestamp': datetime.utcnow().isoformat() + 'Z'
+            'timestamp': _utc_timestamp()
         }
 
         if status == 'completed' and result:
@@ -200,6 +378,9 @@ class WebhookClient:
         """
         Send webhook notification to backend
 
+        A processing webhook identical to the last one delivered for the
+        task is skipped, as it would not change anything on the backend.
+
         Args:
             task_id: OCR task ID
             document_id: Document ID
@@ -215,6 +396,28 @@ class WebhookClient:
         Raises:
             WebhookDeliveryError: If webhook delivery fails after all retries
         """
+        # Settle the task's progress first so none reaches the backend after
+        # the terminal status: a delivery already in flight is cancelled
+        # (even mid-backoff) and any queued update is dropped, since the
+        # terminal status supersedes it and must not wait on its retries
+        if status != 'processing':
+            in_flight = self._progress_sends.get(task_id)
+            if in_flight is not None:
+                in_flight.cancel()
+                await asyncio.wait({in_flight})
+            self._pending_progress.pop((task_id, document_id), None)
+
+        # Skip no-op progress. The update is remembered before its POST, so
+        # a terminal status sent meanwhile ends the task's history for good
+        progress_state = (progress, current_operation)
+        if status == 'processing':
+            if self._last_progress.get(task_id) == progress_state:
+                logger.debug(f"Skipping unchanged progress webhook for task {task_id}")
+                return True
+            self._remember_progress(task_id, progress_state)
+        else:
+            self._last_progress.pop(task_id, None)
+
         # Build payload
         payload = self._build_payload(
             task_id=task_id,
@@ -226,27 +429,24 @@ class WebhookClient:
             current_operation=current_operation
         )
 
-        # Convert to JSON
-        payload_json = json.dumps(payload, separators=(',', ':'))
+        # Serialize once for both signing and the request body
+        payload_json = self._serialize_payload(payload)
 
-        # Generate signature
-        signature = self._generate_signature(payload_json)
+        # Generate signature; hashlib releases the GIL for large buffers
+        if len(payload_json) > self.THREADED_SIGNATURE_BYTES:
+            signature = await asyncio.to_thread(self._generate_signature, payload_json)
+        else:
+            signature = self._generate_signature(payload_json)
 
         # Prepare headers
-        headers = {
-            'Content-Type': 'application/json',
-            'X-Webhook-Signature': signature
-        }
-
-        # Build webhook URL
-        webhook_url = f"{self.backend_url}/api/webhooks/ocr/callback"
+        headers = {**self.BASE_HEADERS, 'X-Webhook-Signature': signature}
 
         # Ensure HTTP client is initialized
-        if not self._http_client:
-            self._http_client = httpx.AsyncClient(timeout=self.timeout)
+        http_client = self._get_http_client()
 
         # Retry logic with exponential backoff
-        backoff_intervals = [1, 5, 15]  # seconds
+        backoff_schedule = self.BACKOFF_SCHEDULE
+        last_backoff = len(backoff_schedule) - 1
         last_error = None
         delivery_start_time = datetime.now()
 
@@ -265,17 +465,21 @@ class WebhookClient:
                     }
                 )
 
-                response = await self._http_client.post(
-                    webhook_url,
-                    content=payload_json,
-                    headers=headers
-                )
+                async with self._request_slots:
+                    response = await http_client.post(
+                        self._callback_url,
+                        content=payload_json,
+                        headers=headers
+                    )
 
                 attempt_latency = (datetime.now() - attempt_start_time).total_seconds() * 1000
                 total_latency = (datetime.now() - delivery_start_time).total_seconds() * 1000
 
-                # Check response status
-                if response.status_code == 200:
+                # Classify response status
+                status_code = response.status_code
+                action = _STATUS_ACTIONS[status_code] if status_code < 600 else _RETRY
+
+                if action == _DELIVERED:
                     logger.info(
                         f"Webhook delivered successfully",
                         extra={
@@ -292,7 +496,7 @@ class WebhookClient:
                     return True
 
                 # 4xx errors are permanent - don't retry
-                if 400 <= response.status_code < 500:
+                if action == _REJECTED:
                     error_msg = f"Webhook rejected with status {response.status_code}"
                     logger.error(
                         error_msg,
@@ -307,41 +511,40 @@ class WebhookClient:
                             'response_text': response.text[:200]  # First 200 chars
                         }
                     )
+                    self._forget_progress(task_id, status, progress_state)
                     raise WebhookDeliveryError(error_msg)
 
-                # Unexpected status code
-                error_msg = f"Unexpected response status {response.status_code}"
+                # 5xx errors are transient - retry, as are unexpected codes
+                if status_code >= 500:
+                    error_msg = f"Backend error with status {status_code}"
+                else:
+                    error_msg = f"Unexpected response status {status_code}"
                 last_error = WebhookDeliveryError(error_msg)
 
-                # 5xx errors are transient - retry
-                if response.status_code >= 500:
-                    error_msg = f"Backend error with status {response.status_code}"
-                    last_error = WebhookDeliveryError(error_msg)
-
-                    if attempt < self.max_retries:
-                        backoff = backoff_intervals[attempt]
-                        logger.warning(
-                            f"Webhook delivery failed, retrying in {backoff}s",
-                            extra={
-                                'task_id': task_id,
-                                'document_id': document_id,
-                                'result': 'error_server_error_retrying',
-                                'http_status': response.status_code,
-                                'attempt': attempt + 1,
-                                'attempt_latency_ms': round(attempt_latency, 2),
-                                'total_latency_ms': round(total_latency, 2),
-                                'backoff_seconds': backoff
-                            }
-                        )
-                        await asyncio.sleep(backoff)
-                        continue
+                if attempt < self.max_retries:
+                    backoff = backoff_schedule[min(attempt, last_backoff)]
+                    logger.warning(
+                        f"Webhook delivery failed, retrying in {backoff}s",
+                        extra={
+                            'task_id': task_id,
+                            'document_id': document_id,
+                            'result': 'error_server_error_retrying',
+                            'http_status': response.status_code,
+                            'attempt': attempt + 1,
+                            'attempt_latency_ms': round(attempt_latency, 2),
+                            'total_latency_ms': round(total_latency, 2),
+                            'backoff_seconds': backoff
+                        }
+                    )
+                    await asyncio.sleep(backoff)
+                    continue
 
             except httpx.TimeoutException as e:
                 error_msg = f"Webhook request timeout: {str(e)}"
                 last_error = WebhookDeliveryError(error_msg)
 
                 if attempt < self.max_retries:
-                    backoff = backoff_intervals[attempt]
+                    backoff = backoff_schedule[min(attempt, last_backoff)]
                     logger.warning(
                         f"Webhook timeout, retrying in {backoff}s",
                         extra={
@@ -359,7 +562,7 @@ class WebhookClient:
                 last_error = WebhookDeliveryError(error_msg)
 
                 if attempt < self.max_retries:
-                    backoff = backoff_intervals[attempt]
+                    backoff = backoff_schedule[min(attempt, last_backoff)]
                     logger.warning(
                         f"Connection error, retrying in {backoff}s",
                         extra={
@@ -381,7 +584,7 @@ class WebhookClient:
                 last_error = WebhookDeliveryError(error_msg)
 
                 if attempt < self.max_retries:
-                    backoff = backoff_intervals[attempt]
+                    backoff = backoff_schedule[min(attempt, last_backoff)]
                     logger.warning(
                         f"Unexpected error, retrying in {backoff}s",
                         extra={
@@ -411,14 +614,196 @@ class WebhookClient:
         )
 
         # Re-raise with message indicating retries exhausted
+        self._forget_progress(task_id, status, progress_state)
         raise WebhookDeliveryError(final_error_msg)
 
+    def _remember_progress(
+        self,
+        task_id: str,
+        progress_state: Tuple[Optional[int], Optional[str]]
+    ) -> None:
+        """Record a task's latest progress, evicting the oldest task when full"""
+        last_progress = self._last_progress
+        # Re-inserted so dict order stays least recently updated first
+        last_progress.pop(task_id, None)
+        if len(last_progress) >= self.MAX_TRACKED_PROGRESS:
+            del last_progress[next(iter(last_progress))]
+        last_progress[task_id] = progress_state
+
+    def _forget_progress(
+        self,
+        task_id: str,
+        status: str,
+        progress_state: Tuple[Optional[int], Optional[str]]
+    ) -> None:
+        """Drop an undelivered progress update, so repeating it sends again"""
+        if status == 'processing' and self._last_progress.get(task_id) == progress_state:
+            del self._last_progress[task_id]
+
+    def send_progress(
+        self,
+        task_id: str,
+        document_id: str,
+        progress: int,
+        current_operation: Optional[str] = None
+    ) -> None:
+        """
+        Queue a progress webhook, coalescing updates for the same task
+
+        Only the latest update per (task_id, document_id) is kept, and a
+        background task delivers pending updates at most once every
+        progress_interval seconds, so a many-page document produces a few
+        requests instead of one per page. A completed/failed send_webhook()
+        for the task cancels its update in flight and drops its pending one.
+        Must be called from a running event loop.
+
+        Args:
+            task_id: OCR task ID
+            document_id: Document ID
+            progress: Progress percentage 0-100
+            current_operation: Current operation description
+
+        Raises:
+            ValueError: If progress is not between 0 and 100
+        """
+        if not 0 <= progress <= 100:
+            raise ValueError("Progress must be between 0 and 100")
+
+        key = (task_id, document_id)
+        pending = self._pending_progress
+        if key not in pending and len(pending) >= self.MAX_PENDING_PROGRESS:
+            # Backend is not keeping up; drop the oldest task's update
+            oldest = next(iter(pending))
+            del pending[oldest]
+            dropped_task_id = oldest[0]
+            logger.warning(f"Progress queue full, dropped update for task {dropped_task_id}")
+        pending[key] = (progress, current_operation)
+
+        if self._progress_task is None or self._progress_task.done():
+            self._progress_task = asyncio.create_task(self._drain_progress())
+
+    async def flush_progress(
+        self,
+        task_id: Optional[str] = None,
+        document_id: Optional[str] = None
+    ) -> None:
+        """
+        Deliver pending progress updates now
+
+        Updates are sent one at a time, each tracked as the task's delivery
+        in flight so a terminal send_webhook() can cancel it. Delivery
+        failures are logged, not raised, since a later update supersedes a
+        lost one.
+
+        Args:
+            task_id: Only deliver this task's update (default: all tasks)
+            document_id: Document ID belonging to task_id
+        """
+        if task_id is None:
+            keys = list(self._pending_progress)
+        else:
+            keys = [(task_id, document_id)]
+
+        for key in keys:
+            # Taken from the queue only when sent; a terminal webhook may
+            # have dropped it while an earlier update was in flight
+            update = self._pending_progress.pop(key, None)
+            if update is None:
+                continue
+            update_task_id, update_document_id = key
+            progress, current_operation = update
+
+            send = asyncio.create_task(
+                self._deliver_progress(update_task_id, update_document_id, progress, current_operation)
+            )
+            self._progress_sends[update_task_id] = send
+            send.add_done_callback(functools.partial(self._forget_progress_send, update_task_id))
+            # Not awaited directly: a cancelled delivery must not stop the rest
+            await asyncio.wait({send})
+            if not send.cancelled() and send.exception() is not None:
+                logger.error(
+                    f"Unexpected error delivering progress webhook for task {update_task_id}",
+                    exc_info=send.exception()
+                )
+
+    async def _deliver_progress(
+        self,
+        task_id: str,
+        document_id: str,
+        progress: int,
+        current_operation: Optional[str]
+    ) -> None:
+        """Send one progress webhook, logging a delivery failure"""
+        try:
+            await self.send_webhook(
+                task_id=task_id,
+                document_id=document_id,
+                status='processing',
+                progress=progress,
+                current_operation=current_operation
+            )
+        except WebhookDeliveryError as e:
+            logger.warning(f"Failed to deliver progress webhook for task {task_id}: {e}")
+
+    def _forget_progress_send(self, task_id: str, send: asyncio.Task) -> None:
+        """Stop tracking a finished progress delivery, unless superseded"""
+        if self._progress_sends.get(task_id) is send:
+            del self._progress_sends[task_id]
+
+    async def _drain_progress(self):
+        """Deliver pending progress every progress_interval until none is left"""
+        while self._pending_progress:
+            await asyncio.sleep(self.progress_interval)
+            await self.flush_progress()
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """
+        Get the shared HTTP client, creating it on first use or after close
+
+        An injected client is always returned as is.
+
+        Returns:
+            httpx.AsyncClient with a keep-alive connection pool
+        """
+        if not self._owns_http_client:
+            return self._http_client
+
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                transport=self._transport,
+                limits=httpx.Limits(
+                    max_keepalive_connections=self.MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=self.KEEPALIVE_EXPIRY
+                )
+            )
+        return self._http_client
+
+    async def aclose(self):
+        """
+        Close the HTTP client and its pooled connections
+
+        Stops progress delivery; updates still pending are discarded, as
+        the task's final webhook supersedes them. An injected HTTP client
+        is left open for its owner to close.
+        """
+        if self._progress_task is not None:
+            self._progress_task.cancel()
+            self._progress_task = None
+        for send in list(self._progress_sends.values()):
+            send.cancel()
+        self._pending_progress.clear()
+        self._last_progress.clear()
+
+        if self._owns_http_client and self._http_client:
+            await self._http_client.aclose()
+            self._http_client = None
+
     async def __aenter__(self) -> 'WebhookClient':
         """Enter async context manager"""
-        self._http_client = httpx.AsyncClient(timeout=self.timeout)
+        self._get_http_client()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Exit async context manager and cleanup resources"""
-        if self._http_client:
-            await self._http_client.aclose()
+        await self.aclose()
@@ -3,6 +3,7 @@ OCR Worker Process
 Processes OCR tasks from Redis queue
 """
 import asyncio
+import functools
 import signal
 import sys
 import os
@@ -58,19 +59,23 @@ class OCRWorker:
         self,
         redis_url: str,
         poll_interval: float = 1.0,
-        max_retries: int = 3
+        max_retries: int = 3,
+        page_concurrency: int = 4
     ):
         """
         Initialize OCR worker
 
         Args:
             redis_url: Redis connection URL
-            poll_interval: Seconds to wait between queue checks
+            poll_interval: Seconds to block waiting for a task before
+                re-checking for shutdown
             max_retries: Maximum retry attempts for failed tasks
+            page_concurrency: Pages of a document OCRed in parallel
         """
         self.redis_url = redis_url
         self.poll_interval = poll_interval
         self.max_retries = max_retries
+        self.page_concurrency = max(1, page_concurrency)
         self.running = False
         self.shutdown_requested = False
 
@@ -125,9 +130,9 @@ class OCRWorker:
 
         while self.running and not self.shutdown_requested:
             try:
-                # Check for tasks in queue (priority order: high -> normal -> low)
+                # Block until a task is queued (priority order: high -> normal -> low)
                 redis_manager = get_redis_queue_manager()
-                task_id = await redis_manager.dequeue_task()
+                task_id = await redis_manager.blocking_dequeue(timeout=self.poll_interval)
 
                 if task_id:
                     logger.info(f"Dequeued task: {task_id}")
@@ -138,9 +143,6 @@ class OCRWorker:
                     except Exception as e:
                         logger.error(f"Error processing task {task_id}: {e}", exc_info=True)
                         await self._handle_task_error(task_id, str(e))
-                else:
-                    # No tasks available, wait before checking again
-                    await asyncio.sleep(self.poll_interval)
 
             except Exception as e:
                 logger.error(f"Error in processing loop: {e}", exc_info=True)
@@ -158,6 +160,8 @@ class OCRWorker:
         """
         start_time = time.time()
         redis_manager = get_redis_queue_manager()
+        # Read from the task hash below; reused by every webhook for the task
+        document_id = None
 
         try:
             # Update status to PROCESSING
@@ -189,16 +193,16 @@ class OCRWorker:
             # Try to get language from Redis directly
             task_key = f"task:{task_id}"
             task_data = await redis_manager.redis.hgetall(task_key)
-            if task_data and b"language" in task_data:
-                language = task_data[b"language"].decode()
+            if task_data and "language" in task_data:
+                language = task_data["language"]
+
+            # Backend document ID for progress webhooks; bound once with the
+            # task ID so each update only passes what changes
+            document_id = task_data.get("document_id") if task_data else None
+            report_progress = functools.partial(self._update_progress, task_id, document_id)
 
             # Step 1: Convert document to images (25% progress)
-            await redis_manager.update_task_status(
-                task_id,
-                TaskStatus.PROCESSING,
-                progress=10,
-                message="Converting document to images"
-            )
+            await report_progress(10, "Converting document to images")
 
             with open(file_path, 'rb') as f:
                 processed_doc = self.document_processor.process(f)
@@ -211,18 +215,11 @@ class OCRWorker:
 
             if use_native_text:
                 logger.info(f"Using native PDF text extraction (faster and more accurate)")
-                await redis_manager.update_task_status(
-                    task_id,
-                    TaskStatus.PROCESSING,
-                    progress=25,
-                    message=f"Using native text from PDF ({processed_doc.page_count} pages)"
-                )
-
                 # Send progress webhook at 25% milestone
-                await self._send_progress_webhook(
-                    task_id=task_id,
-                    progress=25,
-                    current_operation=f"Using native text from PDF ({processed_doc.page_count} pages)"
+                await report_progress(
+                    25,
+                    f"Using native text from PDF ({processed_doc.page_count} pages)",
+                    notify=True
                 )
 
                 all_text = []
@@ -240,11 +237,9 @@ class OCRWorker:
 
                     # Update progress (25% to 75%)
                     progress = 25 + int((page_num / processed_doc.page_count) * 50)
-                    await redis_manager.update_task_status(
-                        task_id,
-                        TaskStatus.PROCESSING,
-                        progress=progress,
-                        message=f"Processed page {page_num}/{processed_doc.page_count}"
+                    await report_progress(
+                        progress,
+                        f"Processed page {page_num}/{processed_doc.page_count}"
                     )
 
                 full_text = "\n\n".join(all_text)
@@ -254,43 +249,51 @@ class OCRWorker:
             else:
                 # Perform OCR on each page
                 logger.info(f"Performing OCR on {processed_doc.page_count} pages")
-                await redis_manager.update_task_status(
-                    task_id,
-                    TaskStatus.PROCESSING,
-                    progress=25,
-                    message=f"Performing OCR on {processed_doc.page_count} pages"
-                )
-
                 # Send progress webhook at 25% milestone (Task 5.7)
-                await self._send_progress_webhook(
-                    task_id=task_id,
-                    progress=25,
-                    current_operation=f"Performing OCR on {processed_doc.page_count} pages"
+                await report_progress(
+                    25,
+                    f"Performing OCR on {processed_doc.page_count} pages",
+                    notify=True
                 )
 
+                # OCR pages in worker threads, up to page_concurrency at a
+                # time; Tesseract runs out of process, so pages overlap
+                semaphore = asyncio.Semaphore(self.page_concurrency)
+                dpi = processed_doc.dpi or 300
+
+                async def ocr_page(page_num, image):
+                    async with semaphore:
+                        logger.info(f"Processing page {page_num}/{processed_doc.page_count}")
+                        return await asyncio.to_thread(self._ocr_page, image, language, dpi)
+
+                page_tasks = [
+                    asyncio.ensure_future(ocr_page(idx + 1, image))
+                    for idx, image in enumerate(processed_doc.images)
+                ]
+
+                try:
+                    # Update progress (25% to 75% based on page completion),
+                    # sending a progress webhook at the 50% milestone (Task 5.7)
+                    for pages_done, page_task in enumerate(asyncio.as_completed(page_tasks), start=1):
+                        await page_task
+                        progress = 25 + int((pages_done / processed_doc.page_count) * 50)
+                        await report_progress(
+                            progress,
+                            f"Processed page {pages_done}/{processed_doc.page_count}",
+                            notify=48 <= progress <= 52,
+                            operation=f"Performing OCR on page {pages_done}/{processed_doc.page_count}"
+                        )
+                except BaseException:
+                    for page_task in page_tasks:
+                        page_task.cancel()
+                    raise
+
                 all_text = []
                 page_results = []
                 total_confidence = 0.0
 
-                for idx, image in enumerate(processed_doc.images):
-                    page_num = idx + 1
-                    logger.info(f"Processing page {page_num}/{processed_doc.page_count}")
-
-                    # Convert PIL Image to bytes for OCR service
-                    img_byte_arr = io.BytesIO()
-                    image.save(img_byte_arr, format='PNG')
-                    img_byte_arr.seek(0)
-
-                    # Perform OCR with enhanced preprocessing
-                    # Use "auto" enhancement level for adaptive processing
-                    ocr_result = self.ocr_service.extract_text(
-                        img_byte_arr,
-                        language=language,
-                        dpi=processed_doc.dpi or 300,
-                        preprocess=True,  # Enable enhanced preprocessing
-                        enhance_level="auto"  # Auto-detect optimal enhancement based on image quality
-                    )
-
+                for page_num, page_task in enumerate(page_tasks, start=1):
+                    ocr_result = page_task.result()
                     all_text.append(ocr_result.text)
                     total_confidence += ocr_result.confidence
                     page_results.append({
@@ -300,23 +303,6 @@ class OCRWorker:
                         "source": "ocr"
                     })
 
-                    # Update progress (25% to 75% based on page completion)
-                    progress = 25 + int((page_num / processed_doc.page_count) * 50)
-                    await redis_manager.update_task_status(
-                        task_id,
-                        TaskStatus.PROCESSING,
-                        progress=progress,
-                        message=f"Processed page {page_num}/{processed_doc.page_count}"
-                    )
-
-                    # Send progress webhook at 50% milestone (Task 5.7)
-                    if progress >= 48 and progress <= 52:
-                        await self._send_progress_webhook(
-                            task_id=task_id,
-                            progress=progress,
-                            current_operation=f"Performing OCR on page {page_num}/{processed_doc.page_count}"
-                        )
-
                 # Combine all text
                 full_text = "\n\n".join(all_text)
                 avg_confidence = total_confidence / len(processed_doc.images) if processed_doc.images else 0.0
@@ -327,19 +313,8 @@ class OCRWorker:
             metadata = {}
             if self.metadata_extractor:
                 try:
-                    await redis_manager.update_task_status(
-                        task_id,
-                        TaskStatus.PROCESSING,
-                        progress=75,
-                        message="Extracting metadata"
-                    )
-
                     # Send progress webhook at 75% milestone (Task 5.7)
-                    await self._send_progress_webhook(
-                        task_id=task_id,
-                        progress=75,
-                        current_operation="Extracting metadata"
-                    )
+                    await report_progress(75, "Extracting metadata", notify=True)
 
                     metadata = self.metadata_extractor.extract(full_text)
                     logger.info(f"Extracted metadata: {list(metadata.keys())}")
@@ -350,12 +325,7 @@ class OCRWorker:
             category = None
             if self.document_categorizer:
                 try:
-                    await redis_manager.update_task_status(
-                        task_id,
-                        TaskStatus.PROCESSING,
-                        progress=85,
-                        message="Categorizing document"
-                    )
+                    await report_progress(85, "Categorizing document")
                     category = self.document_categorizer.categorize(full_text, metadata)
                     logger.info(f"Document categorized as: {category}")
                 except Exception as e:
@@ -366,12 +336,7 @@ class OCRWorker:
                 metadata["category"] = category
 
             # Step 5: Store result (95% - 100% progress)
-            await redis_manager.update_task_status(
-                task_id,
-                TaskStatus.PROCESSING,
-                progress=95,
-                message="Storing results"
-            )
+            await report_progress(95, "Storing results")
 
             processing_time = time.time() - start_time
 
@@ -393,7 +358,7 @@ class OCRWorker:
             logger.info(f"Task {task_id} completed successfully in {processing_time:.2f}s")
 
             # Send webhook notification to backend
-            await self._send_completion_webhook(task_id, result)
+            await self._send_completion_webhook(task_id, result, document_id)
 
             # NOTE: Files are NOT cleaned up here as they are managed by backend
             # Files remain in shared storage and are cleaned up by backend's OrphanedFileCleanupService
@@ -402,30 +367,58 @@ class OCRWorker:
         except Exception as e:
             logger.error(f"Task {task_id} failed: {e}", exc_info=True)
             # Send failure webhook to backend
-            await self._send_failure_webhook(task_id, str(e))
+            await self._send_failure_webhook(task_id, str(e), document_id)
             raise
 
-    async def _send_completion_webhook(self, task_id: str, result: OCRResultModel):
+    def _ocr_page(self, image, language: str, dpi: int):
+        """
+        OCR a single page image; runs in a worker thread
+
+        Args:
+            image: PIL Image of the page
+            language: Tesseract language code
+            dpi: Page resolution
+
+        Returns:
+            OCRResult for the page
+        """
+        # Convert PIL Image to bytes for OCR service
+        img_byte_arr = io.BytesIO()
+        image.save(img_byte_arr, format='PNG')
+        img_byte_arr.seek(0)
+
+        # Perform OCR with enhanced preprocessing
+        # Use "auto" enhancement level for adaptive processing
+        return self.ocr_service.extract_text(
+            img_byte_arr,
+            language=language,
+            dpi=dpi,
+            preprocess=True,  # Enable enhanced preprocessing
+            enhance_level="auto"  # Auto-detect optimal enhancement based on image quality
+        )
+
+    async def _send_completion_webhook(
+        self,
+        task_id: str,
+        result: OCRResultModel,
+        document_id: Optional[str] = None
+    ):
         """
         Send webhook notification for successful task completion
 
         Args:
             task_id: Task identifier
             result: OCR processing result
+            document_id: Backend document ID, if already read from the task;
+                fetched from Redis otherwise
         """
         if not self.webhook_client:
             logger.debug("Webhook client not configured, skipping webhook notification")
             return
 
         try:
-            # Get document_id from Redis
-            redis_manager = get_redis_queue_manager()
-            task_key = f"task:{task_id}"
-            task_data = await redis_manager.redis.hgetall(task_key)
-
-            document_id = None
-            if task_data and b"document_id" in task_data:
-                document_id = task_data[b"document_id"].decode()
+            if document_id is None:
+                document_id = await self._get_document_id(task_id)
 
             if not document_id:
                 logger.warning(f"No document_id found for task {task_id}, skipping webhook")
@@ -457,27 +450,28 @@ class OCRWorker:
         except Exception as e:
             logger.error(f"Unexpected error sending webhook for task {task_id}: {e}", exc_info=True)
 
-    async def _send_failure_webhook(self, task_id: str, error_message: str):
+    async def _send_failure_webhook(
+        self,
+        task_id: str,
+        error_message: str,
+        document_id: Optional[str] = None
+    ):
         """
         Send webhook notification for task failure
 
         Args:
             task_id: Task identifier
             error_message: Error message
+            document_id: Backend document ID, if already read from the task;
+                fetched from Redis otherwise
         """
         if not self.webhook_client:
             logger.debug("Webhook client not configured, skipping webhook notification")
             return
 
         try:
-            # Get document_id from Redis
-            redis_manager = get_redis_queue_manager()
-            task_key = f"task:{task_id}"
-            task_data = await redis_manager.redis.hgetall(task_key)
-
-            document_id = None
-            if task_data and b"document_id" in task_data:
-                document_id = task_data[b"document_id"].decode()
+            if document_id is None:
+                document_id = await self._get_document_id(task_id)
 
             if not document_id:
                 logger.warning(f"No document_id found for task {task_id}, skipping webhook")
@@ -499,13 +493,66 @@ class OCRWorker:
         except Exception as e:
             logger.error(f"Unexpected error sending failure webhook for task {task_id}: {e}", exc_info=True)
 
-    async def _send_progress_webhook(self, task_id: str, progress: int, current_operation: str):
+    async def _get_document_id(self, task_id: str) -> Optional[str]:
+        """
+        Read the backend document ID stored with a task
+
+        Args:
+            task_id: Task identifier
+
+        Returns:
+            Document ID, or None if the task has none
+        """
+        redis_manager = get_redis_queue_manager()
+        task_data = await redis_manager.redis.hgetall(f"task:{task_id}")
+        return task_data.get("document_id") if task_data else None
+
+    async def _update_progress(
+        self,
+        task_id: str,
+        document_id: Optional[str],
+        progress: int,
+        message: str,
+        notify: bool = False,
+        operation: Optional[str] = None
+    ):
+        """
+        Record task progress in Redis and optionally notify the backend
+
+        The task hash update and, at webhook milestones, the progress
+        history entry (Task 5.8) are written in one pipelined round trip.
+
+        Args:
+            task_id: Task identifier
+            document_id: Backend document ID, if the task has one
+            progress: Progress percentage (0-100)
+            message: Description of current operation
+            notify: Milestone update; record it in the progress history and
+                send a progress webhook (Task 5.7)
+            operation: Operation reported in the history entry and webhook
+                (defaults to message)
+        """
+        redis_manager = get_redis_queue_manager()
+        await redis_manager.update_task_progress(
+            task_id, progress, message, record_history=notify, operation=operation
+        )
+
+        if notify:
+            self._send_progress_webhook(task_id, document_id, progress, operation or message)
+
+    def _send_progress_webhook(
+        self,
+        task_id: str,
+        document_id: Optional[str],
+        progress: int,
+        current_operation: str
+    ):
         """
         Send progress webhook notification to backend (Task 5.7)
-        Also records progress update in Redis history (Task 5.8)
 
         Args:
             task_id: Task identifier
+            document_id: Backend document ID, if the task has one
             progress: Progress percentage (0-100)
             current_operation: Description of current operation
         """
@@ -513,44 +560,24 @@ class OCRWorker:
             logger.debug("Webhook client not configured, skipping progress webhook")
             return
 
-        try:
-            # Get document_id from Redis
-            redis_manager = get_redis_queue_manager()
-            task_key = f"task:{task_id}"
-            task_data = await redis_manager.redis.hgetall(task_key)
-
-            document_id = None
-            if task_data and b"document_id" in task_data:
-                document_id = task_data[b"document_id"].decode()
-
-            if not document_id:
-                logger.debug(f"No document_id found for task {task_id}, skipping progress webhook")
-                return
-
-            # Record progress in history (Task 5.8)
-            await redis_manager.record_progress_update(
-                task_id=task_id,
-                progress=progress,
-                operation=current_operation,
-                status="processing"
-            )
+        if not document_id:
+            logger.debug(f"No document_id found for task {task_id}, skipping progress webhook")
+            return
 
-            # Send progress webhook
-            await self.webhook_client.send_webhook(
+        try:
+            # Queue progress webhook; the client coalesces updates per task
+            # and delivers them in the background
+            self.webhook_client.send_progress(
                 task_id=task_id,
                 document_id=document_id,
-                status="processing",
                 progress=progress,
                 current_operation=current_operation
             )
 
             logger.debug(
-                f"Progress webhook sent for task {task_id}: {progress}% - {current_operation}"
+                f"Progress webhook queued for task {task_id}: {progress}% - {current_operation}"
             )
 
-        except WebhookDeliveryError as e:
-            # Log webhook failure but don't fail the task
-            logger.warning(f"Failed to deliver progress webhook for task {task_id}: {e}")
         except Exception as e:
             logger.warning(f"Unexpected error sending progress webhook for task {task_id}: {e}")
 
@@ -565,16 +592,13 @@ class OCRWorker:
         redis_manager = get_redis_queue_manager()
 
         try:
-            # Get current retry count
-            task_key = f"task:{task_id}"
-            task_data = await redis_manager.redis.hgetall(task_key)
+            # Tasks that used up their retries are marked FAILED here rather
+            # than handed to the retry script, which would dead-letter them.
+            # The script still makes the final check and the re-queue
+            # atomically, so a concurrent retry can't push the task twice.
+            retry_count = await redis_manager.redis.hget(f"task:{task_id}", "retry_count")
+            retry_count = int(retry_count or 0)
 
-            if task_data and b"retry_count" in task_data:
-                retry_count = int(task_data[b"retry_count"].decode())
-            else:
-                retry_count = 0
-
-            # Check if we should retry
             if retry_count < self.max_retries:
                 # Retry the task
                 logger.info(f"Retrying task {task_id} (attempt {retry_count + 1}/{self.max_retries})")
@@ -613,11 +637,18 @@ class OCRWorker:
         # Disconnect from Redis
         try:
             redis_manager = get_redis_queue_manager()
-            await redis_manager.disconnect()
+            await redis_manager.disconnect(close_pool=True)
             logger.info("Disconnected from Redis")
         except Exception as e:
             logger.error(f"Error disconnecting from Redis: {e}")
 
+        # Close pooled webhook connections
+        if self.webhook_client:
+            try:
+                await self.webhook_client.aclose()
+            except Exception as e:
+                logger.error(f"Error closing webhook client: {e}")
+
         logger.info("OCR Worker shutdown complete")
 
 
@@ -629,15 +660,20 @@ async def main():
     # Get worker configuration from environment
     poll_interval = float(os.getenv("WORKER_POLL_INTERVAL", "1.0"))
     max_retries = int(os.getenv("WORKER_MAX_RETRIES", "3"))
+    page_concurrency = int(os.getenv("WORKER_PAGE_CONCURRENCY", "4"))
 
     logger.info(f"Starting OCR Worker with Redis: {redis_url}")
-    logger.info(f"Configuration: poll_interval={poll_interval}s, max_retries={max_retries}")
+    logger.info(
+        f"Configuration: poll_interval={poll_interval}s, max_retries={max_retries}, "
+        f"page_concurrency={page_concurrency}"
+    )
 
     # Create and start worker
     worker = OCRWorker(
         redis_url=redis_url,
         poll_interval=poll_interval,
-        max_retries=max_retries
+        max_retries=max_retries,
+        page_concurrency=page_concurrency
     )
 
     try:
@@ -1,19 +1,59 @@
 """
 Test configuration and fixtures
 """
+import asyncio
 import pytest
 import pytest_asyncio
 from unittest.mock import AsyncMock, patch, MagicMock
 from fastapi.testclient import TestClient
 
+from app.redis_queue import RedisQueueManager
+from tests.redis_mocks import attach_pipeline, make_redis_mock
+
+
+@pytest.fixture(scope="session")
+def connected_redis():
+    """
+    Mocked Redis client and a manager connected to it, shared by the session
+
+    Building the mock and connecting happen once. The client class is only
+    patched while connecting, so the patch doesn't leak into other tests;
+    modules reset the client between tests with reset_redis_mock().
+    """
+    redis_mock = make_redis_mock()
+    manager = RedisQueueManager("redis://localhost:6379/0")
+    with patch('app.redis_queue.aioredis.Redis', return_value=redis_mock):
+        asyncio.run(manager.connect())
+    yield manager, redis_mock
+    asyncio.run(manager.disconnect())
+
+
+@pytest_asyncio.fixture
+async def fake_redis_manager():
+    """
+    RedisQueueManager connected to an in-process fakeredis server
+
+    Unlike the mocks, commands, pub/sub and the Lua scripts (with lupa)
+    really run, on a client that decodes responses like the shared pool.
+    """
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    fake_client = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer(), decode_responses=True)
+    manager = RedisQueueManager("redis://localhost:6379/0")
+    with patch('app.redis_queue.aioredis.Redis', return_value=fake_client):
+        await manager.connect()
+    yield manager
+    await manager.disconnect()
+
 
 @pytest.fixture(scope="function")
 def mock_redis_client():
     """Mock Redis client for tests"""
     from datetime import datetime
 
-    # Storage for created tasks during tests
+    # Storage for created tasks and sets during tests
     test_tasks = {}
+    test_sets = {}
 
     async def mock_hset(key, *args, mapping=None, **kwargs):
         """Mock hset that stores task data"""
@@ -37,15 +77,19 @@ def mock_redis_client():
     async def mock_hgetall(key):
         """Mock hgetall that retrieves stored task data"""
         if key in test_tasks:
-            # Convert to bytes like real Redis
-            result = {}
-            for k, v in test_tasks[key].items():
-                key_bytes = k.encode() if isinstance(k, str) else k
-                value_bytes = v.encode() if isinstance(v, str) else v
-                result[key_bytes] = value_bytes
-            return result
+            # Convert to strings like real Redis (decode_responses=True)
+            return {str(k): str(v) for k, v in test_tasks[key].items()}
         return {}
 
+    async def mock_sadd(key, *members):
+        """Mock sadd that stores set members"""
+        test_sets.setdefault(key, set()).update(members)
+        return len(members)
+
+    async def mock_smembers(key):
+        """Mock smembers that retrieves stored set members"""
+        return set(test_sets.get(key, set()))
+
     async def mock_exists(key):
         """Mock exists check"""
         return 1 if key in test_tasks else 0
@@ -61,6 +105,8 @@ def mock_redis_client():
     redis_mock.hgetall = AsyncMock(side_effect=mock_hgetall)
     redis_mock.hset = AsyncMock(side_effect=mock_hset)
     redis_mock.hget = AsyncMock(return_value=None)
+    redis_mock.sadd = AsyncMock(side_effect=mock_sadd)
+    redis_mock.smembers = AsyncMock(side_effect=mock_smembers)
     redis_mock.get = AsyncMock(side_effect=mock_get)
     redis_mock.exists = AsyncMock(side_effect=mock_exists)
     redis_mock.delete = AsyncMock(return_value=1)
@@ -69,6 +115,7 @@ def mock_redis_client():
     redis_mock.llen = AsyncMock(return_value=0)
     redis_mock.close = AsyncMock()
     redis_mock.wait_closed = AsyncMock()
+    attach_pipeline(redis_mock)
 
     # Store reference for tests
     redis_mock._test_tasks = test_tasks
@@ -89,7 +136,7 @@ def initialize_test_app(mock_redis_client):
         asyncio.set_event_loop(loop)
 
     # Start patching
-    patcher = patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis_client)
+    patcher = patch('app.redis_queue.aioredis.Redis', return_value=mock_redis_client)
     patcher.start()
 
     # Import app after patching to ensure the patch is applied
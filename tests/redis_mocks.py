@@ -0,0 +1,228 @@
+"""
+Shared Redis mock helpers for tests
+"""
+from datetime import datetime, timezone
+from unittest.mock import DEFAULT, AsyncMock, Mock
+
+from app.redis_queue import FIND_STUCK_TASKS_SCRIPT, RETRY_TASK_SCRIPT, RedisQueueManager
+
+
+# Default return values for the async Redis commands used by RedisQueueManager
+REDIS_COMMAND_DEFAULTS = {
+    "ping": True,
+    "set": True,
+    "get": None,
+    "delete": 1,
+    "unlink": 1,
+    "exists": 0,
+    "lpush": 1,
+    "rpop": None,
+    "brpop": None,
+    "llen": 0,
+    "setex": True,
+    "ttl": -1,
+    "hset": 1,
+    "hget": None,
+    "hgetall": {},
+    "hdel": 1,
+    "expire": True,
+    "publish": 0,
+    "sadd": 1,
+    "smembers": set(),
+    "zadd": 1,
+    "zrem": 1,
+    "zrangebyscore": [],
+    "zcount": 0,
+    "close": None,
+}
+
+
+class MockPipeline:
+    """
+    Mock Redis pipeline
+
+    Queues commands like a real pipeline and replays them against the
+    mocked client on execute(), so tests can keep asserting on the
+    client's command mocks (hset, lpush, ...) regardless of batching.
+    """
+
+    def __init__(self, redis_mock):
+        self._redis = redis_mock
+        self._commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self, raise_on_error=True):
+        results = []
+        for name, args, kwargs in self._commands:
+            try:
+                results.append(await getattr(self._redis, name)(*args, **kwargs))
+            except Exception as e:
+                if raise_on_error:
+                    raise
+                results.append(e)
+        self._commands = []
+        return results
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self._commands = []
+
+
+def attach_pipeline(redis_mock):
+    """Make redis_mock.pipeline() return a MockPipeline bound to redis_mock"""
+    redis_mock.pipeline = Mock(side_effect=lambda *args, **kwargs: MockPipeline(redis_mock))
+    return redis_mock
+
+
+def make_redis_mock(**overrides):
+    """
+    Build a mocked async Redis client with default command return values
+
+    redis.asyncio command methods are plain functions returning awaitables,
+    so AsyncMock(spec=aioredis.Redis) would turn them into sync MagicMocks;
+    instead every command in REDIS_COMMAND_DEFAULTS is configured on a plain
+    AsyncMock. A pipeline and the retry Lua script are attached as well.
+
+    Args:
+        **overrides: Command name to return value, replacing the defaults
+
+    Returns:
+        Configured AsyncMock Redis client
+    """
+    redis_mock = AsyncMock()
+    # Lua retry script: returns [code, retry_count]
+    redis_mock.retry_script = AsyncMock()
+    # Lua stuck-task filter: returns the task IDs still processing
+    redis_mock.find_stuck_script = AsyncMock()
+    redis_mock.register_script = Mock()
+    return _configure_commands(redis_mock, overrides)
+
+
+def reset_redis_mock(redis_mock, **overrides):
+    """
+    Restore a shared mocked client to its make_redis_mock() defaults
+
+    Clears recorded calls, return values and side effects on every command
+    mock, including ones a test replaced, so a module-scoped client can be
+    reused without rebuilding it for each test.
+
+    Args:
+        redis_mock: Client created by make_redis_mock()
+        **overrides: Command name to return value, replacing the defaults
+
+    Returns:
+        The same client, reconfigured
+    """
+    redis_mock.reset_mock(return_value=True, side_effect=True)
+    return _configure_commands(redis_mock, overrides)
+
+
+def _configure_commands(redis_mock, overrides):
+    """Apply default command return values, the retry script and a pipeline"""
+    for name, value in {**REDIS_COMMAND_DEFAULTS, **overrides}.items():
+        # Copy mutable defaults so tests can't leak state into each other
+        if isinstance(value, (dict, set)):
+            value = value.copy()
+        getattr(redis_mock, name).return_value = value
+
+    redis_mock.retry_script.return_value = [1, 1]
+    redis_mock.find_stuck_script.return_value = []
+    return attach_scripts(attach_pipeline(redis_mock))
+
+
+def attach_scripts(redis_mock):
+    """
+    Make redis_mock.register_script() return a MockScript for each Lua script
+
+    Calls are forwarded to the retry_script / find_stuck_script mocks,
+    looked up at call time so tests may replace them after the fixture runs.
+    """
+    script_mocks = {
+        RETRY_TASK_SCRIPT: "retry_script",
+        FIND_STUCK_TASKS_SCRIPT: "find_stuck_script",
+    }
+    redis_mock.register_script = Mock(
+        side_effect=lambda source: MockScript(redis_mock, script_mocks[source])
+    )
+    return redis_mock
+
+
+class MockScript:
+    """
+    Mock registered Lua script
+
+    Like redis-py's AsyncScript, a call with client=<pipeline> is queued
+    on the pipeline instead of being run, and its result comes back from
+    execute().
+    """
+
+    def __init__(self, redis_mock, name):
+        self._redis = redis_mock
+        self._name = name
+
+    async def __call__(self, keys=None, args=None, client=None):
+        if isinstance(client, MockPipeline):
+            return getattr(client, self._name)(keys=keys, args=args)
+        return await getattr(self._redis, self._name)(keys=keys, args=args)
+
+
+def attach_scan_helpers(redis_mock):
+    """
+    Derive scan_iter(), hmget() and the in-flight index from keys() and
+    hgetall()
+
+    Lets tests keep seeding keys.return_value / hgetall side effects while
+    the code under test uses SCAN, HMGET and the PROCESSING_INDEX sorted
+    set. The in-flight index holds every task key with a task_started_at,
+    scored by it; zrangebyscore() on other keys returns its configured
+    return_value. The underlying mocks are looked up at call time, so tests
+    may replace them after the fixture runs.
+
+    FIND_STUCK_TASKS_SCRIPT is not emulated: find_stuck_script confirms
+    every candidate key it is given as still processing. Its status
+    filtering is covered against fakeredis in tests/test_redis_scripts.py.
+    """
+    async def scan_iter(match=None, count=None, **kwargs):
+        for key in await redis_mock.keys(match):
+            yield key
+
+    async def hmget(key, *fields):
+        data = await redis_mock.hgetall(key)
+        return [data.get(field) for field in fields]
+
+    async def zrangebyscore(name, min, max, *args, **kwargs):
+        if name != RedisQueueManager.PROCESSING_INDEX:
+            return DEFAULT
+        # Only the "-inf" .. "(cutoff" queries the manager issues
+        cutoff = float(str(max).lstrip("("))
+        task_ids = []
+        for key in await redis_mock.keys(f"{RedisQueueManager.TASK_PREFIX}*"):
+            task_id, started_at = await hmget(key, "task_id", "task_started_at")
+            if task_id and started_at is not None and _epoch_seconds(started_at) < cutoff:
+                task_ids.append(task_id)
+        return task_ids
+
+    async def confirm_candidates(keys=(), args=()):
+        # KEYS[1] is the in-flight index, ARGV[3:] the candidate task IDs
+        return list(args[2:])
+
+    redis_mock.scan_iter = Mock(side_effect=scan_iter)
+    redis_mock.hmget = AsyncMock(side_effect=hmget)
+    redis_mock.zrangebyscore.side_effect = zrangebyscore
+    redis_mock.find_stuck_script = AsyncMock(side_effect=confirm_candidates)
+    return attach_scripts(redis_mock)
+
+
+def _epoch_seconds(started_at):
+    """Parse a task_started_at value (epoch seconds or legacy ISO string)"""
+    try:
+        return float(started_at)
+    except ValueError:
+        return datetime.fromisoformat(started_at).replace(tzinfo=timezone.utc).timestamp()
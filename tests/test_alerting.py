@@ -5,6 +5,7 @@ import pytest
 from unittest.mock import AsyncMock, patch, MagicMock, call
 from datetime import datetime, timedelta
 from app.redis_queue import RedisQueueManager
+from tests.redis_mocks import attach_scan_helpers
 import logging
 
 
@@ -16,7 +17,7 @@ def mock_redis():
     redis_mock.keys = AsyncMock(return_value=[])
     redis_mock.hgetall = AsyncMock(return_value={})
     redis_mock.close = AsyncMock()
-    return redis_mock
+    return attach_scan_helpers(redis_mock)
 
 
 class TestStuckTaskAlerting:
@@ -25,20 +26,20 @@ class TestStuckTaskAlerting:
     @pytest.mark.asyncio
     async def test_no_alert_when_stuck_count_below_threshold(self, mock_redis):
         """Should not trigger alert when stuck tasks below threshold"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
+        with patch('app.redis_queue.aioredis.Redis', return_value=mock_redis):
             manager = RedisQueueManager("redis://localhost:6379/0")
             await manager.connect()
 
             # Mock 2 stuck tasks (below threshold of 5)
-            mock_redis.keys.return_value = [b"task:stuck-1", b"task:stuck-2"]
+            mock_redis.keys.return_value = ["task:stuck-1", "task:stuck-2"]
 
             started_at = (datetime.utcnow() - timedelta(minutes=35)).isoformat()
 
             async def hgetall_side_effect(key):
                 return {
-                    b"task_id": b"stuck-1",
-                    b"status": b"processing",
-                    b"task_started_at": started_at.encode()
+                    "task_id": "stuck-1",
+                    "status": "processing",
+                    "task_started_at": started_at
                 }
 
             mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
@@ -60,14 +61,14 @@ class TestStuckTaskAlerting:
     @pytest.mark.asyncio
     async def test_alert_triggered_when_stuck_count_exceeds_threshold(self, mock_redis):
         """Should trigger alert when stuck tasks exceed threshold"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
+        with patch('app.redis_queue.aioredis.Redis', return_value=mock_redis):
             manager = RedisQueueManager("redis://localhost:6379/0")
             await manager.connect()
 
             # Mock 6 stuck tasks (above threshold of 5)
             mock_redis.keys.return_value = [
-                b"task:stuck-1", b"task:stuck-2", b"task:stuck-3",
-                b"task:stuck-4", b"task:stuck-5", b"task:stuck-6"
+                "task:stuck-1", "task:stuck-2", "task:stuck-3",
+                "task:stuck-4", "task:stuck-5", "task:stuck-6"
             ]
 
             started_at = (datetime.utcnow() - timedelta(minutes=35)).isoformat()
@@ -77,9 +78,9 @@ class TestStuckTaskAlerting:
             async def hgetall_side_effect(key):
                 call_count[0] += 1
                 return {
-                    b"task_id": f"stuck-{call_count[0]}".encode(),
-                    b"status": b"processing",
-                    b"task_started_at": started_at.encode()
+                    "task_id": f"stuck-{call_count[0]}",
+                    "status": "processing",
+                    "task_started_at": started_at
                 }
 
             mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
@@ -106,20 +107,20 @@ class TestStuckTaskAlerting:
     @pytest.mark.asyncio
     async def test_alert_includes_task_count_in_message(self, mock_redis):
         """Should include actual task count in alert message"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
+        with patch('app.redis_queue.aioredis.Redis', return_value=mock_redis):
             manager = RedisQueueManager("redis://localhost:6379/0")
             await manager.connect()
 
             # Mock 10 stuck tasks
-            mock_redis.keys.return_value = [f"task:stuck-{i}".encode() for i in range(1, 11)]
+            mock_redis.keys.return_value = [f"task:stuck-{i}" for i in range(1, 11)]
 
             started_at = (datetime.utcnow() - timedelta(minutes=35)).isoformat()
 
             async def hgetall_side_effect(key):
                 return {
-                    b"task_id": b"stuck-x",
-                    b"status": b"processing",
-                    b"task_started_at": started_at.encode()
+                    "task_id": "stuck-x",
+                    "status": "processing",
+                    "task_started_at": started_at
                 }
 
             mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
@@ -149,20 +150,20 @@ class TestStuckTaskAlerting:
     @pytest.mark.asyncio
     async def test_alert_with_custom_threshold(self, mock_redis):
         """Should allow custom alert threshold"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
+        with patch('app.redis_queue.aioredis.Redis', return_value=mock_redis):
             manager = RedisQueueManager("redis://localhost:6379/0")
             await manager.connect()
 
             # Mock 3 stuck tasks
-            mock_redis.keys.return_value = [b"task:stuck-1", b"task:stuck-2", b"task:stuck-3"]
+            mock_redis.keys.return_value = ["task:stuck-1", "task:stuck-2", "task:stuck-3"]
 
             started_at = (datetime.utcnow() - timedelta(minutes=35)).isoformat()
 
             async def hgetall_side_effect(key):
                 return {
-                    b"task_id": b"stuck-x",
-                    b"status": b"processing",
-                    b"task_started_at": started_at.encode()
+                    "task_id": "stuck-x",
+                    "status": "processing",
+                    "task_started_at": started_at
                 }
 
             mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
@@ -184,20 +185,20 @@ class TestStuckTaskAlerting:
     @pytest.mark.asyncio
     async def test_no_alert_when_threshold_is_none(self, mock_redis):
         """Should not trigger alert when threshold is None (disabled)"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
+        with patch('app.redis_queue.aioredis.Redis', return_value=mock_redis):
             manager = RedisQueueManager("redis://localhost:6379/0")
             await manager.connect()
 
             # Mock 100 stuck tasks
-            mock_redis.keys.return_value = [f"task:stuck-{i}".encode() for i in range(1, 101)]
+            mock_redis.keys.return_value = [f"task:stuck-{i}" for i in range(1, 101)]
 
             started_at = (datetime.utcnow() - timedelta(minutes=35)).isoformat()
 
             async def hgetall_side_effect(key):
                 return {
-                    b"task_id": b"stuck-x",
-                    b"status": b"processing",
-                    b"task_started_at": started_at.encode()
+                    "task_id": "stuck-x",
+                    "status": "processing",
+                    "task_started_at": started_at
                 }
 
             mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
@@ -221,20 +222,20 @@ class TestStuckTaskAlerting:
     @pytest.mark.asyncio
     async def test_alert_logs_at_warning_level(self, mock_redis):
         """Should log alerts at WARNING level"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
+        with patch('app.redis_queue.aioredis.Redis', return_value=mock_redis):
             manager = RedisQueueManager("redis://localhost:6379/0")
             await manager.connect()
 
             # Mock enough stuck tasks to trigger alert
-            mock_redis.keys.return_value = [f"task:stuck-{i}".encode() for i in range(1, 7)]
+            mock_redis.keys.return_value = [f"task:stuck-{i}" for i in range(1, 7)]
 
             started_at = (datetime.utcnow() - timedelta(minutes=35)).isoformat()
 
             async def hgetall_side_effect(key):
                 return {
-                    b"task_id": b"stuck-x",
-                    b"status": b"processing",
-                    b"task_started_at": started_at.encode()
+                    "task_id": "stuck-x",
+                    "status": "processing",
+                    "task_started_at": started_at
                 }
 
             mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
@@ -253,20 +254,20 @@ class TestStuckTaskAlerting:
     @pytest.mark.asyncio
     async def test_multiple_alerts_on_consecutive_checks(self, mock_redis):
         """Should trigger alert on each check if count remains high"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
+        with patch('app.redis_queue.aioredis.Redis', return_value=mock_redis):
             manager = RedisQueueManager("redis://localhost:6379/0")
             await manager.connect()
 
             # Mock 6 stuck tasks
-            mock_redis.keys.return_value = [f"task:stuck-{i}".encode() for i in range(1, 7)]
+            mock_redis.keys.return_value = [f"task:stuck-{i}" for i in range(1, 7)]
 
             started_at = (datetime.utcnow() - timedelta(minutes=35)).isoformat()
 
             async def hgetall_side_effect(key):
                 return {
-                    b"task_id": b"stuck-x",
-                    b"status": b"processing",
-                    b"task_started_at": started_at.encode()
+                    "task_id": "stuck-x",
+                    "status": "processing",
+                    "task_started_at": started_at
                 }
 
             mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
@@ -289,20 +290,20 @@ class TestStuckTaskAlerting:
     @pytest.mark.asyncio
     async def test_alert_message_format(self, mock_redis):
         """Should format alert message with useful information"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
+        with patch('app.redis_queue.aioredis.Redis', return_value=mock_redis):
             manager = RedisQueueManager("redis://localhost:6379/0")
             await manager.connect()
 
             # Mock 8 stuck tasks
-            mock_redis.keys.return_value = [f"task:stuck-{i}".encode() for i in range(1, 9)]
+            mock_redis.keys.return_value = [f"task:stuck-{i}" for i in range(1, 9)]
 
             started_at = (datetime.utcnow() - timedelta(minutes=35)).isoformat()
 
             async def hgetall_side_effect(key):
                 return {
-                    b"task_id": b"stuck-x",
-                    b"status": b"processing",
-                    b"task_started_at": started_at.encode()
+                    "task_id": "stuck-x",
+                    "status": "processing",
+                    "task_started_at": started_at
                 }
 
             mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
@@ -327,20 +328,20 @@ class TestStuckTaskAlerting:
     @pytest.mark.asyncio
     async def test_default_threshold_value(self, mock_redis):
         """Should have reasonable default threshold when not specified"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
+        with patch('app.redis_queue.aioredis.Redis', return_value=mock_redis):
             manager = RedisQueueManager("redis://localhost:6379/0")
             await manager.connect()
 
             # Mock 11 stuck tasks (above default threshold of 10)
-            mock_redis.keys.return_value = [f"task:stuck-{i}".encode() for i in range(1, 12)]
+            mock_redis.keys.return_value = [f"task:stuck-{i}" for i in range(1, 12)]
 
             started_at = (datetime.utcnow() - timedelta(minutes=35)).isoformat()
 
             async def hgetall_side_effect(key):
                 return {
-                    b"task_id": b"stuck-x",
-                    b"status": b"processing",
-                    b"task_started_at": started_at.encode()
+                    "task_id": "stuck-x",
+                    "status": "processing",
+                    "task_started_at": started_at
                 }
 
             mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
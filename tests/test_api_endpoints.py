@@ -2,9 +2,15 @@
 Tests for OCR Service API Endpoints
 Following TDD methodology - these tests define the expected behavior
 """
+import asyncio
+import json
 import pytest
+import httpx
 from fastapi.testclient import TestClient
+from unittest.mock import patch
+from redis.exceptions import ConnectionError as RedisConnectionError
 from app.main import app
+from app.models import OCRResult
 import io
 from PIL import Image
 
@@ -351,6 +357,74 @@ class TestOCRStatusEndpoints:
         assert "error" in data or "detail" in data
 
 
+class TestOCRStatusStreamEndpoint:
+    """Test the server-sent status stream, against fakeredis"""
+
+    @pytest.fixture
+    def stream_app(self, fake_redis_manager):
+        """App whose routes use the fakeredis-backed queue manager"""
+        with patch('app.routes.get_redis_queue_manager', return_value=fake_redis_manager):
+            yield app
+
+    async def test_stream_sends_status_then_changes_until_completed(self, stream_app, fake_redis_manager):
+        """Test the stream starts with the stored status and ends on completion"""
+        task_id = await fake_redis_manager.create_task(document_id="doc-1")
+        channel = f"progress:{task_id}"
+
+        async def run_worker():
+            # Wait for the stream's subscription before publishing
+            while (await fake_redis_manager.redis.pubsub_numsub(channel))[0][1] == 0:
+                await asyncio.sleep(0.01)
+            await fake_redis_manager.update_task_progress(task_id, 40, "Processed page 1/2")
+            await fake_redis_manager.store_result(task_id, OCRResult(
+                task_id=task_id, text="text", confidence=90.0, language="eng",
+                page_count=1, processing_time=0.1
+            ))
+
+        transport = httpx.ASGITransport(app=stream_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            worker = asyncio.create_task(run_worker())
+            response = await asyncio.wait_for(
+                http.get(f"/api/v1/ocr/status/{task_id}/stream"), timeout=5
+            )
+            await worker
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [
+            json.loads(line[len("data: "):])
+            for line in response.text.splitlines() if line.startswith("data: ")
+        ]
+        assert [(event["status"], event["progress"]) for event in events] == [
+            ("queued", 0), ("processing", 40), ("completed", 100)
+        ]
+        assert (await fake_redis_manager.redis.pubsub_numsub(channel))[0][1] == 0
+
+    async def test_stream_unknown_task_returns_404(self, stream_app):
+        """Test streaming a missing task is rejected before streaming"""
+        transport = httpx.ASGITransport(app=stream_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            response = await http.get("/api/v1/ocr/status/missing-task/stream")
+
+        assert response.status_code == 404
+
+    async def test_stream_returns_503_when_subscriptions_exhausted(self, stream_app, fake_redis_manager):
+        """Test a stream that can't subscribe is rejected instead of started"""
+        task_id = await fake_redis_manager.create_task(document_id="doc-1")
+
+        async def full_pool(task_id, timeout=None):
+            raise RedisConnectionError("Too many connections")
+            yield
+
+        transport = httpx.ASGITransport(app=stream_app)
+        with patch.object(fake_redis_manager, "subscribe_progress", full_pool):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                response = await http.get(f"/api/v1/ocr/status/{task_id}/stream")
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "30"
+
+
 @pytest.mark.usefixtures("initialize_test_app")
 class TestOCRResultEndpoints:
     """Test OCR result retrieval endpoints"""
@@ -32,7 +32,7 @@ class TestTaskMetrics:
     @pytest.mark.asyncio
     async def test_metrics_track_task_completion_time(self, mock_redis):
         """Should track duration from task start to completion"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis) as mock_from_url:
+        with patch('app.redis_queue.aioredis.Redis', return_value=mock_redis):
             manager = RedisQueueManager("redis://localhost:6379/0")
             await manager.connect()
 
@@ -42,10 +42,10 @@ class TestTaskMetrics:
             # Mock task data
             async def hgetall_side_effect(key):
                 return {
-                    b"task_id": b"duration-task-123",
-                    b"status": b"processing",
-                    b"task_started_at": started_at.encode(),
-                    b"created_at": (datetime.utcnow() - timedelta(minutes=6)).isoformat().encode()
+                    "task_id": "duration-task-123",
+                    "status": "processing",
+                    "task_started_at": started_at,
+                    "created_at": (datetime.utcnow() - timedelta(minutes=6)).isoformat()
                 }
 
             mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
@@ -61,15 +61,15 @@ class TestTaskMetrics:
     @pytest.mark.asyncio
     async def test_metrics_track_success_rate(self, mock_redis):
         """Should calculate success rate from completed vs failed tasks"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis) as mock_from_url:
+        with patch('app.redis_queue.aioredis.Redis', return_value=mock_redis):
             manager = RedisQueueManager("redis://localhost:6379/0")
             await manager.connect()
 
             # Mock metrics data: 80 completed, 20 failed
             mock_redis.get = AsyncMock(side_effect=lambda key: {
-                b"metrics:tasks:completed": b"80",
-                b"metrics:tasks:failed": b"20"
-            }.get(key.encode() if isinstance(key, str) else key, b"0"))
+                "metrics:tasks:completed": "80",
+                "metrics:tasks:failed": "20"
+            }.get(key, "0"))
 
             # Get aggregate metrics
             metrics = await manager.get_aggregate_metrics()
@@ -87,15 +87,15 @@ class TestTaskMetrics:
     @pytest.mark.asyncio
     async def test_metrics_track_retry_rate(self, mock_redis):
         """Should calculate retry rate from retry attempts"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis) as mock_from_url:
+        with patch('app.redis_queue.aioredis.Redis', return_value=mock_redis):
             manager = RedisQueueManager("redis://localhost:6379/0")
             await manager.connect()
 
             # Mock: 100 total tasks, 25 retries
             mock_redis.get = AsyncMock(side_effect=lambda key: {
-                b"metrics:tasks:total": b"100",
-                b"metrics:tasks:retried": b"25"
-            }.get(key.encode() if isinstance(key, str) else key, b"0"))
+                "metrics:tasks:total": "100",
+                "metrics:tasks:retried": "25"
+            }.get(key, "0"))
 
             metrics = await manager.get_aggregate_metrics()
 
@@ -111,7 +111,7 @@ class TestTaskMetrics:
     @pytest.mark.asyncio
     async def test_metrics_increment_on_task_completion(self, mock_redis):
         """Should increment completed counter when task completes"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis) as mock_from_url:
+        with patch('app.redis_queue.aioredis.Redis', return_value=mock_redis):
             manager = RedisQueueManager("redis://localhost:6379/0")
             await manager.connect()
 
@@ -120,9 +120,9 @@ class TestTaskMetrics:
             # Mock task data
             async def hgetall_side_effect(key):
                 return {
-                    b"task_id": b"complete-task-123",
-                    b"status": b"processing",
-                    b"task_started_at": datetime.utcnow().isoformat().encode()
+                    "task_id": "complete-task-123",
+                    "status": "processing",
+                    "task_started_at": datetime.utcnow().isoformat()
                 }
 
             mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
@@ -138,7 +138,7 @@ class TestTaskMetrics:
     @pytest.mark.asyncio
     async def test_metrics_increment_on_task_failure(self, mock_redis):
         """Should increment failed counter when task fails"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis) as mock_from_url:
+        with patch('app.redis_queue.aioredis.Redis', return_value=mock_redis):
             manager = RedisQueueManager("redis://localhost:6379/0")
             await manager.connect()
 
@@ -155,15 +155,15 @@ class TestTaskMetrics:
     @pytest.mark.asyncio
     async def test_metrics_track_average_processing_time(self, mock_redis):
         """Should calculate average processing time across all tasks"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis) as mock_from_url:
+        with patch('app.redis_queue.aioredis.Redis', return_value=mock_redis):
             manager = RedisQueueManager("redis://localhost:6379/0")
             await manager.connect()
 
             # Mock: total duration 1000 seconds, 20 tasks = 50 sec average
             mock_redis.get = AsyncMock(side_effect=lambda key: {
-                b"metrics:tasks:total_duration": b"1000",
-                b"metrics:tasks:completed": b"20"
-            }.get(key.encode() if isinstance(key, str) else key, b"0"))
+                "metrics:tasks:total_duration": "1000",
+                "metrics:tasks:completed": "20"
+            }.get(key, "0"))
 
             metrics = await manager.get_aggregate_metrics()
 
@@ -177,7 +177,7 @@ class TestTaskMetrics:
     @pytest.mark.asyncio
     async def test_metrics_stored_in_redis_with_ttl(self, mock_redis):
         """Should store metrics in Redis with expiration"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis) as mock_from_url:
+        with patch('app.redis_queue.aioredis.Redis', return_value=mock_redis):
             manager = RedisQueueManager("redis://localhost:6379/0")
             await manager.connect()
 
@@ -196,17 +196,17 @@ class TestTaskMetrics:
     @pytest.mark.asyncio
     async def test_metrics_include_retry_count_in_stats(self, mock_redis):
         """Should include retry statistics in metrics"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis) as mock_from_url:
+        with patch('app.redis_queue.aioredis.Redis', return_value=mock_redis):
             manager = RedisQueueManager("redis://localhost:6379/0")
             await manager.connect()
 
             # Mock various retry counts
             mock_redis.get = AsyncMock(side_effect=lambda key: {
-                b"metrics:tasks:retry_0": b"70",  # No retries
-                b"metrics:tasks:retry_1": b"20",  # 1 retry
-                b"metrics:tasks:retry_2": b"7",   # 2 retries
-                b"metrics:tasks:retry_3": b"3"    # 3 retries (max)
-            }.get(key.encode() if isinstance(key, str) else key, b"0"))
+                "metrics:tasks:retry_0": "70",  # No retries
+                "metrics:tasks:retry_1": "20",  # 1 retry
+                "metrics:tasks:retry_2": "7",   # 2 retries
+                "metrics:tasks:retry_3": "3"    # 3 retries (max)
+            }.get(key, "0"))
 
             metrics = await manager.get_aggregate_metrics()
 
@@ -220,7 +220,7 @@ class TestTaskMetrics:
     @pytest.mark.asyncio
     async def test_metrics_track_tasks_in_dlq(self, mock_redis):
         """Should track count of tasks moved to dead letter queue"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis) as mock_from_url:
+        with patch('app.redis_queue.aioredis.Redis', return_value=mock_redis):
             manager = RedisQueueManager("redis://localhost:6379/0")
             await manager.connect()
 
@@ -239,9 +239,9 @@ class TestTaskMetrics:
     async def test_metrics_reset_functionality(self, mock_redis):
         """Should allow resetting metrics counters"""
         # Mock that there are some metrics keys to delete
-        mock_redis.keys = AsyncMock(return_value=[b"metrics:tasks:completed", b"metrics:tasks:failed"])
+        mock_redis.keys = AsyncMock(return_value=["metrics:tasks:completed", "metrics:tasks:failed"])
 
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis) as mock_from_url:
+        with patch('app.redis_queue.aioredis.Redis', return_value=mock_redis):
             manager = RedisQueueManager("redis://localhost:6379/0")
             await manager.connect()
 
@@ -260,7 +260,7 @@ class TestTaskMetrics:
     @pytest.mark.asyncio
     async def test_metrics_handle_missing_data_gracefully(self, mock_redis):
         """Should return default values when metrics data is missing"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis) as mock_from_url:
+        with patch('app.redis_queue.aioredis.Redis', return_value=mock_redis):
             manager = RedisQueueManager("redis://localhost:6379/0")
             await manager.connect()
 
@@ -282,17 +282,17 @@ class TestTaskMetrics:
     @pytest.mark.asyncio
     async def test_metrics_calculate_percentiles(self, mock_redis):
         """Should calculate duration percentiles (p50, p95, p99)"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis) as mock_from_url:
+        with patch('app.redis_queue.aioredis.Redis', return_value=mock_redis):
             manager = RedisQueueManager("redis://localhost:6379/0")
             await manager.connect()
 
             # This would require storing duration history
             # Mock percentile data
             mock_redis.get = AsyncMock(side_effect=lambda key: {
-                b"metrics:duration:p50": b"30",
-                b"metrics:duration:p95": b"120",
-                b"metrics:duration:p99": b"180"
-            }.get(key.encode() if isinstance(key, str) else key, None))
+                "metrics:duration:p50": "30",
+                "metrics:duration:p95": "120",
+                "metrics:duration:p99": "180"
+            }.get(key, None))
 
             metrics = await manager.get_aggregate_metrics()
 
@@ -306,7 +306,7 @@ class TestTaskMetrics:
     @pytest.mark.asyncio
     async def test_metrics_track_time_windows(self, mock_redis):
         """Should track metrics for different time windows (1h, 24h, 7d)"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis) as mock_from_url:
+        with patch('app.redis_queue.aioredis.Redis', return_value=mock_redis):
             manager = RedisQueueManager("redis://localhost:6379/0")
             await manager.connect()
 
@@ -7,7 +7,9 @@ import json
 from datetime import datetime
 from unittest.mock import AsyncMock, Mock
 
+from app.models import TaskStatus
 from app.redis_queue import RedisQueueManager
+from tests.redis_mocks import attach_pipeline
 
 
 class TestProgressHistoryTracking:
@@ -16,7 +18,7 @@ class TestProgressHistoryTracking:
     @pytest.fixture
     async def redis_manager(self):
         """Create Redis queue manager with mocked Redis"""
-        mock_redis = AsyncMock()
+        mock_redis = attach_pipeline(AsyncMock())
         manager = RedisQueueManager(redis_url="redis://localhost")
         manager.redis = mock_redis
         return manager
@@ -51,6 +53,104 @@ class TestProgressHistoryTracking:
         assert data['status'] == status
         assert 'timestamp' in data
 
+    @pytest.mark.asyncio
+    async def test_update_task_progress_writes_status_and_history_together(self, redis_manager):
+        """Test milestone progress and its history entry share one pipeline"""
+        task_id = "task-123"
+
+        await redis_manager.update_task_progress(
+            task_id, 50, "Processed page 2/4", record_history=True
+        )
+
+        redis_manager.redis.pipeline.assert_called_once_with(transaction=False)
+        redis_manager.redis.exists.assert_not_called()
+
+        task_key, = redis_manager.redis.hset.call_args[0]
+        mapping = redis_manager.redis.hset.call_args[1]['mapping']
+        assert task_key == f"task:{task_id}"
+        assert mapping['status'] == "processing"
+        assert mapping['progress'] == "50"
+        assert mapping['message'] == "Processed page 2/4"
+
+        history_key, entry = redis_manager.redis.lpush.call_args[0]
+        assert history_key == f"task:{task_id}:progress_history"
+        assert json.loads(entry)['progress'] == 50
+        redis_manager.redis.ltrim.assert_called_once_with(history_key, 0, 9)
+
+    @pytest.mark.asyncio
+    async def test_update_task_progress_records_separate_history_operation(self, redis_manager):
+        """Test the history entry can describe the operation apart from the message"""
+        await redis_manager.update_task_progress(
+            "task-123", 50, "Processed page 2/4", record_history=True,
+            operation="Performing OCR on page 2/4"
+        )
+
+        assert redis_manager.redis.hset.call_args[1]['mapping']['message'] == "Processed page 2/4"
+        _, entry = redis_manager.redis.lpush.call_args[0]
+        assert json.loads(entry)['operation'] == "Performing OCR on page 2/4"
+
+    @pytest.mark.asyncio
+    async def test_update_task_progress_publishes_to_progress_channel(self, redis_manager):
+        """Test every progress update is streamed to the task's channel"""
+        await redis_manager.update_task_progress("task-123", 40, "Processed page 1/4")
+
+        channel, message = redis_manager.redis.publish.call_args[0]
+        assert channel == "progress:task-123"
+        assert channel == f"{RedisQueueManager.PROGRESS_CHANNEL_PREFIX}task-123"
+        event = json.loads(message)
+        assert event["task_id"] == "task-123"
+        assert event["status"] == "processing"
+        assert event["progress"] == 40
+        assert event["message"] == "Processed page 1/4"
+        assert event["updated_at"] == redis_manager.redis.hset.call_args[1]["mapping"]["updated_at"]
+
+    @pytest.mark.asyncio
+    async def test_progress_channel_event_decodes_for_subscribers(self, fake_redis_manager):
+        """Test a subscriber on the service's decoding connection reads the event"""
+        pubsub = fake_redis_manager.redis.pubsub()
+        await pubsub.subscribe("progress:task-123")
+        try:
+            assert (await pubsub.get_message(timeout=1))["type"] == "subscribe"
+            await fake_redis_manager.update_task_progress("task-123", 40, "Przetworzono stronę 1/4")
+            message = await pubsub.get_message(timeout=1)
+        finally:
+            await pubsub.aclose()
+
+        event = json.loads(message["data"])
+        assert event["task_id"] == "task-123"
+        assert event["progress"] == 40
+        assert event["message"] == "Przetworzono stronę 1/4"
+
+    @pytest.mark.asyncio
+    async def test_subscribe_progress_yields_published_changes(self, fake_redis_manager):
+        """Test subscribers get progress and status changes, and None when idle"""
+        task_id = await fake_redis_manager.create_task()
+        events = fake_redis_manager.subscribe_progress(task_id, timeout=0.05)
+
+        assert await events.__anext__() is None
+        await fake_redis_manager.update_task_progress(task_id, 40, "Processed page 1/4")
+        await fake_redis_manager.update_task_status(task_id, TaskStatus.FAILED, message="Boom")
+
+        progress = await events.__anext__()
+        failed = await events.__anext__()
+        idle = await events.__anext__()
+        await events.aclose()
+
+        assert (progress["task_id"], progress["status"], progress["progress"]) == (
+            task_id, "processing", 40
+        )
+        assert (failed["status"], failed["message"]) == ("failed", "Boom")
+        assert idle is None
+        assert (await fake_redis_manager.redis.pubsub_numsub(f"progress:{task_id}"))[0][1] == 0
+
+    @pytest.mark.asyncio
+    async def test_update_task_progress_without_history(self, redis_manager):
+        """Test per-page progress updates skip the history list"""
+        await redis_manager.update_task_progress("task-123", 40, "Processed page 1/4")
+
+        redis_manager.redis.hset.assert_called_once()
+        redis_manager.redis.lpush.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_progress_history_limited_to_10_entries(self, redis_manager):
         """Test that progress history is trimmed to last 10 entries"""
@@ -96,7 +196,7 @@ class TestProgressHistoryTracking:
                 "status": "processing"
             })
         ]
-        redis_manager.redis.lrange = AsyncMock(return_value=[s.encode() for s in mock_history])
+        redis_manager.redis.lrange = AsyncMock(return_value=mock_history)
 
         history = await redis_manager.get_progress_history(task_id)
 
@@ -166,7 +266,7 @@ class TestProgressHistoryTracking:
             mock_history.insert(0, entry)  # Insert at beginning (newest first)
 
         redis_manager.redis.lrange = AsyncMock(
-            return_value=[s.encode() for s in mock_history]
+            return_value=mock_history
         )
 
         history = await redis_manager.get_progress_history(task_id)
@@ -232,7 +332,7 @@ class TestProgressHistoryTracking:
                        "progress": i*10, "operation": f"Step {i}", "status": "processing"})
             for i in range(10, 0, -1)  # 10 entries
         ]
-        redis_manager.redis.lrange = AsyncMock(return_value=[s.encode() for s in mock_history])
+        redis_manager.redis.lrange = AsyncMock(return_value=mock_history)
 
         # Get only last 5 entries
         history = await redis_manager.get_progress_history(task_id, limit=5)
@@ -248,12 +348,12 @@ class TestProgressHistoryTracking:
         task_id = "task-123"
 
         # Mock delete_task to delete history as well
-        redis_manager.redis.delete = AsyncMock()
+        redis_manager.redis.unlink = AsyncMock(return_value=1)
 
         await redis_manager.delete_task(task_id)
 
         # Should delete both task and its progress history
-        delete_calls = redis_manager.redis.delete.call_args_list
+        delete_calls = redis_manager.redis.unlink.call_args_list
         deleted_keys = [call[0][0] for call in delete_calls]
 
         assert f"task:{task_id}" in deleted_keys or \
@@ -1,300 +1,374 @@
 """
 Tests for Redis queue cleanup functionality
 """
+import asyncio
 import pytest
-from datetime import datetime, timedelta
-from unittest.mock import AsyncMock, patch
-from app.redis_queue import RedisQueueManager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, call
 from app.models import TaskStatus
+from tests.redis_mocks import attach_scan_helpers, reset_redis_mock
+
+
+@pytest.fixture(autouse=True)
+def mock_redis(connected_redis):
+    """Mock Redis client for cleanup tests, reset to its defaults"""
+    _, redis_mock = connected_redis
+    return attach_scan_helpers(reset_redis_mock(redis_mock, keys=[]))
 
 
 @pytest.fixture
-def mock_redis():
-    """Mock Redis client for cleanup tests"""
-    redis_mock = AsyncMock()
-    redis_mock.ping = AsyncMock(return_value=True)
-    redis_mock.keys = AsyncMock(return_value=[])
-    redis_mock.hgetall = AsyncMock(return_value={})
-    redis_mock.exists = AsyncMock(return_value=0)
-    redis_mock.delete = AsyncMock(return_value=1)
-    redis_mock.close = AsyncMock()
-    return redis_mock
+def manager(connected_redis):
+    """RedisQueueManager connected to the shared mock client"""
+    return connected_redis[0]
+
+
+def epoch_ms(value: datetime) -> int:
+    """Convert a naive UTC datetime to epoch milliseconds"""
+    return int(value.replace(tzinfo=timezone.utc).timestamp() * 1000)
 
 
 class TestRedisTaskCleanup:
     """Test suite for cleaning up old completed tasks from Redis"""
 
     @pytest.mark.asyncio
-    async def test_find_old_completed_tasks_returns_empty_when_no_tasks(self, mock_redis):
+    async def test_find_old_completed_tasks_returns_empty_when_no_tasks(self, manager, mock_redis):
         """Should return empty list when no completed tasks exist"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
-            manager = RedisQueueManager("redis://localhost:6379/0")
-            await manager.connect()
-
-            mock_redis.keys.return_value = []
+        mock_redis.zrangebyscore.return_value = []
 
-            cutoff_date = datetime.utcnow() - timedelta(days=7)
-            old_tasks = await manager.find_old_completed_tasks(cutoff_date)
+        cutoff_date = datetime.utcnow() - timedelta(days=7)
+        old_tasks = await manager.find_old_completed_tasks(cutoff_date)
 
-            assert old_tasks == []
-            await manager.disconnect()
+        assert old_tasks == []
 
     @pytest.mark.asyncio
-    async def test_find_old_completed_tasks_returns_tasks_older_than_cutoff(self, mock_redis):
-        """Should return only completed tasks older than cutoff date"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
-            manager = RedisQueueManager("redis://localhost:6379/0")
-            await manager.connect()
-
-            # Mock Redis keys() to return two task keys
-            mock_redis.keys.return_value = [b"task:old-123", b"task:recent-456"]
-
-            # Mock old task (8 days ago) and recent task (2 days ago)
-            old_timestamp = (datetime.utcnow() - timedelta(days=8)).isoformat()
-            recent_timestamp = (datetime.utcnow() - timedelta(days=2)).isoformat()
-
-            # Create AsyncMock for hgetall that returns different values
-            call_count = [0]
-
-            async def hgetall_side_effect(key):
-                call_count[0] += 1
-                if call_count[0] == 1:  # First call for old task
-                    return {
-                        b"task_id": b"old-123",
-                        b"status": b"completed",
-                        b"completed_at": old_timestamp.encode()
-                    }
-                else:  # Second call for recent task
-                    return {
-                        b"task_id": b"recent-456",
-                        b"status": b"completed",
-                        b"completed_at": recent_timestamp.encode()
-                    }
-
-            mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
-
-            cutoff_date = datetime.utcnow() - timedelta(days=7)
-            old_tasks = await manager.find_old_completed_tasks(cutoff_date)
-
-            assert len(old_tasks) == 1
-            assert old_tasks[0] == "old-123"
-
-            await manager.disconnect()
+    async def test_find_old_completed_tasks_returns_tasks_older_than_cutoff(self, manager, mock_redis):
+        """Should read tasks completed strictly before the cutoff from the index"""
+        mock_redis.zrangebyscore.return_value = ["old-123"]
 
-    @pytest.mark.asyncio
-    async def test_find_old_completed_tasks_excludes_non_completed_tasks(self, mock_redis):
-        """Should only return COMPLETED tasks, not PROCESSING or FAILED"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
-            manager = RedisQueueManager("redis://localhost:6379/0")
-            await manager.connect()
-
-            mock_redis.keys.return_value = [b"task:proc-123", b"task:failed-456", b"task:done-789"]
-
-            old_timestamp = (datetime.utcnow() - timedelta(days=10)).isoformat()
-
-            call_count = [0]
-
-            async def hgetall_side_effect(key):
-                call_count[0] += 1
-                if call_count[0] == 1:  # Processing task
-                    return {
-                        b"task_id": b"proc-123",
-                        b"status": b"processing",
-                        b"task_started_at": old_timestamp.encode()
-                    }
-                elif call_count[0] == 2:  # Failed task
-                    return {
-                        b"task_id": b"failed-456",
-                        b"status": b"FAILED",
-                        b"completed_at": old_timestamp.encode()
-                    }
-                else:  # Completed task
-                    return {
-                        b"task_id": b"done-789",
-                        b"status": b"completed",
-                        b"completed_at": old_timestamp.encode()
-                    }
-
-            mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
-
-            cutoff_date = datetime.utcnow() - timedelta(days=7)
-            old_tasks = await manager.find_old_completed_tasks(cutoff_date)
-
-            assert len(old_tasks) == 1
-            assert old_tasks[0] == "done-789"
-
-            await manager.disconnect()
+        cutoff_date = datetime.utcnow() - timedelta(days=7)
+        old_tasks = await manager.find_old_completed_tasks(cutoff_date)
 
-    @pytest.mark.asyncio
-    async def test_delete_task_removes_task_from_redis(self, mock_redis):
-        """Should completely remove task data from Redis"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
-            manager = RedisQueueManager("redis://localhost:6379/0")
-            await manager.connect()
+        assert old_tasks == ["old-123"]
+        mock_redis.zrangebyscore.assert_called_once_with(
+            manager.COMPLETED_INDEX, "-inf", f"({epoch_ms(cutoff_date)}"
+        )
 
-            mock_redis.exists.return_value = 1
-            mock_redis.delete.return_value = 2  # Both task and result deleted
+        # No keyspace scan or per-task reads
+        mock_redis.keys.assert_not_called()
+        mock_redis.scan_iter.assert_not_called()
+        mock_redis.hgetall.assert_not_called()
 
-            deleted = await manager.delete_task("task-123")
+    @pytest.mark.asyncio
+    async def test_delete_task_removes_task_from_redis(self, manager, mock_redis):
+        """Should completely remove task data from Redis"""
+        mock_redis.unlink.return_value = 2  # Both task and result deleted
 
-            assert deleted is True
-            mock_redis.delete.assert_called_once()
+        deleted = await manager.delete_task("task-123")
 
-            await manager.disconnect()
+        assert deleted is True
+        mock_redis.unlink.assert_called_once_with(
+            "task:task-123", "result:task-123", "task:task-123:progress_history"
+        )
+        assert mock_redis.zrem.call_args_list == [
+            call(manager.COMPLETED_INDEX, "task-123"),
+            call(manager.PROCESSING_INDEX, "task-123"),
+        ]
+        mock_redis.pipeline.assert_called_once_with(transaction=True)
+        mock_redis.exists.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_delete_task_returns_false_for_nonexistent_task(self, mock_redis):
+    async def test_delete_task_returns_false_for_nonexistent_task(self, manager, mock_redis):
         """Should return False when trying to delete non-existent task"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
-            manager = RedisQueueManager("redis://localhost:6379/0")
-            await manager.connect()
+        mock_redis.unlink.return_value = 0
+
+        deleted = await manager.delete_task("nonexistent-task-id")
 
-            mock_redis.exists.return_value = 0
+        assert deleted is False
 
-            deleted = await manager.delete_task("nonexistent-task-id")
+    @pytest.mark.asyncio
+    async def test_delete_task_drops_in_flight_index_entry(self, fake_redis_manager):
+        """Should leave no in-flight index entry behind for a deleted task"""
+        task_id = await fake_redis_manager.create_task()
+        await fake_redis_manager.dequeue_task()
 
-            assert deleted is False
+        assert await fake_redis_manager.delete_task(task_id) is True
 
-            await manager.disconnect()
+        assert await fake_redis_manager.redis.zcard(fake_redis_manager.PROCESSING_INDEX) == 0
+        assert await fake_redis_manager.task_exists(task_id) is False
+        assert await fake_redis_manager.delete_task(task_id) is False
 
     @pytest.mark.asyncio
-    async def test_cleanup_old_completed_tasks_removes_multiple_tasks(self, mock_redis):
+    async def test_cleanup_old_completed_tasks_removes_multiple_tasks(self, manager, mock_redis):
         """Should delete multiple old completed tasks in one operation"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
-            manager = RedisQueueManager("redis://localhost:6379/0")
-            await manager.connect()
+        # Mock 5 old tasks in the completion index
+        mock_redis.zrangebyscore.return_value = ["1", "2", "3", "4", "5"]
 
-            # Mock 5 old tasks
-            mock_redis.keys.return_value = [
-                b"task:1", b"task:2", b"task:3", b"task:4", b"task:5"
-            ]
+        # Mock successful deletions
+        mock_redis.unlink.return_value = 2
 
-            old_timestamp = (datetime.utcnow() - timedelta(days=10)).isoformat()
+        cutoff_date = datetime.utcnow() - timedelta(days=7)
+        deleted_count = await manager.cleanup_old_completed_tasks(cutoff_date)
 
-            call_count = [0]
+        assert deleted_count == 5
 
-            # Mock all tasks as completed and old
-            async def hgetall_side_effect(key):
-                call_count[0] += 1
-                task_num = call_count[0]
-                return {
-                    b"task_id": f"{task_num}".encode(),
-                    b"status": b"completed",
-                    b"completed_at": old_timestamp.encode()
-                }
+        # Deletes are issued without per-task EXISTS checks
+        mock_redis.exists.assert_not_called()
+        assert mock_redis.unlink.call_count == 5
+        mock_redis.unlink.assert_any_call("task:1", "result:1", "task:1:progress_history")
+
+        # Deleted tasks are dropped from the index
+        mock_redis.zrem.assert_called_once_with(
+            manager.COMPLETED_INDEX, "1", "2", "3", "4", "5"
+        )
+
+    @pytest.mark.asyncio
+    async def test_cleanup_old_completed_tasks_processes_in_chunks(self, manager, mock_redis):
+        """Should delete old tasks chunk by chunk"""
+        mock_redis.zrangebyscore.return_value = [str(i) for i in range(1, 6)]
+        mock_redis.unlink.return_value = 2
+
+        cutoff_date = datetime.utcnow() - timedelta(days=7)
+        deleted_count = await manager.cleanup_old_completed_tasks(
+            cutoff_date, chunk_size=2, concurrency=2
+        )
+
+        assert deleted_count == 5
+        # 3 chunks (2 + 2 + 1 tasks), one delete pipeline each
+        assert mock_redis.pipeline.call_count == 3
+        deleted_keys = {call.args[0] for call in mock_redis.unlink.call_args_list}
+        assert deleted_keys == {f"task:{i}" for i in range(1, 6)}
+        assert mock_redis.zrem.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_cleanup_old_completed_tasks_bounds_chunks_in_flight(self, manager, mock_redis):
+        """Should never run more than `concurrency` chunk pipelines at once"""
+        mock_redis.zrangebyscore.return_value = [str(i) for i in range(1, 11)]
+        in_flight = 0
+        max_in_flight = 0
+
+        async def zrem_side_effect(key, *task_ids):
+            # zrem is the last command of each chunk pipeline
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return len(task_ids)
+
+        mock_redis.zrem.side_effect = zrem_side_effect
+
+        cutoff_date = datetime.utcnow() - timedelta(days=7)
+        deleted_count = await manager.cleanup_old_completed_tasks(
+            cutoff_date, chunk_size=2, concurrency=2
+        )
+
+        assert deleted_count == 10
+        assert mock_redis.zrem.call_count == 5
+        assert max_in_flight == 2
 
-            mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
+    @pytest.mark.asyncio
+    async def test_cleanup_old_completed_tasks_counts_only_existing_tasks(self, manager, mock_redis):
+        """Should not count index entries whose task was already removed"""
+        mock_redis.zrangebyscore.return_value = ["1", "2"]
 
-            # Mock successful deletions
-            mock_redis.exists.return_value = 1
-            mock_redis.delete.return_value = 2
+        async def unlink_side_effect(task_key, *keys):
+            return 0 if task_key == "task:2" else 2
 
-            cutoff_date = datetime.utcnow() - timedelta(days=7)
-            deleted_count = await manager.cleanup_old_completed_tasks(cutoff_date)
+        mock_redis.unlink = AsyncMock(side_effect=unlink_side_effect)
 
-            assert deleted_count == 5
+        cutoff_date = datetime.utcnow() - timedelta(days=7)
+        deleted_count = await manager.cleanup_old_completed_tasks(cutoff_date)
 
-            await manager.disconnect()
+        assert deleted_count == 1
+        # Stale index entry is still removed
+        mock_redis.zrem.assert_called_once_with(manager.COMPLETED_INDEX, "1", "2")
 
     @pytest.mark.asyncio
-    async def test_cleanup_old_completed_tasks_with_dry_run(self, mock_redis):
+    async def test_cleanup_old_completed_tasks_with_dry_run(self, manager, mock_redis):
         """Should not delete tasks when dry_run is True"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
-            manager = RedisQueueManager("redis://localhost:6379/0")
-            await manager.connect()
+        mock_redis.zcount.return_value = 1
+
+        cutoff_date = datetime.utcnow() - timedelta(days=7)
+        deleted_count = await manager.cleanup_old_completed_tasks(cutoff_date, dry_run=True)
+
+        # Should report what would be deleted
+        assert deleted_count == 1
+        mock_redis.zcount.assert_called_once_with(
+            manager.COMPLETED_INDEX, "-inf", f"({epoch_ms(cutoff_date)}"
+        )
+
+        # But nothing should be unlinked
+        mock_redis.unlink.assert_not_called()
+        mock_redis.zrem.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_cleanup_old_completed_tasks_returns_zero_when_no_old_tasks(self, manager, mock_redis):
+        """Should return 0 when no old tasks to cleanup"""
+        mock_redis.zrangebyscore.return_value = []
+
+        # Try to cleanup tasks older than 7 days
+        cutoff_date = datetime.utcnow() - timedelta(days=7)
+        deleted_count = await manager.cleanup_old_completed_tasks(cutoff_date)
+
+        assert deleted_count == 0
+        mock_redis.pipeline.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_store_result_indexes_completed_task(self, manager, mock_redis):
+        """Should add completed tasks to the index in the same transaction"""
+        from app.models import OCRResult
 
-            mock_redis.keys.return_value = [b"task:123"]
+        result = OCRResult(text="Sample", confidence=90.0, language="eng", processing_time=1.0)
+        await manager.store_result("done-789", result)
 
-            old_timestamp = (datetime.utcnow() - timedelta(days=10)).isoformat()
+        mock_redis.pipeline.assert_called_once_with(transaction=True)
+        mapping = mock_redis.hset.call_args.kwargs["mapping"]
+        mock_redis.zadd.assert_called_once_with(
+            manager.COMPLETED_INDEX, {"done-789": mapping["completed_at_ms"]}
+        )
+        # and leave the in-flight index
+        mock_redis.zrem.assert_called_once_with(manager.PROCESSING_INDEX, "done-789")
 
-            async def hgetall_side_effect(key):
+
+class TestCompletedIndexBackfill:
+    """Test suite for indexing tasks completed before the completion index existed"""
+
+    @pytest.mark.asyncio
+    async def test_backfill_indexes_completed_tasks(self, manager, mock_redis):
+        """Should index completed tasks by their completion time"""
+        mock_redis.keys.return_value = ["task:old-123", "task:recent-456"]
+
+        old_completed = datetime.utcnow() - timedelta(days=8)
+        recent_completed = datetime.utcnow() - timedelta(days=2)
+
+        async def hgetall_side_effect(key):
+            if key == "task:old-123":
                 return {
-                    b"task_id": b"123",
-                    b"status": b"completed",
-                    b"completed_at": old_timestamp.encode()
+                    "task_id": "old-123",
+                    "status": "completed",
+                    "completed_at": old_completed.isoformat()
                 }
+            return {
+                "task_id": "recent-456",
+                "status": "completed",
+                "completed_at": recent_completed.isoformat()
+            }
 
-            mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
+        mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
 
-            cutoff_date = datetime.utcnow() - timedelta(days=7)
-            deleted_count = await manager.cleanup_old_completed_tasks(cutoff_date, dry_run=True)
+        indexed = await manager.backfill_completed_index()
 
-            # Should report what would be deleted
-            assert deleted_count == 1
+        assert indexed == 2
+        mock_redis.zadd.assert_called_once_with(manager.COMPLETED_INDEX, {
+            "old-123": epoch_ms(old_completed),
+            "recent-456": epoch_ms(recent_completed),
+        })
 
-            # But delete should not be called
-            mock_redis.delete.assert_not_called()
+        # Keys are scanned incrementally, never listed with KEYS
+        mock_redis.scan_iter.assert_called_once_with(match="task:*", count=manager.SCAN_COUNT)
 
-            await manager.disconnect()
+        # Task fields are fetched through one non-transactional pipeline
+        mock_redis.pipeline.assert_called_once_with(transaction=False)
+        mock_redis.hmget.assert_any_call(
+            "task:old-123", "task_id", "status", "completed_at_ms", "completed_at"
+        )
 
     @pytest.mark.asyncio
-    async def test_cleanup_old_completed_tasks_handles_missing_completed_at(self, mock_redis):
-        """Should skip tasks without completed_at timestamp"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
-            manager = RedisQueueManager("redis://localhost:6379/0")
-            await manager.connect()
-
-            mock_redis.keys.return_value = [b"task:123"]
-
-            # Task without completed_at
-            mock_redis.hgetall.return_value = {
-                b"task_id": b"123",
-                b"status": b"completed"
+    async def test_backfill_prefers_epoch_ms_timestamp(self, manager, mock_redis):
+        """Should use completed_at_ms when present instead of parsing the ISO string"""
+        mock_redis.keys.return_value = ["task:old-123"]
+        mock_redis.hgetall.return_value = {
+            "task_id": "old-123",
+            "status": "completed",
+            "completed_at_ms": "1704110400000",
+            # Not parsed when completed_at_ms is present
+            "completed_at": "invalid-timestamp"
+        }
+
+        indexed = await manager.backfill_completed_index()
+
+        assert indexed == 1
+        mock_redis.zadd.assert_called_once_with(
+            manager.COMPLETED_INDEX, {"old-123": 1704110400000}
+        )
+
+    @pytest.mark.asyncio
+    async def test_backfill_excludes_non_completed_tasks(self, manager, mock_redis):
+        """Should only index COMPLETED tasks, not PROCESSING or FAILED"""
+        mock_redis.keys.return_value = ["task:proc-123", "task:failed-456", "task:done-789"]
+
+        old_timestamp = (datetime.utcnow() - timedelta(days=10)).isoformat()
+
+        async def hgetall_side_effect(key):
+            if key == "task:proc-123":
+                return {
+                    "task_id": "proc-123",
+                    "status": "processing",
+                    "task_started_at": old_timestamp
+                }
+            elif key == "task:failed-456":
+                return {
+                    "task_id": "failed-456",
+                    "status": "FAILED",
+                    "completed_at": old_timestamp
+                }
+            return {
+                "task_id": "done-789",
+                "status": "completed",
+                "completed_at": old_timestamp
             }
 
-            cutoff_date = datetime.utcnow() - timedelta(days=7)
-            deleted_count = await manager.cleanup_old_completed_tasks(cutoff_date)
+        mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
 
-            # Should not delete task without timestamp
-            assert deleted_count == 0
+        indexed = await manager.backfill_completed_index()
 
-            await manager.disconnect()
+        assert indexed == 1
+        assert list(mock_redis.zadd.call_args.args[1]) == ["done-789"]
 
     @pytest.mark.asyncio
-    async def test_cleanup_old_completed_tasks_returns_zero_when_no_old_tasks(self, mock_redis):
-        """Should return 0 when no old tasks to cleanup"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
-            manager = RedisQueueManager("redis://localhost:6379/0")
-            await manager.connect()
-
-            mock_redis.keys.return_value = [b"task:123"]
-
-            # Recent task (2 days ago)
-            recent_timestamp = (datetime.utcnow() - timedelta(days=2)).isoformat()
-            mock_redis.hgetall.return_value = {
-                b"task_id": b"123",
-                b"status": b"completed",
-                b"completed_at": recent_timestamp.encode()
+    async def test_backfill_skips_missing_and_invalid_timestamps(self, manager, mock_redis):
+        """Should skip tasks without completed_at or with an invalid timestamp"""
+        mock_redis.keys.return_value = ["task:missing-123", "task:invalid-456"]
+
+        async def hgetall_side_effect(key):
+            if key == "task:missing-123":
+                return {"task_id": "missing-123", "status": "completed"}
+            return {
+                "task_id": "invalid-456",
+                "status": "completed",
+                "completed_at": "invalid-timestamp"
             }
 
-            # Try to cleanup tasks older than 7 days
-            cutoff_date = datetime.utcnow() - timedelta(days=7)
-            deleted_count = await manager.cleanup_old_completed_tasks(cutoff_date)
+        mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
 
-            assert deleted_count == 0
+        indexed = await manager.backfill_completed_index()
 
-            await manager.disconnect()
+        assert indexed == 0
+        mock_redis.zadd.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_find_old_completed_tasks_handles_invalid_timestamp_format(self, mock_redis):
-        """Should skip tasks with invalid timestamp format"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
-            manager = RedisQueueManager("redis://localhost:6379/0")
-            await manager.connect()
-
-            mock_redis.keys.return_value = [b"task:123"]
-
-            # Task with invalid timestamp
-            mock_redis.hgetall.return_value = {
-                b"task_id": b"123",
-                b"status": b"completed",
-                b"completed_at": b"invalid-timestamp"
+    async def test_backfill_skips_non_hash_task_keys(self, manager, mock_redis):
+        """Should skip keys under the task prefix that are not task hashes"""
+        from redis.exceptions import ResponseError
+
+        mock_redis.keys.return_value = ["task:123:progress_history", "task:123"]
+
+        old_completed = datetime.utcnow() - timedelta(days=10)
+
+        async def hgetall_side_effect(key):
+            if key.endswith(":progress_history"):
+                raise ResponseError("WRONGTYPE Operation against a key holding the wrong kind of value")
+            return {
+                "task_id": "123",
+                "status": "completed",
+                "completed_at": old_completed.isoformat()
             }
 
-            cutoff_date = datetime.utcnow() - timedelta(days=7)
-            old_tasks = await manager.find_old_completed_tasks(cutoff_date)
+        mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
 
-            # Should skip task with invalid timestamp
-            assert len(old_tasks) == 0
+        indexed = await manager.backfill_completed_index()
 
-            await manager.disconnect()
+        assert indexed == 1
+        mock_redis.zadd.assert_called_once_with(
+            manager.COMPLETED_INDEX, {"123": epoch_ms(old_completed)}
+        )
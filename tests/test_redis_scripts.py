@@ -0,0 +1,184 @@
+"""
+Tests for the Lua scripts run by RedisQueueManager
+
+The mocked clients elsewhere only see the scripts' calls; these tests run
+RETRY_TASK_SCRIPT and FIND_STUCK_TASKS_SCRIPT themselves on fakeredis.
+"""
+import time
+
+import pytest
+
+from app.models import TaskStatus
+
+
+async def _start_task(manager, priority="normal", minutes_ago=0):
+    """Create and dequeue a task, backdating its in-flight index entry"""
+    task_id = await manager.create_task(priority=priority)
+    assert await manager.dequeue_task(priority) == task_id
+    await manager.update_task_status(task_id, TaskStatus.PROCESSING)
+    if minutes_ago:
+        started_at = int(time.time()) - minutes_ago * 60
+        await manager.redis.zadd(manager.PROCESSING_INDEX, {task_id: started_at})
+    return task_id
+
+
+class TestRetryTaskScript:
+    """RETRY_TASK_SCRIPT behaviour against a real Lua interpreter"""
+
+    @pytest.mark.asyncio
+    async def test_retry_requeues_task_on_its_priority_queue(self, fake_redis_manager):
+        """Should re-queue, count the attempt and leave the in-flight index"""
+        manager = fake_redis_manager
+        task_id = await _start_task(manager, priority="low")
+
+        assert await manager.retry_task(task_id, max_retries=3) is True
+
+        task = await manager.redis.hgetall(f"task:{task_id}")
+        assert task["status"] == TaskStatus.QUEUED.value
+        assert task["retry_count"] == "1"
+        assert task["progress"] == "0"
+        assert task["message"] == "Retrying (attempt 1)"
+        assert await manager.redis.lrange(manager.QUEUE_LOW, 0, -1) == [task_id]
+        assert await manager.redis.llen(manager.QUEUE_NORMAL) == 0
+        assert await manager.redis.zscore(manager.PROCESSING_INDEX, task_id) is None
+
+    @pytest.mark.asyncio
+    async def test_high_priority_task_requeued_on_high_queue(self, fake_redis_manager):
+        """Should pick the high priority queue from the stored task"""
+        manager = fake_redis_manager
+        task_id = await _start_task(manager, priority="high")
+
+        assert await manager.retry_task(task_id) is True
+        assert await manager.redis.lrange(manager.QUEUE_HIGH, 0, -1) == [task_id]
+
+    @pytest.mark.asyncio
+    async def test_retry_count_increments_per_attempt(self, fake_redis_manager):
+        """Should increment the stored retry count on every retry"""
+        manager = fake_redis_manager
+        task_id = await _start_task(manager)
+
+        for _ in range(2):
+            assert await manager.retry_task(task_id, max_retries=3) is True
+
+        assert await manager.redis.hget(f"task:{task_id}", "retry_count") == "2"
+        assert await manager.redis.llen(manager.QUEUE_NORMAL) == 2
+
+    @pytest.mark.asyncio
+    async def test_exhausted_task_moved_to_dead_letter_queue(self, fake_redis_manager):
+        """Should dead-letter the task instead of re-queuing it"""
+        manager = fake_redis_manager
+        task_id = await _start_task(manager)
+        await manager.redis.hset(f"task:{task_id}", "retry_count", 3)
+
+        assert await manager.retry_task(task_id, max_retries=3) is False
+
+        task = await manager.redis.hgetall(f"task:{task_id}")
+        assert task["in_dead_letter_queue"] == "true"
+        assert task["dead_letter_reason"] == "Max retries exceeded (3/3)"
+        assert task["retry_count"] == "3"
+        assert "moved_to_dlq_at" in task
+        assert await manager.redis.lrange(manager.DEAD_LETTER_QUEUE, 0, -1) == [task_id]
+        assert await manager.redis.llen(manager.QUEUE_NORMAL) == 0
+        assert await manager.redis.zscore(manager.PROCESSING_INDEX, task_id) is None
+
+    @pytest.mark.asyncio
+    async def test_dead_lettered_task_left_untouched(self, fake_redis_manager):
+        """Should not re-queue or dead-letter a task already in the DLQ"""
+        manager = fake_redis_manager
+        task_id = await _start_task(manager)
+        await manager.redis.hset(f"task:{task_id}", "retry_count", 3)
+        await manager.retry_task(task_id, max_retries=3)
+
+        code, _ = await manager._retry_script(
+            keys=manager._retry_script_keys(task_id),
+            args=manager._retry_script_args(task_id, 3)
+        )
+
+        assert code == -1
+        assert await manager.redis.llen(manager.DEAD_LETTER_QUEUE) == 1
+        assert await manager.redis.llen(manager.QUEUE_NORMAL) == 0
+
+    @pytest.mark.asyncio
+    async def test_missing_task_not_retried(self, fake_redis_manager):
+        """Should report a missing task without creating any keys"""
+        manager = fake_redis_manager
+
+        assert await manager.retry_task("missing-task") is False
+        assert await manager.redis.keys("*") == []
+
+    @pytest.mark.asyncio
+    async def test_bulk_retry_runs_script_per_task(self, fake_redis_manager):
+        """Should retry each task through the pipelined script calls"""
+        manager = fake_redis_manager
+        retried_id = await _start_task(manager)
+        exhausted_id = await _start_task(manager)
+        await manager.redis.hset(f"task:{exhausted_id}", "retry_count", 3)
+
+        results = await manager.retry_tasks_bulk(
+            [retried_id, exhausted_id, "missing-task"], max_retries=3
+        )
+
+        assert results == [True, False, False]
+        assert await manager.redis.lrange(manager.QUEUE_NORMAL, 0, -1) == [retried_id]
+        assert await manager.redis.lrange(manager.DEAD_LETTER_QUEUE, 0, -1) == [exhausted_id]
+
+
+class TestFindStuckTasksScript:
+    """FIND_STUCK_TASKS_SCRIPT behaviour against a real Lua interpreter"""
+
+    @pytest.mark.asyncio
+    async def test_script_keeps_only_processing_hashes(self, fake_redis_manager):
+        """Should skip other statuses, missing keys and non-hash keys"""
+        manager = fake_redis_manager
+        processing_id = await _start_task(manager)
+        completed_id = await _start_task(manager)
+        await manager.update_task_status(completed_id, TaskStatus.COMPLETED)
+        await manager.redis.set("task:not-a-hash", "processing")
+
+        task_ids = [processing_id, completed_id, "missing-task", "not-a-hash"]
+
+        still_processing = await manager._find_stuck_script(
+            keys=[manager.PROCESSING_INDEX, *(f"task:{task_id}" for task_id in task_ids)],
+            args=[TaskStatus.PROCESSING.value, int(time.time()) + 60, *task_ids]
+        )
+
+        assert still_processing == [processing_id]
+        assert await manager.redis.zrange(manager.PROCESSING_INDEX, 0, -1) == [processing_id]
+
+    @pytest.mark.asyncio
+    async def test_find_stuck_tasks_returns_overdue_processing_tasks(self, fake_redis_manager):
+        """Should return only tasks processing longer than the timeout"""
+        manager = fake_redis_manager
+        stuck_id = await _start_task(manager, minutes_ago=45)
+        await _start_task(manager, minutes_ago=10)
+
+        assert await manager.find_stuck_tasks(timeout_minutes=30) == [stuck_id]
+
+    @pytest.mark.asyncio
+    async def test_find_stuck_tasks_drops_finished_tasks_from_index(self, fake_redis_manager):
+        """Should remove index entries of overdue tasks no longer processing"""
+        manager = fake_redis_manager
+        finished_id = await _start_task(manager, minutes_ago=45)
+        await manager.redis.hset(f"task:{finished_id}", "status", TaskStatus.COMPLETED.value)
+
+        assert await manager.find_stuck_tasks(timeout_minutes=30) == []
+        assert await manager.redis.zscore(manager.PROCESSING_INDEX, finished_id) is None
+
+    @pytest.mark.asyncio
+    async def test_find_stuck_tasks_keeps_entry_of_redequeued_task(self, fake_redis_manager, monkeypatch):
+        """Should keep the fresh index entry of a task re-dequeued mid-scan"""
+        manager = fake_redis_manager
+        task_id = await _start_task(manager, minutes_ago=45)
+        read_index = manager.redis.zrangebyscore
+
+        async def zrangebyscore(*args, **kwargs):
+            # The task is retried and picked up again after the index read
+            candidates = await read_index(*args, **kwargs)
+            await manager.retry_task(task_id)
+            await manager.dequeue_task()
+            return candidates
+
+        monkeypatch.setattr(manager.redis, "zrangebyscore", zrangebyscore)
+
+        assert await manager.find_stuck_tasks(timeout_minutes=30) == []
+        assert await manager.redis.zscore(manager.PROCESSING_INDEX, task_id) is not None
@@ -3,403 +3,312 @@ Tests for task recovery scenarios
 Tests the complete flow: timeout detection → retry → success/failure
 """
 import pytest
-from datetime import datetime, timedelta
-from unittest.mock import AsyncMock, patch, MagicMock
-from app.redis_queue import RedisQueueManager
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
 from app.models import TaskStatus
+from app.worker import OCRWorker
+from tests.redis_mocks import attach_scan_helpers, reset_redis_mock
 
 
-@pytest.fixture
-def mock_redis():
-    """Mock Redis client for task recovery tests"""
-    redis_mock = AsyncMock()
-    redis_mock.ping = AsyncMock(return_value=True)
-    redis_mock.keys = AsyncMock(return_value=[])
-    redis_mock.hgetall = AsyncMock(return_value={})
-    redis_mock.hget = AsyncMock(return_value=None)
-    redis_mock.hset = AsyncMock(return_value=1)
-    redis_mock.exists = AsyncMock(return_value=1)
-    redis_mock.lpush = AsyncMock(return_value=1)
-    redis_mock.rpop = AsyncMock(return_value=None)
-    redis_mock.llen = AsyncMock(return_value=0)
-    redis_mock.lrem = AsyncMock(return_value=1)
-    redis_mock.close = AsyncMock()
-    return redis_mock
+# Fixed "now" for stuck-task detection, as a naive UTC datetime like the
+# task_started_at values it is compared with
+_NOW = datetime(2024, 1, 1, 12, 0, 0)
+STUCK_ISO = (_NOW - timedelta(minutes=35)).isoformat()
+RECENT_ISO = (_NOW - timedelta(minutes=20)).isoformat()
 
 
-class TestTaskRecoveryScenarios:
-    """Test suite for task recovery scenarios"""
+@pytest.fixture(autouse=True)
+def frozen_clock(monkeypatch):
+    """Pin the queue manager's clock to _NOW"""
+    now = _NOW.replace(tzinfo=timezone.utc).timestamp()
+    monkeypatch.setattr("app.redis_queue.time", Mock(wraps=time, time=Mock(return_value=now)))
 
-    @pytest.mark.asyncio
-    async def test_stuck_task_detected_and_retried_successfully(self, mock_redis):
-        """Should detect stuck task, retry it, and succeed on retry"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
-            manager = RedisQueueManager("redis://localhost:6379/0")
-            await manager.connect()
 
-            # Setup: Create a stuck task (started 35 minutes ago, timeout is 30 min)
-            stuck_task_id = "stuck-task-123"
-            started_at = (datetime.utcnow() - timedelta(minutes=35)).isoformat()
+@pytest.fixture(autouse=True)
+def mock_redis(connected_redis):
+    """Mock Redis client for task recovery tests, reset to its defaults"""
+    _, redis_mock = connected_redis
+    return attach_scan_helpers(reset_redis_mock(redis_mock, keys=[], exists=1))
 
-            # Mock finding stuck tasks
-            mock_redis.keys.return_value = [b"task:stuck-task-123"]
 
-            async def hgetall_side_effect(key):
-                return {
-                    b"task_id": b"stuck-task-123",
-                    b"status": b"processing",
-                    b"task_started_at": started_at.encode(),
-                    b"retry_count": b"0",
-                    b"priority": b"normal",
-                    b"file_path": b"/test/doc.pdf"
-                }
+@pytest.fixture
+def manager(connected_redis):
+    """RedisQueueManager connected to the shared mock client"""
+    return connected_redis[0]
 
-            mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
 
-            # Step 1: Find stuck tasks
-            stuck_tasks = await manager.find_stuck_tasks(timeout_minutes=30)
+def _task_hash(**overrides) -> dict:
+    """Build a stored task hash, as returned by HGETALL, with overrides"""
+    return {
+        "status": TaskStatus.PROCESSING.value,
+        "retry_count": "0",
+        "priority": "normal",
+        "in_dead_letter_queue": "false",
+        **overrides,
+    }
 
-            assert len(stuck_tasks) == 1
-            assert stuck_tasks[0] == stuck_task_id
 
-            # Step 2: Retry the stuck task
-            retried = await manager.retry_task(stuck_task_id)
+class TestTaskRecoveryScenarios:
+    """Test suite for task recovery scenarios"""
 
-            assert retried is True
+    @pytest.mark.asyncio
+    async def test_stuck_task_detected_and_retried_successfully(self, manager, mock_redis):
+        """Should detect stuck task, retry it, and succeed on retry"""
+        # Setup: Create a stuck task (started 35 minutes ago, timeout is 30 min)
+        stuck_task_id = "stuck-task-123"
+        # Mock finding stuck tasks
+        mock_redis.keys.return_value = ["task:stuck-task-123"]
 
-            # Verify task was updated
-            assert mock_redis.hset.called
+        mock_redis.hgetall.return_value = _task_hash(
+            task_id=stuck_task_id,
+            task_started_at=STUCK_ISO,
+            file_path="/test/doc.pdf"
+        )
 
-            # Verify task was re-queued
-            assert mock_redis.lpush.called
+        # Step 1: Find stuck tasks
+        stuck_tasks = await manager.find_stuck_tasks(timeout_minutes=30)
 
-            await manager.disconnect()
+        assert len(stuck_tasks) == 1
+        assert stuck_tasks[0] == stuck_task_id
 
-    @pytest.mark.asyncio
-    async def test_stuck_task_exceeds_max_retries_moved_to_dlq(self, mock_redis):
-        """Should move task to dead letter queue after max retries exceeded"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
-            manager = RedisQueueManager("redis://localhost:6379/0")
-            await manager.connect()
+        # Step 2: Retry the stuck task
+        retried = await manager.retry_task(stuck_task_id)
 
-            stuck_task_id = "stuck-task-456"
-            started_at = (datetime.utcnow() - timedelta(minutes=35)).isoformat()
+        assert retried is True
 
-            # Mock task with max retries already reached
-            async def hgetall_side_effect(key):
-                return {
-                    b"task_id": b"stuck-task-456",
-                    b"status": b"processing",
-                    b"task_started_at": started_at.encode(),
-                    b"retry_count": b"3",  # Max retries reached
-                    b"priority": b"normal",
-                    b"in_dead_letter_queue": b"false"
-                }
+        # Verify task was updated and re-queued atomically
+        mock_redis.retry_script.assert_called_once()
+        assert mock_redis.retry_script.call_args.kwargs["keys"][0] == "task:stuck-task-123"
 
-            mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
+    @pytest.mark.asyncio
+    async def test_stuck_task_exceeds_max_retries_moved_to_dlq(self, manager, mock_redis):
+        """Should move task to dead letter queue after max retries exceeded"""
+        stuck_task_id = "stuck-task-456"
 
-            # Try to retry - should fail and move to DLQ
-            retried = await manager.retry_task(stuck_task_id, max_retries=3)
+        # Mock task with max retries already reached
+        mock_redis.retry_script.return_value = [-2, 3]
 
-            assert retried is False
+        # Try to retry - should fail and move to DLQ
+        retried = await manager.retry_task(stuck_task_id, max_retries=3)
 
-            # Verify task was added to dead letter queue
-            assert mock_redis.lpush.called
-            # Check if it was added to DLQ (second call after initial retry attempt)
-            calls = mock_redis.lpush.call_args_list
-            assert any(manager.DEAD_LETTER_QUEUE in str(call) for call in calls)
+        assert retried is False
 
-            await manager.disconnect()
+        # Verify the script was given the DLQ to move the task into
+        keys = mock_redis.retry_script.call_args.kwargs["keys"]
+        assert keys[0] == f"task:{stuck_task_id}"
+        assert manager.DEAD_LETTER_QUEUE in keys
 
     @pytest.mark.asyncio
-    async def test_multiple_stuck_tasks_recovered_in_batch(self, mock_redis):
+    async def test_multiple_stuck_tasks_recovered_in_batch(self, manager, mock_redis):
         """Should detect and retry multiple stuck tasks in one operation"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
-            manager = RedisQueueManager("redis://localhost:6379/0")
-            await manager.connect()
-
-            # Mock 3 stuck tasks
-            mock_redis.keys.return_value = [
-                b"task:stuck-1", b"task:stuck-2", b"task:stuck-3"
-            ]
-
-            started_at = (datetime.utcnow() - timedelta(minutes=35)).isoformat()
-            call_count = [0]
-
-            async def hgetall_side_effect(key):
-                call_count[0] += 1
-                task_num = call_count[0]
-                return {
-                    b"task_id": f"stuck-{task_num}".encode(),
-                    b"status": b"processing",
-                    b"task_started_at": started_at.encode(),
-                    b"retry_count": b"0",
-                    b"priority": b"normal"
-                }
-
-            mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
+        # Mock 3 stuck tasks
+        mock_redis.keys.return_value = [
+            "task:stuck-1", "task:stuck-2", "task:stuck-3"
+        ]
 
-            # Find all stuck tasks
-            stuck_tasks = await manager.find_stuck_tasks(timeout_minutes=30)
+        mock_redis.hgetall.side_effect = lambda key: _task_hash(
+            task_id=key.split(":", 1)[1],
+            task_started_at=STUCK_ISO
+        )
 
-            assert len(stuck_tasks) == 3
+        # Find all stuck tasks
+        stuck_tasks = await manager.find_stuck_tasks(timeout_minutes=30)
 
-            # Retry all stuck tasks
-            retry_results = []
-            for task_id in stuck_tasks:
-                result = await manager.retry_task(task_id)
-                retry_results.append(result)
+        assert stuck_tasks == ["stuck-1", "stuck-2", "stuck-3"]
 
-            # All should be retried successfully
-            assert all(retry_results)
-            assert len([r for r in retry_results if r]) == 3
+        # Retry all stuck tasks in one pipelined round trip
+        retry_results = await manager.retry_tasks_bulk(stuck_tasks)
 
-            await manager.disconnect()
+        # All should be retried successfully
+        assert retry_results == [True, True, True]
+        mock_redis.pipeline.assert_called_once_with(transaction=False)
+        retried_keys = [
+            call.kwargs["keys"][0] for call in mock_redis.retry_script.call_args_list
+        ]
+        assert retried_keys == [f"task:{task_id}" for task_id in stuck_tasks]
 
     @pytest.mark.asyncio
-    async def test_task_recovery_preserves_task_data(self, mock_redis):
+    async def test_task_recovery_preserves_task_data(self, manager, mock_redis):
         """Should preserve important task data during recovery"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
-            manager = RedisQueueManager("redis://localhost:6379/0")
-            await manager.connect()
-
-            stuck_task_id = "preserve-task-789"
-            started_at = (datetime.utcnow() - timedelta(minutes=35)).isoformat()
-
-            # Mock task with important data
-            async def hgetall_side_effect(key):
-                return {
-                    b"task_id": b"preserve-task-789",
-                    b"status": b"processing",
-                    b"task_started_at": started_at.encode(),
-                    b"retry_count": b"1",
-                    b"priority": b"high",
-                    b"file_path": b"/important/doc.pdf",
-                    b"document_id": b"doc-important-123",
-                    b"language": b"eng"
-                }
-
-            mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
-
-            # Retry the task
-            retried = await manager.retry_task(stuck_task_id)
-
-            assert retried is True
-
-            # Verify hset was called to update the task
-            # The task should be re-queued with incremented retry count
-            hset_calls = mock_redis.hset.call_args_list
-            assert len(hset_calls) > 0
-
-            # Verify lpush was called to re-queue (should use high priority queue)
-            lpush_calls = mock_redis.lpush.call_args_list
-            assert len(lpush_calls) > 0
-
-            await manager.disconnect()
+        stuck_task_id = "preserve-task-789"
+
+        # Task had one previous retry
+        mock_redis.retry_script.return_value = [1, 2]
+
+        # Retry the task
+        retried = await manager.retry_task(stuck_task_id)
+
+        assert retried is True
+
+        # Script only touches retry/status fields and picks the priority
+        # queue from the stored task, so the rest of the hash is preserved
+        mock_redis.hgetall.assert_not_called()
+        mock_redis.hset.assert_not_called()
+        keys = mock_redis.retry_script.call_args.kwargs["keys"]
+        assert keys == [
+            "task:preserve-task-789",
+            manager.QUEUE_HIGH,
+            manager.QUEUE_NORMAL,
+            manager.QUEUE_LOW,
+            manager.DEAD_LETTER_QUEUE,
+            manager.PROCESSING_INDEX,
+        ]
 
     @pytest.mark.asyncio
-    async def test_task_not_stuck_if_within_timeout(self, mock_redis):
+    async def test_task_not_stuck_if_within_timeout(self, manager, mock_redis):
         """Should not mark task as stuck if it's still within timeout window"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
-            manager = RedisQueueManager("redis://localhost:6379/0")
-            await manager.connect()
+        # Task started 20 minutes ago (timeout is 30 minutes)
+        mock_redis.keys.return_value = ["task:recent-task"]
 
-            # Task started 20 minutes ago (timeout is 30 minutes)
-            recent_start = (datetime.utcnow() - timedelta(minutes=20)).isoformat()
+        mock_redis.hgetall.return_value = _task_hash(
+            task_id="recent-task",
+            task_started_at=RECENT_ISO
+        )
 
-            mock_redis.keys.return_value = [b"task:recent-task"]
+        # Find stuck tasks with 30-minute timeout
+        stuck_tasks = await manager.find_stuck_tasks(timeout_minutes=30)
 
-            async def hgetall_side_effect(key):
-                return {
-                    b"task_id": b"recent-task",
-                    b"status": b"processing",
-                    b"task_started_at": recent_start.encode(),
-                    b"retry_count": b"0"
-                }
-
-            mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
-
-            # Find stuck tasks with 30-minute timeout
-            stuck_tasks = await manager.find_stuck_tasks(timeout_minutes=30)
-
-            # Should not find any stuck tasks
-            assert len(stuck_tasks) == 0
-
-            await manager.disconnect()
+        # Should not find any stuck tasks
+        assert len(stuck_tasks) == 0
 
     @pytest.mark.asyncio
-    async def test_completed_tasks_not_included_in_stuck_detection(self, mock_redis):
+    async def test_completed_tasks_not_included_in_stuck_detection(self, fake_redis_manager):
         """Should not mark completed tasks as stuck"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
-            manager = RedisQueueManager("redis://localhost:6379/0")
-            await manager.connect()
-
-            # Completed task from 2 hours ago
-            old_timestamp = (datetime.utcnow() - timedelta(hours=2)).isoformat()
-
-            mock_redis.keys.return_value = [b"task:completed-task"]
-
-            async def hgetall_side_effect(key):
-                return {
-                    b"task_id": b"completed-task",
-                    b"status": b"COMPLETED",  # Already completed
-                    b"completed_at": old_timestamp.encode(),
-                    b"retry_count": b"0"
-                }
-
-            mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
-
-            # Find stuck tasks
-            stuck_tasks = await manager.find_stuck_tasks(timeout_minutes=30)
-
-            # Completed task should not be in stuck list
-            assert len(stuck_tasks) == 0
-
-            await manager.disconnect()
+        manager = fake_redis_manager
+        task_id = await manager.create_task()
+        assert await manager.dequeue_task() == task_id
+
+        # Started 35 minutes ago and completed since, with its in-flight entry
+        # left overdue, so only the script's status check can exclude it
+        started_at = _NOW.replace(tzinfo=timezone.utc).timestamp() - 35 * 60
+        await manager.redis.hset(f"task:{task_id}", mapping={
+            "status": TaskStatus.COMPLETED.value,
+            "task_started_at": STUCK_ISO,
+            "completed_at": RECENT_ISO,
+        })
+        await manager.redis.zadd(manager.PROCESSING_INDEX, {task_id: started_at})
+
+        # Find stuck tasks
+        stuck_tasks = await manager.find_stuck_tasks(timeout_minutes=30)
+
+        # Completed task should not be in stuck list
+        assert stuck_tasks == []
 
     @pytest.mark.asyncio
-    async def test_retry_increments_retry_count(self, mock_redis):
+    async def test_retry_increments_retry_count(self, manager, mock_redis):
         """Should increment retry count each time task is retried"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
-            manager = RedisQueueManager("redis://localhost:6379/0")
-            await manager.connect()
-
-            task_id = "retry-count-task"
+        task_id = "retry-count-task"
 
-            # Mock task with retry count of 1
-            async def hgetall_side_effect(key):
-                return {
-                    b"task_id": b"retry-count-task",
-                    b"status": b"FAILED",
-                    b"retry_count": b"1",
-                    b"priority": b"normal",
-                    b"in_dead_letter_queue": b"false"
-                }
-
-            mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
+        # Script incremented retry count from 1 to 2
+        mock_redis.retry_script.return_value = [1, 2]
 
+        with patch('app.redis_queue.logger') as mock_logger:
             # Retry the task
             retried = await manager.retry_task(task_id, max_retries=3)
 
-            assert retried is True
-
-            # Verify hset was called with incremented retry_count
-            hset_calls = mock_redis.hset.call_args_list
-            # Should be called to update retry_count
-            assert len(hset_calls) > 0
+        assert retried is True
 
-            # The retry_count should be incremented to 2
-            # (checking the call was made, actual value verification would need more complex mocking)
+        # The max retries limit is passed to the script for the check
+        assert mock_redis.retry_script.call_args.kwargs["args"][0] == 3
 
-            await manager.disconnect()
+        # The retry_count should be incremented to 2
+        assert "attempt 2" in str(mock_logger.info.call_args)
 
     @pytest.mark.asyncio
-    async def test_dlq_task_cannot_be_retried_normally(self, mock_redis):
+    async def test_dlq_task_cannot_be_retried_normally(self, manager, mock_redis):
         """Should prevent retry of tasks already in dead letter queue"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
-            manager = RedisQueueManager("redis://localhost:6379/0")
-            await manager.connect()
-
-            task_id = "dlq-task"
+        task_id = "dlq-task"
 
-            # Mock task already in DLQ
-            async def hgetall_side_effect(key):
-                return {
-                    b"task_id": b"dlq-task",
-                    b"status": b"FAILED",
-                    b"retry_count": b"3",
-                    b"in_dead_letter_queue": b"true",  # Already in DLQ
-                    b"dead_letter_reason": b"Max retries exceeded"
-                }
+        # Mock task already in DLQ
+        mock_redis.retry_script.return_value = [-1, 0]
 
-            mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
+        # Try to retry - should fail
+        retried = await manager.retry_task(task_id)
 
-            # Try to retry - should fail
-            retried = await manager.retry_task(task_id)
+        assert retried is False
 
-            assert retried is False
-
-            # Verify task was NOT re-queued (lpush should not be called for re-queue)
-            # Only initial hgetall should have been called
-            assert mock_redis.hgetall.called
-
-            await manager.disconnect()
+        # Verify task was NOT re-queued or pushed to the DLQ again
+        assert not mock_redis.lpush.called
 
     @pytest.mark.asyncio
-    async def test_task_recovery_updates_status_to_queued(self, mock_redis):
+    async def test_task_recovery_updates_status_to_queued(self, manager, mock_redis):
         """Should update task status from PROCESSING to QUEUED on retry"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
-            manager = RedisQueueManager("redis://localhost:6379/0")
-            await manager.connect()
+        task_id = "status-update-task"
 
-            task_id = "status-update-task"
+        # Retry the task
+        retried = await manager.retry_task(task_id)
 
-            async def hgetall_side_effect(key):
-                return {
-                    b"task_id": b"status-update-task",
-                    b"status": b"processing",  # Currently processing
-                    b"retry_count": b"0",
-                    b"priority": b"normal",
-                    b"in_dead_letter_queue": b"false"
-                }
+        assert retried is True
 
-            mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
+        # Verify the script sets status to QUEUED when re-queuing
+        args = mock_redis.retry_script.call_args.kwargs["args"]
+        assert args[1] == TaskStatus.QUEUED.value
+        assert args[-1] == task_id
 
-            # Retry the task
-            retried = await manager.retry_task(task_id)
-
-            assert retried is True
+    @pytest.mark.asyncio
+    async def test_recovery_scenario_end_to_end(self, manager, mock_redis):
+        """End-to-end test: detect stuck task → retry → verify re-queued"""
+        # Setup: Create a stuck task
+        task_id = "e2e-stuck-task"
+        mock_redis.keys.return_value = [f"task:{task_id}"]
+
+        mock_redis.hgetall.return_value = _task_hash(
+            task_id=task_id,
+            task_started_at=STUCK_ISO,
+            priority="high",
+            file_path="/test/document.pdf",
+            document_id="doc-e2e-123"
+        )
+
+        # Step 1: Detect stuck task
+        stuck_tasks = await manager.find_stuck_tasks(timeout_minutes=30)
+        assert len(stuck_tasks) == 1
+        assert stuck_tasks[0] == task_id
+
+        # Step 2: Retry the stuck task
+        retry_success = await manager.retry_task(task_id)
+        assert retry_success is True
+
+        # Step 3: Verify task was re-queued and its status updated
+        mock_redis.retry_script.assert_called_once()
+        assert mock_redis.retry_script.call_args.kwargs["keys"][0] == f"task:{task_id}"
+
+
+class TestWorkerTaskErrorHandling:
+    """Worker error handling against the real retry script on fakeredis"""
+
+    @pytest.fixture
+    def worker(self, fake_redis_manager):
+        """OCRWorker whose queue manager is the fakeredis-backed one"""
+        with patch('app.worker.get_redis_queue_manager', return_value=fake_redis_manager), \
+                patch('app.worker.WebhookClient'):
+            yield OCRWorker(redis_url="redis://localhost", max_retries=2)
 
-            # Verify hset was called (status should be updated to QUEUED)
-            assert mock_redis.hset.called
+    @pytest.mark.asyncio
+    async def test_failed_task_requeued_while_retries_remain(self, worker, fake_redis_manager):
+        """Should re-queue the task and count the attempt"""
+        task_id = await fake_redis_manager.create_task()
+        await fake_redis_manager.dequeue_task()
 
-            # Verify the task was re-queued
-            assert mock_redis.lpush.called
+        await worker._handle_task_error(task_id, "Tesseract crashed")
 
-            await manager.disconnect()
+        task = await fake_redis_manager.redis.hgetall(f"task:{task_id}")
+        assert task["status"] == TaskStatus.QUEUED.value
+        assert task["retry_count"] == "1"
+        assert await fake_redis_manager.redis.lrange(fake_redis_manager.QUEUE_NORMAL, 0, -1) == [task_id]
 
     @pytest.mark.asyncio
-    async def test_recovery_scenario_end_to_end(self, mock_redis):
-        """End-to-end test: detect stuck task → retry → verify re-queued"""
-        with patch('app.redis_queue.aioredis.from_url', new_callable=AsyncMock, return_value=mock_redis):
-            manager = RedisQueueManager("redis://localhost:6379/0")
-            await manager.connect()
-
-            # Setup: Create a stuck task
-            task_id = "e2e-stuck-task"
-            started_at = (datetime.utcnow() - timedelta(minutes=45)).isoformat()
-
-            mock_redis.keys.return_value = [f"task:{task_id}".encode()]
-
-            async def hgetall_side_effect(key):
-                return {
-                    b"task_id": task_id.encode(),
-                    b"status": b"processing",
-                    b"task_started_at": started_at.encode(),
-                    b"retry_count": b"0",
-                    b"priority": b"high",
-                    b"file_path": b"/test/document.pdf",
-                    b"document_id": b"doc-e2e-123",
-                    b"in_dead_letter_queue": b"false"
-                }
-
-            mock_redis.hgetall = AsyncMock(side_effect=hgetall_side_effect)
-
-            # Step 1: Detect stuck task
-            stuck_tasks = await manager.find_stuck_tasks(timeout_minutes=30)
-            assert len(stuck_tasks) == 1
-            assert stuck_tasks[0] == task_id
-
-            # Step 2: Retry the stuck task
-            retry_success = await manager.retry_task(task_id)
-            assert retry_success is True
-
-            # Step 3: Verify task was re-queued
-            lpush_calls = mock_redis.lpush.call_args_list
-            assert len(lpush_calls) > 0
-
-            # Step 4: Verify task status was updated
-            hset_calls = mock_redis.hset.call_args_list
-            assert len(hset_calls) > 0
-
-            await manager.disconnect()
+    async def test_exhausted_task_marked_failed_without_dead_lettering(self, worker, fake_redis_manager):
+        """Should mark the task FAILED and keep it out of the dead letter queue"""
+        task_id = await fake_redis_manager.create_task()
+        await fake_redis_manager.dequeue_task()
+        await fake_redis_manager.redis.hset(f"task:{task_id}", "retry_count", 2)
+
+        await worker._handle_task_error(task_id, "Tesseract crashed")
+
+        status = await fake_redis_manager.get_task_status(task_id)
+        assert status.status == TaskStatus.FAILED
+        assert status.message == "Processing failed: Tesseract crashed"
+        assert await fake_redis_manager.get_dead_letter_queue_count() == 0
+        assert await fake_redis_manager.redis.llen(fake_redis_manager.QUEUE_NORMAL) == 0
@@ -4,25 +4,28 @@ Following TDD methodology - these tests define the expected behavior for thumbna
 """
 import pytest
 from PIL import Image
+from PIL.JpegImagePlugin import JpegImageFile
 import io
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
 
-from app.thumbnail_generator import ThumbnailGenerator, ThumbnailResult
+from app.thumbnail_generator import PILLOW_SIMD, ThumbnailGenerator, ThumbnailResult, _generate_one
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def thumbnail_generator():
     """Create thumbnail generator instance"""
     return ThumbnailGenerator()
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_image():
     """Create a sample image for testing"""
     img = Image.new('RGB', (1000, 1000), color='white')
     return img
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_large_image():
     """Create a large sample image"""
     img = Image.new('RGB', (3000, 4000), color='blue')
@@ -132,6 +135,40 @@ class TestThumbnailQuality:
         assert result.thumbnail is not None
         assert result.quality == 'low'
 
+    def test_quality_selects_resampling_filter(self, thumbnail_generator, sample_image):
+        """Test lower quality settings use cheaper resampling filters"""
+        expected = {
+            'high': Image.Resampling.LANCZOS,
+            'medium': Image.Resampling.BICUBIC,
+            'low': Image.Resampling.BILINEAR,
+        }
+
+        for quality, resample in expected.items():
+            with patch.object(Image.Image, 'resize', wraps=sample_image.resize) as resize:
+                thumbnail_generator.generate(sample_image, quality=quality)
+            assert resize.call_args.args[1] == resample
+
+    def test_generate_does_not_mutate_input(self, thumbnail_generator, sample_image):
+        """Test the shared source image is left untouched"""
+        before = sample_image.tobytes()
+
+        thumbnail_generator.generate(sample_image, max_size=100)
+        thumbnail_generator.generate(sample_image, max_size=2000)
+
+        assert sample_image.size == (1000, 1000)
+        assert sample_image.tobytes() == before
+
+    def test_small_image_is_not_resampled(self, thumbnail_generator):
+        """Test images already within max_size skip resampling"""
+        small_image = Image.new('RGB', (50, 50), color='red')
+
+        with patch.object(Image.Image, 'resize') as resize:
+            result = thumbnail_generator.generate(small_image, max_size=200)
+
+        resize.assert_not_called()
+        assert result.thumbnail is not small_image
+        assert result.thumbnail.size == (50, 50)
+
 
 class TestThumbnailFormats:
     """Test different output formats"""
@@ -157,6 +194,17 @@ class TestThumbnailFormats:
         assert result.thumbnail is not None
         assert result.format == 'WEBP'
 
+    def test_webp_uses_fast_method(self, thumbnail_generator, sample_image):
+        """Test WebP thumbnails are encoded without the slow RD search"""
+        with patch.object(Image.Image, 'save', autospec=True, side_effect=Image.Image.save) as save:
+            result = thumbnail_generator.generate(sample_image, output_format='WEBP')
+
+        save.assert_called_once()
+        assert save.call_args.kwargs['format'] == 'WEBP'
+        assert save.call_args.kwargs['method'] == 0
+        assert save.call_args.kwargs['lossless'] is False
+        assert Image.open(io.BytesIO(result.to_bytes())).format == 'WEBP'
+
 
 class TestThumbnailBytes:
     """Test generating thumbnail as bytes"""
@@ -179,24 +227,141 @@ class TestThumbnailBytes:
         assert loaded_image is not None
         assert loaded_image.size == result.thumbnail.size
 
+        # Encoded once and cached
+        assert result.to_bytes() is result.to_bytes()
+
+    def test_thumbnail_bytes_match_file_size(self, thumbnail_generator, sample_image):
+        """Test file_size is the length of the bytes to_bytes() returns"""
+        for output_format in ('PNG', 'JPEG', 'WEBP'):
+            result = thumbnail_generator.generate(sample_image, output_format=output_format)
+
+            assert result.file_size == len(result.to_bytes())
+            assert Image.open(io.BytesIO(result.to_bytes())).format == output_format
+
+
+def _open_jpeg(width: int, height: int) -> Image.Image:
+    """Encode a blank JPEG and open it unloaded, as if read from a file"""
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), color='blue').save(buffer, format='JPEG')
+    buffer.seek(0)
+    return Image.open(buffer)
+
+
+class TestJpegDraftDecoding:
+    """Test JPEG sources are decoded at reduced scale"""
+
+    def test_jpeg_draft_used(self, thumbnail_generator):
+        """Test an unloaded JPEG is drafted before resizing when requested"""
+        jpeg = _open_jpeg(2400, 1800)
+
+        with patch.object(JpegImageFile, 'draft', autospec=True,
+                          side_effect=JpegImageFile.draft) as draft:
+            result = thumbnail_generator.generate(jpeg, max_size=300, draft=True)
+
+        draft.assert_called_once_with(jpeg, 'RGB', (600, 450))
+        assert result.thumbnail.size == (300, 225)
+        assert result.original_width == 2400
+        assert result.original_height == 1800
+
+    def test_repeated_generate_keeps_jpeg_full_size(self, thumbnail_generator):
+        """Test the caller's JPEG is not drafted by default, so it can be reused"""
+        jpeg = _open_jpeg(2000, 1600)
+
+        thumbnail_generator.generate(jpeg, max_size=100)
+        result = thumbnail_generator.generate(jpeg, max_size=800)
+
+        assert result.thumbnail.size == (800, 640)
+        assert (result.original_width, result.original_height) == (2000, 1600)
+
+    def test_generate_many_drafts_once_for_largest_size(self, thumbnail_generator):
+        """Test every size reports the original dimensions after drafting"""
+        jpeg = _open_jpeg(2000, 1600)
+
+        with patch.object(JpegImageFile, 'draft', autospec=True,
+                          side_effect=JpegImageFile.draft) as draft:
+            results = thumbnail_generator.generate_many(jpeg, [100, 500], draft=True)
+
+        draft.assert_called_once_with(jpeg, 'RGB', (1000, 800))
+        assert [result.thumbnail.size for result in results] == [(100, 80), (500, 400)]
+        for result in results:
+            assert (result.original_width, result.original_height) == (2000, 1600)
+
 
 class TestMultipleThumbnails:
     """Test generating multiple thumbnails"""
 
     def test_generate_multiple_sizes(self, thumbnail_generator, sample_image):
         """Test generating multiple thumbnail sizes"""
-        sizes = [100, 200, 300]
-        results = []
-
-        for size in sizes:
-            result = thumbnail_generator.generate(sample_image, max_size=size)
-            results.append(result)
+        results = thumbnail_generator.generate_many(sample_image, [100, 200, 300])
 
         assert len(results) == 3
         # Each should be progressively larger
         assert results[0].thumbnail.width <= results[1].thumbnail.width
         assert results[1].thumbnail.width <= results[2].thumbnail.width
 
+    def test_generate_many_matches_generate(self, thumbnail_generator):
+        """Test cascaded sizes match single generation and keep input order"""
+        image = Image.new('RGB', (1000, 750), color='green')
+        sizes = [150, 300, 75, 150]
+
+        results = thumbnail_generator.generate_many(image, sizes, quality='high')
+
+        for size, result in zip(sizes, results):
+            expected = thumbnail_generator.generate(image, max_size=size, quality='high')
+            assert result.thumbnail.size == expected.thumbnail.size
+            assert (result.original_width, result.original_height) == (1000, 750)
+            assert result.quality == 'high'
+
+    def test_generate_many_uses_pool_for_large_batches(self, thumbnail_generator, sample_image):
+        """Test batches of POOL_MIN_SIZES or more sizes go to the pool"""
+        sizes = [50, 100, 200, 300]
+
+        with ThreadPoolExecutor() as pool, \
+                patch.object(thumbnail_generator, '_get_pool', return_value=pool), \
+                patch('app.thumbnail_generator._generate_one', wraps=_generate_one) as generate_one:
+            results = thumbnail_generator.generate_many(sample_image, sizes)
+
+        assert generate_one.call_count == len(sizes)
+        assert [max(result.thumbnail.size) for result in results] == sizes
+
+    def test_generate_many_in_process_pool(self):
+        """Test a real process pool generates the batch from the shared pixels"""
+        generator = ThumbnailGenerator()
+        image = Image.new('P', (800, 600), color=3)
+        image.putpalette([0, 0, 0, 255, 0, 0, 0, 255, 0, 0, 0, 255] * 64)
+        sizes = [400, 50, 200, 100]
+
+        try:
+            results = generator.generate_many(image, sizes, output_format='PNG')
+        finally:
+            generator.shutdown()
+
+        assert [result.thumbnail.size for result in results] == [
+            (400, 300), (50, 37), (200, 150), (100, 75)
+        ]
+        for result in results:
+            assert (result.original_width, result.original_height) == (800, 600)
+            assert result.thumbnail.convert('RGB').getpixel((0, 0)) == (0, 0, 255)
+
+    def test_shutdown_releases_exit_hook(self):
+        """Test shutdown() unregisters the hook that keeps the generator alive"""
+        generator = ThumbnailGenerator()
+
+        with patch('app.thumbnail_generator.atexit') as mock_atexit, \
+                patch('app.thumbnail_generator.ProcessPoolExecutor'):
+            generator._get_pool()
+            generator.shutdown()
+
+        mock_atexit.register.assert_called_once_with(generator.shutdown)
+        mock_atexit.unregister.assert_called_once_with(generator.shutdown)
+
+    def test_generate_many_small_batch_skips_pool(self, thumbnail_generator, sample_image):
+        """Test small batches are generated in-process"""
+        with patch.object(thumbnail_generator, '_get_pool') as get_pool:
+            thumbnail_generator.generate_many(sample_image, [100, 200, 300])
+
+        get_pool.assert_not_called()
+
 
 class TestEdgeCases:
     """Test edge cases"""
@@ -284,6 +449,15 @@ class TestPerformance:
         assert elapsed < 1.0
         assert result.thumbnail is not None
 
+    @pytest.mark.skipif(not PILLOW_SIMD, reason="Pillow-SIMD not installed")
+    def test_pillow_simd_available_when_installed(self, thumbnail_generator, sample_large_image):
+        """Test thumbnails are generated with the Pillow-SIMD build"""
+        import PIL
+
+        assert '.post' in PIL.__version__
+        result = thumbnail_generator.generate(sample_large_image)
+        assert max(result.thumbnail.size) <= 300
+
 
 class TestErrorHandling:
     """Test error handling"""
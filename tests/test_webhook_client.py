@@ -2,10 +2,11 @@
 Tests for Webhook Client
 Following TDD methodology - these tests define the expected behavior before implementation
 """
+import asyncio
 import pytest
 import httpx
-import respx
 from unittest.mock import Mock, patch, AsyncMock
+import base64
 import hashlib
 import hmac
 import json
@@ -14,7 +15,16 @@ from datetime import datetime
 
 # These imports will exist after implementation
 # For now, they define the expected interface
-from app.webhook_client import WebhookClient, WebhookDeliveryError, WebhookSignatureError
+from app.webhook_client import (
+    WebhookClient, WebhookDeliveryError, WebhookSignatureError, _load_env_config, _utc_timestamp
+)
+from tests.webhook_mocks import MockBackend
+
+
+@pytest.fixture
+def backend():
+    """Mock webhook callback endpoint; pass backend.transport to WebhookClient"""
+    return MockBackend()
 
 
 class TestWebhookClientInitialization:
@@ -44,6 +54,12 @@ class TestWebhookClientInitialization:
         assert client.max_retries == 5
         assert client.timeout == 60
 
+    def test_callback_url_built_once(self):
+        """Test the callback URL ignores a trailing slash on the backend URL"""
+        client = WebhookClient("http://backend:8000/", "secret")
+
+        assert client._callback_url == "http://backend:8000/api/webhooks/ocr/callback"
+
     def test_client_validates_backend_url(self):
         """Test that invalid backend URLs are rejected"""
         with pytest.raises(ValueError, match="Invalid backend URL"):
@@ -116,6 +132,46 @@ class TestWebhookSignatureGeneration:
 
         assert sig1 != sig2
 
+    def test_signature_is_stable_across_calls_and_payload_types(self):
+        """Test the reused HMAC key state yields the same signature for str and bytes"""
+        client = WebhookClient("http://backend:8000", "test-secret-key")
+        payload = json.dumps({"task_id": "123"}, separators=(',', ':'))
+
+        first = client._generate_signature(payload)
+        client._generate_signature("unrelated payload")
+
+        assert client._generate_signature(payload) == first
+        assert client._generate_signature(payload.encode()) == first
+
+    def test_signing_does_not_rekey_hmac(self):
+        """Test the secret's key pads are derived once, not per signature"""
+        client = WebhookClient("http://backend:8000", "test-secret-key")
+
+        with patch('app.webhook_client.hmac.new') as hmac_new:
+            signature = client._generate_signature(b'{"task_id":"123"}')
+
+        hmac_new.assert_not_called()
+        assert signature == hmac.new(
+            b"test-secret-key", b'{"task_id":"123"}', hashlib.sha256
+        ).hexdigest()
+
+    def test_generates_base64_signature(self):
+        """Test b64 mode emits sha256=<base64> of the same HMAC"""
+        client = WebhookClient("http://backend:8000", "test-secret-key", signature_format="b64")
+        payload = b'{"task_id":"123"}'
+
+        signature = client._generate_signature(payload)
+
+        expected = hmac.digest(b"test-secret-key", payload, "sha256")
+        assert signature == "sha256=" + base64.b64encode(expected).decode()
+        assert len(signature) == 51
+        assert hmac.compare_digest(base64.b64decode(signature[len("sha256="):]), expected)
+
+    def test_rejects_unknown_signature_format(self):
+        """Test that only hex and b64 signature formats are accepted"""
+        with pytest.raises(ValueError, match="Unknown signature format"):
+            WebhookClient("http://backend:8000", "secret", signature_format="base32")
+
 
 class TestWebhookPayloadConstruction:
     """Test webhook payload construction"""
@@ -183,6 +239,16 @@ class TestWebhookPayloadConstruction:
         # Verify timestamp is ISO format
         datetime.fromisoformat(payload["timestamp"].replace('Z', '+00:00'))
 
+    def test_timestamp_is_current_utc_with_microseconds(self):
+        """Test timestamps are fixed-width UTC and track the clock"""
+        with patch('app.webhook_client.time.time', return_value=1704110400.000123):
+            first = _utc_timestamp()
+        with patch('app.webhook_client.time.time', return_value=1704110401.5):
+            second = _utc_timestamp()
+
+        assert first == "2024-01-01T12:00:00.000123Z"
+        assert second == "2024-01-01T12:00:01.500000Z"
+
     def test_builds_progress_webhook_payload(self):
         """Test construction of progress update webhook payload (Task 5.2)"""
         client = WebhookClient("http://backend:8000", "secret")
@@ -253,16 +319,25 @@ class TestWebhookPayloadConstruction:
                 progress=101
             )
 
+        # Both bounds are inclusive
+        for progress in (0, 100):
+            payload = client._build_payload(
+                task_id="task-123",
+                document_id="doc-456",
+                status="processing",
+                progress=progress
+            )
+            assert payload["progress"] == progress
+
 
 @pytest.mark.asyncio
 class TestWebhookDelivery:
     """Test webhook delivery to backend"""
 
-    @respx.mock
-    async def test_successful_webhook_delivery(self):
+    async def test_successful_webhook_delivery(self, backend):
         """Test successful webhook delivery with 200 response"""
         # Mock the backend webhook endpoint
-        route = respx.post("http://backend:8000/api/webhooks/ocr/callback").mock(
+        route = backend.mock(
             return_value=httpx.Response(200, json={
                 "message": "Webhook processed successfully",
                 "document_id": "doc-456",
@@ -270,7 +345,7 @@ class TestWebhookDelivery:
             })
         )
 
-        client = WebhookClient("http://backend:8000", "secret")
+        client = WebhookClient("http://backend:8000", "secret", transport=backend.transport)
 
         result = await client.send_webhook(
             task_id="task-123",
@@ -286,11 +361,11 @@ class TestWebhookDelivery:
         request = route.calls.last.request
         assert request.headers["Content-Type"] == "application/json"
         assert "X-Webhook-Signature" in request.headers
+        assert request.headers["User-Agent"] == "docvault-ocr/1.0"
 
-    @respx.mock
-    async def test_successful_progress_webhook_delivery(self):
+    async def test_successful_progress_webhook_delivery(self, backend):
         """Test successful delivery of progress update webhook (Task 5.2)"""
-        route = respx.post("http://backend:8000/api/webhooks/ocr/callback").mock(
+        route = backend.mock(
             return_value=httpx.Response(200, json={
                 "message": "Webhook processed successfully",
                 "document_id": "doc-456",
@@ -298,7 +373,7 @@ class TestWebhookDelivery:
             })
         )
 
-        client = WebhookClient("http://backend:8000", "secret")
+        client = WebhookClient("http://backend:8000", "secret", transport=backend.transport)
 
         result = await client.send_webhook(
             task_id="task-123",
@@ -320,14 +395,13 @@ class TestWebhookDelivery:
         assert "result" not in payload
         assert "error" not in payload
 
-    @respx.mock
-    async def test_webhook_delivery_includes_signature_header(self):
+    async def test_webhook_delivery_includes_signature_header(self, backend):
         """Test that webhook requests include X-Webhook-Signature header"""
-        route = respx.post("http://backend:8000/api/webhooks/ocr/callback").mock(
+        route = backend.mock(
             return_value=httpx.Response(200, json={"message": "OK"})
         )
 
-        client = WebhookClient("http://backend:8000", "test-secret")
+        client = WebhookClient("http://backend:8000", "test-secret", transport=backend.transport)
 
         await client.send_webhook(
             task_id="task-123",
@@ -353,14 +427,110 @@ class TestWebhookDelivery:
 
         assert signature == expected_sig
 
-    @respx.mock
-    async def test_webhook_delivery_with_timeout(self):
+    async def test_webhook_client_reuses_hmac_seed(self, backend):
+        """Test sends only copy the HMAC keyed at init and reuse the static parts"""
+        with patch('app.webhook_client.hmac.new', wraps=hmac.new) as hmac_new:
+            client = WebhookClient("http://backend:8000", "secret", transport=backend.transport)
+            for status in ("completed", "failed"):
+                await client.send_webhook(task_id="task-123", document_id="doc-456", status=status)
+
+        hmac_new.assert_called_once()
+        first, second = (call.request for call in backend.calls)
+        assert first.url == second.url == client._callback_url
+        for request in (first, second):
+            assert request.headers["X-Webhook-Signature"] == hmac.new(
+                b"secret", request.content, hashlib.sha256
+            ).hexdigest()
+        await client.aclose()
+
+    async def test_webhook_body_is_utf8_json_matching_signature(self, backend):
+        """Test non-ASCII text is sent as UTF-8 and the signature covers the exact body"""
+        route = backend.mock(
+            return_value=httpx.Response(200, json={"success": True})
+        )
+
+        client = WebhookClient("http://backend:8000", "test-secret", transport=backend.transport)
+
+        await client.send_webhook(
+            task_id="task-123",
+            document_id="doc-456",
+            status="completed",
+            result={"text": "Rechnung über 100 €"}
+        )
+
+        request = route.calls.last.request
+        assert "Rechnung über 100 €".encode("utf-8") in request.content
+        assert json.loads(request.content)["result"]["text"] == "Rechnung über 100 €"
+        assert request.headers["X-Webhook-Signature"] == hmac.new(
+            b"test-secret", request.content, hashlib.sha256
+        ).hexdigest()
+
+    async def test_large_payload_signed_off_event_loop(self, backend):
+        """Test large payloads are signed in a thread and small ones inline"""
+        client = WebhookClient("http://backend:8000", "secret", transport=backend.transport)
+
+        with patch('app.webhook_client.asyncio.to_thread', wraps=asyncio.to_thread) as to_thread:
+            await client.send_webhook(
+                task_id="task-123",
+                document_id="doc-456",
+                status="completed",
+                result={"text": "short"}
+            )
+            to_thread.assert_not_called()
+
+            await client.send_webhook(
+                task_id="task-123",
+                document_id="doc-456",
+                status="completed",
+                result={"text": "x" * WebhookClient.THREADED_SIGNATURE_BYTES}
+            )
+            to_thread.assert_called_once()
+
+        request = backend.calls.last.request
+        assert request.headers["X-Webhook-Signature"] == client._generate_signature(request.content)
+        await client.aclose()
+
+    async def test_serialized_payload_same_with_and_without_orjson(self):
+        """Test the orjson and json fallback paths produce identical bodies"""
+        payload = {
+            "task_id": "task-123",
+            "status": "completed",
+            "result": {"text": "Rechnung über 100 €", "confidence": 95.5, "pages": [1, 2]},
+        }
+
+        fast = WebhookClient._serialize_payload(payload)
+        with patch('app.webhook_client.ORJSON_AVAILABLE', False):
+            fallback = WebhookClient._serialize_payload(payload)
+
+        assert fast == fallback
+        assert json.loads(fast) == payload
+
+    async def test_webhook_body_serialized_with_orjson(self, backend):
+        """Test send_webhook serializes the body with orjson when installed"""
+        orjson = pytest.importorskip("orjson")
+        client = WebhookClient("http://backend:8000", "secret", transport=backend.transport)
+
+        with patch('app.webhook_client.orjson.dumps', wraps=orjson.dumps) as dumps:
+            await client.send_webhook(
+                task_id="task-123",
+                document_id="doc-456",
+                status="completed",
+                result={"text": "content"}
+            )
+
+        dumps.assert_called_once()
+        assert json.loads(backend.calls.last.request.content)["result"] == {"text": "content"}
+        await client.aclose()
+
+    async def test_webhook_delivery_with_timeout(self, backend):
         """Test webhook delivery handles timeout errors and retries"""
-        route = respx.post("http://backend:8000/api/webhooks/ocr/callback").mock(
+        route = backend.mock(
             side_effect=httpx.TimeoutException("Request timeout")
         )
 
-        client = WebhookClient("http://backend:8000", "secret", timeout=1, max_retries=2)
+        client = WebhookClient(
+            "http://backend:8000", "secret", timeout=1, max_retries=2, transport=backend.transport
+        )
 
         with patch('asyncio.sleep'):
             with pytest.raises(WebhookDeliveryError, match="after 2 retries"):
@@ -374,14 +544,13 @@ class TestWebhookDelivery:
         # Should retry: initial + 2 retries = 3 attempts
         assert route.call_count == 3
 
-    @respx.mock
-    async def test_webhook_delivery_with_connection_error(self):
+    async def test_webhook_delivery_with_connection_error(self, backend):
         """Test webhook delivery handles connection errors and retries"""
-        route = respx.post("http://backend:8000/api/webhooks/ocr/callback").mock(
+        route = backend.mock(
             side_effect=httpx.ConnectError("Connection refused")
         )
 
-        client = WebhookClient("http://backend:8000", "secret", max_retries=2)
+        client = WebhookClient("http://backend:8000", "secret", max_retries=2, transport=backend.transport)
 
         with patch('asyncio.sleep'):
             with pytest.raises(WebhookDeliveryError, match="after 2 retries"):
@@ -395,16 +564,15 @@ class TestWebhookDelivery:
         # Should retry: initial + 2 retries = 3 attempts
         assert route.call_count == 3
 
-    @respx.mock
-    async def test_webhook_delivery_with_4xx_error(self):
+    async def test_webhook_delivery_with_4xx_error(self, backend):
         """Test webhook delivery handles 4xx client errors"""
-        respx.post("http://backend:8000/api/webhooks/ocr/callback").mock(
+        backend.mock(
             return_value=httpx.Response(400, json={
                 "error": "Invalid payload"
             })
         )
 
-        client = WebhookClient("http://backend:8000", "secret")
+        client = WebhookClient("http://backend:8000", "secret", transport=backend.transport)
 
         with pytest.raises(WebhookDeliveryError, match="400"):
             await client.send_webhook(
@@ -414,16 +582,15 @@ class TestWebhookDelivery:
                 result={"text": "content"}
             )
 
-    @respx.mock
-    async def test_webhook_delivery_with_5xx_error(self):
+    async def test_webhook_delivery_with_5xx_error(self, backend):
         """Test webhook delivery handles 5xx server errors and retries"""
-        route = respx.post("http://backend:8000/api/webhooks/ocr/callback").mock(
+        route = backend.mock(
             return_value=httpx.Response(500, json={
                 "error": "Internal server error"
             })
         )
 
-        client = WebhookClient("http://backend:8000", "secret", max_retries=2)
+        client = WebhookClient("http://backend:8000", "secret", max_retries=2, transport=backend.transport)
 
         with patch('asyncio.sleep'):
             with pytest.raises(WebhookDeliveryError, match="after 2 retries"):
@@ -442,18 +609,17 @@ class TestWebhookDelivery:
 class TestWebhookRetryLogic:
     """Test webhook retry logic with exponential backoff"""
 
-    @respx.mock
-    async def test_retries_on_failure_with_exponential_backoff(self):
+    async def test_retries_on_failure_with_exponential_backoff(self, backend):
         """Test that client retries failed requests with exponential backoff"""
         # First two attempts fail, third succeeds
-        route = respx.post("http://backend:8000/api/webhooks/ocr/callback")
+        route = backend
         route.side_effect = [
             httpx.Response(500, json={"error": "Server error"}),
             httpx.Response(500, json={"error": "Server error"}),
             httpx.Response(200, json={"message": "Success"})
         ]
 
-        client = WebhookClient("http://backend:8000", "secret", max_retries=3)
+        client = WebhookClient("http://backend:8000", "secret", max_retries=3, transport=backend.transport)
 
         with patch('asyncio.sleep') as mock_sleep:
             result = await client.send_webhook(
@@ -471,14 +637,13 @@ class TestWebhookRetryLogic:
         assert mock_sleep.call_args_list[0][0][0] == 1  # First retry: 1 second
         assert mock_sleep.call_args_list[1][0][0] == 5  # Second retry: 5 seconds
 
-    @respx.mock
-    async def test_retries_exhaust_after_max_attempts(self):
+    async def test_retries_exhaust_after_max_attempts(self, backend):
         """Test that retries stop after max_retries is reached"""
-        route = respx.post("http://backend:8000/api/webhooks/ocr/callback").mock(
+        route = backend.mock(
             return_value=httpx.Response(500, json={"error": "Server error"})
         )
 
-        client = WebhookClient("http://backend:8000", "secret", max_retries=3)
+        client = WebhookClient("http://backend:8000", "secret", max_retries=3, transport=backend.transport)
 
         with patch('asyncio.sleep'):
             with pytest.raises(WebhookDeliveryError, match="after 3 retries"):
@@ -492,14 +657,13 @@ class TestWebhookRetryLogic:
         # Should attempt: initial + 3 retries = 4 total
         assert route.call_count == 4
 
-    @respx.mock
-    async def test_does_not_retry_on_4xx_errors(self):
+    async def test_does_not_retry_on_4xx_errors(self, backend):
         """Test that 4xx errors are not retried (client errors are permanent)"""
-        route = respx.post("http://backend:8000/api/webhooks/ocr/callback").mock(
+        route = backend.mock(
             return_value=httpx.Response(400, json={"error": "Bad request"})
         )
 
-        client = WebhookClient("http://backend:8000", "secret", max_retries=3)
+        client = WebhookClient("http://backend:8000", "secret", max_retries=3, transport=backend.transport)
 
         with pytest.raises(WebhookDeliveryError):
             await client.send_webhook(
@@ -512,16 +676,52 @@ class TestWebhookRetryLogic:
         # Should only attempt once (no retries for 4xx)
         assert route.call_count == 1
 
-    @respx.mock
-    async def test_retries_on_timeout_errors(self):
+    async def test_any_2xx_counts_as_delivered(self, backend):
+        """Test that non-200 success codes are not retried"""
+        backend.mock(return_value=httpx.Response(204))
+
+        client = WebhookClient("http://backend:8000", "secret", max_retries=3, transport=backend.transport)
+
+        result = await client.send_webhook(
+            task_id="task-123",
+            document_id="doc-456",
+            status="completed",
+            result={"text": "content"}
+        )
+
+        assert result is True
+        assert backend.call_count == 1
+
+    async def test_unexpected_status_retried_with_backoff(self, backend):
+        """Test that codes outside 2xx/4xx/5xx are retried like 5xx"""
+        backend.side_effect = [
+            httpx.Response(302),
+            httpx.Response(600),
+            httpx.Response(200)
+        ]
+
+        client = WebhookClient("http://backend:8000", "secret", max_retries=3, transport=backend.transport)
+
+        with patch('asyncio.sleep') as mock_sleep:
+            result = await client.send_webhook(
+                task_id="task-123",
+                document_id="doc-456",
+                status="completed",
+                result={"text": "content"}
+            )
+
+        assert result is True
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [1, 5]
+
+    async def test_retries_on_timeout_errors(self, backend):
         """Test that timeout errors trigger retries"""
-        route = respx.post("http://backend:8000/api/webhooks/ocr/callback")
+        route = backend
         route.side_effect = [
             httpx.TimeoutException("Timeout"),
             httpx.Response(200, json={"message": "Success"})
         ]
 
-        client = WebhookClient("http://backend:8000", "secret", max_retries=3)
+        client = WebhookClient("http://backend:8000", "secret", max_retries=3, transport=backend.transport)
 
         with patch('asyncio.sleep'):
             result = await client.send_webhook(
@@ -534,10 +734,9 @@ class TestWebhookRetryLogic:
         assert result is True
         assert route.call_count == 2
 
-    @respx.mock
-    async def test_uses_correct_backoff_intervals(self):
+    async def test_uses_correct_backoff_intervals(self, backend):
         """Test that retry uses correct exponential backoff intervals: 1s, 5s, 15s"""
-        route = respx.post("http://backend:8000/api/webhooks/ocr/callback")
+        route = backend
         route.side_effect = [
             httpx.Response(500),
             httpx.Response(500),
@@ -545,7 +744,7 @@ class TestWebhookRetryLogic:
             httpx.Response(200, json={"message": "Success"})
         ]
 
-        client = WebhookClient("http://backend:8000", "secret", max_retries=3)
+        client = WebhookClient("http://backend:8000", "secret", max_retries=3, transport=backend.transport)
 
         with patch('asyncio.sleep') as mock_sleep:
             await client.send_webhook(
@@ -561,20 +760,284 @@ class TestWebhookRetryLogic:
         assert mock_sleep.call_args_list[1][0][0] == 5
         assert mock_sleep.call_args_list[2][0][0] == 15
 
+    async def test_backoff_schedule_extends_past_three_retries(self, backend):
+        """Test more than three retries follow the schedule and then repeat its last step"""
+        backend.mock(
+            return_value=httpx.Response(500)
+        )
+
+        client = WebhookClient("http://backend:8000", "secret", max_retries=7, transport=backend.transport)
+
+        with patch('asyncio.sleep') as mock_sleep:
+            with pytest.raises(WebhookDeliveryError, match="after 7 retries"):
+                await client.send_webhook(
+                    task_id="task-123",
+                    document_id="doc-456",
+                    status="completed",
+                    result={"text": "content"}
+                )
+
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [
+            1, 5, 15, 45, 135, 135, 135
+        ]
+
+
+@pytest.mark.asyncio
+class TestProgressCoalescing:
+    """Test coalesced progress delivery via send_progress"""
+
+    async def test_progress_coalesced_to_latest_per_task(self, backend):
+        """Only the latest queued progress per task is sent"""
+        client = WebhookClient(
+            "http://backend:8000", "secret", transport=backend.transport, progress_interval=60
+        )
+
+        for page in range(1, 11):
+            client.send_progress("task-123", "doc-456", page * 10, f"Page {page}/10")
+        client.send_progress("task-789", "doc-789", 5, "Converting")
+
+        await client.flush_progress()
+
+        payloads = [json.loads(call.request.content) for call in backend.calls]
+        assert [(p["task_id"], p["progress"]) for p in payloads] == [
+            ("task-123", 100), ("task-789", 5)
+        ]
+        assert payloads[0]["status"] == "processing"
+        assert payloads[0]["current_operation"] == "Page 10/10"
+        await client.aclose()
+
+    async def test_progress_delivered_in_background(self, backend):
+        """Queued progress is sent after the interval without an explicit flush"""
+        client = WebhookClient(
+            "http://backend:8000", "secret", transport=backend.transport, progress_interval=0.01
+        )
+
+        client.send_progress("task-123", "doc-456", 25, "Converting")
+        client.send_progress("task-123", "doc-456", 50, "OCR")
+        assert backend.call_count == 0
+
+        await client._progress_task
+
+        assert backend.call_count == 1
+        assert json.loads(backend.calls.last.request.content)["progress"] == 50
+        await client.aclose()
+
+    async def test_worker_dedupes_identical_progress_webhooks(self, backend):
+        """Repeating the last delivered progress for a task sends nothing"""
+        client = WebhookClient("http://backend:8000", "secret", transport=backend.transport)
+        progress = dict(task_id="task-123", document_id="doc-456", status="processing",
+                        progress=75, current_operation="Categorizing")
+
+        assert await client.send_webhook(**progress) is True
+        assert await client.send_webhook(**progress) is True
+        assert backend.call_count == 1
+
+        # Changed progress and terminal statuses are always sent
+        await client.send_webhook(**{**progress, "progress": 100})
+        await client.send_webhook(task_id="task-123", document_id="doc-456", status="completed")
+        await client.send_webhook(task_id="task-123", document_id="doc-456", status="completed")
+        assert backend.call_count == 4
+        assert client._last_progress == {}
+        await client.aclose()
+
+    async def test_undelivered_progress_is_not_deduped(self, backend):
+        """Progress whose delivery failed is sent again when repeated"""
+        backend.mock(side_effect=[httpx.Response(400), httpx.Response(200)])
+        client = WebhookClient("http://backend:8000", "secret", transport=backend.transport)
+
+        with pytest.raises(WebhookDeliveryError):
+            await client.send_webhook(task_id="task-123", document_id="doc-456",
+                                      status="processing", progress=50)
+        await client.send_webhook(task_id="task-123", document_id="doc-456",
+                                  status="processing", progress=50)
+
+        assert backend.call_count == 2
+        await client.aclose()
+
+    async def test_progress_delivered_after_terminal_is_not_remembered(self, backend):
+        """A terminal webhook sent during a progress POST clears the task for good"""
+        progress_posted = asyncio.Event()
+        release_progress = asyncio.Event()
+
+        async def slow_progress(request):
+            if json.loads(request.content)["status"] == "processing":
+                progress_posted.set()
+                await release_progress.wait()
+            return httpx.Response(200)
+
+        backend.side_effect = slow_progress
+        client = WebhookClient("http://backend:8000", "secret", transport=backend.transport)
+
+        progress = asyncio.create_task(client.send_webhook(
+            task_id="task-123", document_id="doc-456", status="processing",
+            progress=25, current_operation="Converting"
+        ))
+        await progress_posted.wait()
+        await client.send_webhook(task_id="task-123", document_id="doc-456", status="failed")
+        release_progress.set()
+        assert await progress is True
+
+        assert client._last_progress == {}
+        await client.aclose()
+
+    async def test_remembered_progress_is_bounded(self, backend):
+        """The least recently updated task is forgotten when the table is full"""
+        client = WebhookClient("http://backend:8000", "secret", transport=backend.transport)
+
+        with patch.object(WebhookClient, 'MAX_TRACKED_PROGRESS', 2):
+            for progress, task_id in enumerate(("task-1", "task-2", "task-1", "task-3")):
+                await client.send_webhook(task_id=task_id, document_id="doc", status="processing",
+                                          progress=progress)
+
+        assert list(client._last_progress) == ["task-1", "task-3"]
+        await client.aclose()
+
+    async def test_terminal_webhook_drops_pending_progress(self, backend):
+        """A completed webhook discards the task's pending progress instead of sending it"""
+        client = WebhookClient(
+            "http://backend:8000", "secret", transport=backend.transport, progress_interval=60
+        )
+
+        client.send_progress("task-123", "doc-456", 75, "Extracting metadata")
+        client.send_progress("task-789", "doc-789", 10, "Converting")
+        await client.send_webhook(
+            task_id="task-123",
+            document_id="doc-456",
+            status="completed",
+            result={"text": "content"}
+        )
+
+        statuses = [json.loads(call.request.content)["status"] for call in backend.calls]
+        assert statuses == ["completed"]
+        # Other tasks' progress stays queued
+        assert list(client._pending_progress) == [("task-789", "doc-789")]
+        await client.aclose()
+
+    async def test_terminal_webhook_not_delayed_by_failing_progress(self, backend):
+        """Queued progress is not retried against a failing backend before completed"""
+        backend.side_effect = [httpx.Response(200)]
+        client = WebhookClient(
+            "http://backend:8000", "secret", transport=backend.transport, progress_interval=60
+        )
+
+        client.send_progress("task-123", "doc-456", 75, "Extracting metadata")
+        with patch('asyncio.sleep') as mock_sleep:
+            await client.send_webhook(task_id="task-123", document_id="doc-456", status="completed")
+
+        mock_sleep.assert_not_called()
+        assert backend.call_count == 1
+        await client.aclose()
+
+    async def test_terminal_webhook_cancels_slow_progress_in_flight(self, backend):
+        """A progress POST still in flight never reaches the backend after completed"""
+        arrivals = []
+        progress_posted = asyncio.Event()
+
+        async def slow_progress(request):
+            payload = json.loads(request.content)
+            if payload["status"] == "processing":
+                progress_posted.set()
+                await asyncio.sleep(60)
+            arrivals.append((payload["status"], payload.get("progress")))
+            return httpx.Response(200)
+
+        backend.side_effect = slow_progress
+        client = WebhookClient(
+            "http://backend:8000", "secret", transport=backend.transport, progress_interval=0
+        )
+
+        client.send_progress("task-123", "doc-456", 25, "Converting")
+        await progress_posted.wait()
+        await client.send_webhook(task_id="task-123", document_id="doc-456", status="completed")
+        await asyncio.sleep(0)
+
+        assert arrivals == [("completed", None)]
+        assert client._progress_sends == {}
+        await client.aclose()
+
+    async def test_terminal_webhook_cancels_progress_retry_backoff(self, backend):
+        """A progress update waiting to retry is not sent after completed"""
+        backend.side_effect = [httpx.Response(503), httpx.Response(200), httpx.Response(200)]
+        client = WebhookClient(
+            "http://backend:8000", "secret", transport=backend.transport, progress_interval=0
+        )
+
+        client.send_progress("task-123", "doc-456", 25, "Converting")
+        while backend.call_count == 0:
+            await asyncio.sleep(0)
+        # Progress is now sleeping in its 1s retry backoff
+        await client.send_webhook(task_id="task-123", document_id="doc-456", status="completed")
+        await client._progress_task
+
+        statuses = [json.loads(call.request.content)["status"] for call in backend.calls]
+        assert statuses == ["processing", "completed"]
+        await client.aclose()
+
+    async def test_progress_failure_is_logged_not_raised(self, backend):
+        """A rejected progress update does not raise from flush_progress"""
+        backend.mock(return_value=httpx.Response(400))
+        client = WebhookClient(
+            "http://backend:8000", "secret", transport=backend.transport, progress_interval=60
+        )
+
+        client.send_progress("task-123", "doc-456", 25)
+        with patch('app.webhook_client.logger') as mock_logger:
+            await client.flush_progress()
+
+        assert backend.call_count == 1
+        assert "task-123" in str(mock_logger.warning.call_args)
+        await client.aclose()
+
+    async def test_unexpected_progress_error_is_logged(self, backend):
+        """An error other than a delivery failure is logged, not left on the task"""
+        client = WebhookClient(
+            "http://backend:8000", "secret", transport=backend.transport, progress_interval=60
+        )
+
+        client.send_progress("task-123", "doc-456", 25)
+        with patch.object(client, 'send_webhook', side_effect=RuntimeError("boom")), \
+                patch('app.webhook_client.logger') as mock_logger:
+            await client.flush_progress()
+
+        assert "task-123" in str(mock_logger.error.call_args)
+        assert isinstance(mock_logger.error.call_args.kwargs["exc_info"], RuntimeError)
+        await client.aclose()
+
+    async def test_pending_progress_is_bounded(self, backend):
+        """The oldest task's update is dropped when the buffer is full"""
+        client = WebhookClient(
+            "http://backend:8000", "secret", transport=backend.transport, progress_interval=60
+        )
+
+        with patch.object(WebhookClient, 'MAX_PENDING_PROGRESS', 2):
+            for task in range(3):
+                client.send_progress(f"task-{task}", f"doc-{task}", 50)
+            # Updating a buffered task never drops another one
+            client.send_progress("task-2", "doc-2", 60)
+
+        assert list(client._pending_progress) == [("task-1", "doc-1"), ("task-2", "doc-2")]
+        await client.aclose()
+
+    async def test_send_progress_validates_range(self):
+        """Out-of-range progress is rejected when queued"""
+        client = WebhookClient("http://backend:8000", "secret")
+
+        with pytest.raises(ValueError, match="Progress must be between 0 and 100"):
+            client.send_progress("task-123", "doc-456", 101)
+
 
 @pytest.mark.asyncio
 class TestWebhookLogging:
     """Test webhook client logging"""
 
-    @respx.mock
-    async def test_logs_successful_delivery(self):
+    async def test_logs_successful_delivery(self, backend):
         """Test that successful deliveries are logged"""
-        respx.post("http://backend:8000/api/webhooks/ocr/callback").mock(
+        backend.mock(
             return_value=httpx.Response(200, json={"message": "OK"})
         )
 
         with patch('app.webhook_client.logger') as mock_logger:
-            client = WebhookClient("http://backend:8000", "secret")
+            client = WebhookClient("http://backend:8000", "secret", transport=backend.transport)
 
             await client.send_webhook(
                 task_id="task-123",
@@ -589,10 +1052,9 @@ class TestWebhookLogging:
             assert "task-123" in call_args
             assert "doc-456" in call_args
 
-    @respx.mock
-    async def test_logs_retry_attempts(self):
+    async def test_logs_retry_attempts(self, backend):
         """Test that retry attempts are logged"""
-        route = respx.post("http://backend:8000/api/webhooks/ocr/callback")
+        route = backend
         route.side_effect = [
             httpx.Response(500),
             httpx.Response(200, json={"message": "OK"})
@@ -600,7 +1062,7 @@ class TestWebhookLogging:
 
         with patch('app.webhook_client.logger') as mock_logger:
             with patch('asyncio.sleep'):
-                client = WebhookClient("http://backend:8000", "secret", max_retries=3)
+                client = WebhookClient("http://backend:8000", "secret", max_retries=3, transport=backend.transport)
 
                 await client.send_webhook(
                     task_id="task-123",
@@ -614,16 +1076,15 @@ class TestWebhookLogging:
                 call_args = str(mock_logger.warning.call_args_list)
                 assert "retry" in call_args.lower()
 
-    @respx.mock
-    async def test_logs_final_failure(self):
+    async def test_logs_final_failure(self, backend):
         """Test that final failures are logged as errors"""
-        respx.post("http://backend:8000/api/webhooks/ocr/callback").mock(
+        backend.mock(
             return_value=httpx.Response(500, json={"error": "Server error"})
         )
 
         with patch('app.webhook_client.logger') as mock_logger:
             with patch('asyncio.sleep'):
-                client = WebhookClient("http://backend:8000", "secret", max_retries=2)
+                client = WebhookClient("http://backend:8000", "secret", max_retries=2, transport=backend.transport)
 
                 with pytest.raises(WebhookDeliveryError):
                     await client.send_webhook(
@@ -660,15 +1121,103 @@ class TestWebhookClientContextManager:
         # HTTP client should be closed after context exit
         assert http_client.is_closed
 
+    @pytest.mark.asyncio
+    async def test_http_client_reused_across_webhooks_and_retries(self, backend):
+        """Test every request goes through one pooled HTTP client until closed"""
+        backend.mock(side_effect=[
+            httpx.Response(500),
+            httpx.Response(200),
+            httpx.Response(200),
+        ])
+        client = WebhookClient("http://backend:8000", "secret", transport=backend.transport)
+
+        with patch('asyncio.sleep'):
+            await client.send_webhook(task_id="task-1", document_id="doc-1", status="completed")
+        http_client = client._http_client
+        await client.send_webhook(task_id="task-2", document_id="doc-2", status="completed")
+
+        assert client._http_client is http_client
+
+        await client.aclose()
+        assert http_client.is_closed
+        assert client._get_http_client() is not http_client
+        await client.aclose()
+
+
+    @pytest.mark.asyncio
+    async def test_webhook_client_respects_concurrency_limit(self):
+        """Test no more than max_concurrency requests are in flight at once"""
+        in_flight = 0
+        peak = 0
+
+        async def slow_backend(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200)
+
+        client = WebhookClient(
+            "http://backend:8000",
+            "secret",
+            transport=httpx.MockTransport(slow_backend),
+            max_concurrency=5
+        )
+
+        results = await asyncio.gather(*(
+            client.send_webhook(
+                task_id=f"task-{i}",
+                document_id=f"doc-{i}",
+                status="completed",
+                result={"text": "content"}
+            )
+            for i in range(100)
+        ))
+
+        assert all(results)
+        assert peak == 5
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_injected_http_client_shared_and_left_open(self, backend):
+        """Test webhook clients can share a caller-owned connection pool"""
+        async with httpx.AsyncClient(transport=backend.transport) as http_client:
+            first = WebhookClient("http://backend:8000", "secret", http_client=http_client)
+            second = WebhookClient("http://backend:8000", "other-secret", http_client=http_client)
+
+            for client in (first, second):
+                await client.send_webhook(
+                    task_id="task-123",
+                    document_id="doc-456",
+                    status="completed",
+                    result={"text": "content"}
+                )
+                assert client._get_http_client() is http_client
+                await client.aclose()
+
+            assert backend.call_count == 2
+            assert not http_client.is_closed
+
 
 class TestWebhookClientConfiguration:
     """Test webhook client configuration from environment"""
 
+    @pytest.fixture(autouse=True)
+    def fresh_env_config(self):
+        """Re-read the patched environment in every test"""
+        _load_env_config.cache_clear()
+        yield
+        _load_env_config.cache_clear()
+
     @patch.dict('os.environ', {
         'BACKEND_URL': 'http://custom-backend:9000',
         'OCR_WEBHOOK_SECRET': 'env-secret-key',
         'WEBHOOK_TIMEOUT': '60',
-        'WEBHOOK_MAX_RETRIES': '5'
+        'WEBHOOK_MAX_RETRIES': '5',
+        'WEBHOOK_SIGNATURE_FORMAT': 'b64',
+        'WEBHOOK_PROGRESS_INTERVAL': '2.5',
+        'WEBHOOK_MAX_CONCURRENCY': '8'
     })
     def test_client_loads_config_from_environment(self):
         """Test that client can load configuration from environment variables"""
@@ -678,9 +1227,42 @@ class TestWebhookClientConfiguration:
         assert client.webhook_secret == "env-secret-key"
         assert client.timeout == 60
         assert client.max_retries == 5
+        assert client.signature_format == "b64"
+        assert client.progress_interval == 2.5
+        assert client.max_concurrency == 8
+
+    @patch.dict('os.environ', {
+        'BACKEND_URL': 'http://custom-backend:9000',
+        'OCR_WEBHOOK_SECRET': 'env-secret-key'
+    }, clear=True)
+    def test_client_uses_defaults_for_optional_env_vars(self):
+        """Test optional settings fall back to the client defaults"""
+        client = WebhookClient.from_env()
+
+        assert client.max_retries == 3
+        assert client.timeout == 30
+        assert client.signature_format == "hex"
+        assert client.progress_interval == WebhookClient.PROGRESS_INTERVAL
+        assert client.max_concurrency == WebhookClient.MAX_CONCURRENCY
 
     @patch.dict('os.environ', {}, clear=True)
     def test_client_raises_error_if_env_vars_missing(self):
         """Test that client raises error if required env vars are missing"""
         with pytest.raises(ValueError, match="BACKEND_URL"):
             WebhookClient.from_env()
+
+    @patch.dict('os.environ', {
+        'BACKEND_URL': 'http://custom-backend:9000',
+        'OCR_WEBHOOK_SECRET': 'env-secret-key'
+    })
+    def test_environment_parsed_once(self):
+        """Test later clients reuse the parsed environment until the cache is cleared"""
+        first = WebhookClient.from_env()
+
+        with patch.dict('os.environ', {'BACKEND_URL': 'http://other-backend:9000'}):
+            second = WebhookClient.from_env()
+            assert second.backend_url == first.backend_url == "http://custom-backend:9000"
+            assert second is not first
+
+            _load_env_config.cache_clear()
+            assert WebhookClient.from_env().backend_url == "http://other-backend:9000"
@@ -5,10 +5,42 @@ Tests that worker sends progress webhooks at key milestones during processing
 import pytest
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 import io
+import threading
 from PIL import Image
 
 from app.worker import OCRWorker
 from app.models import TaskStatus, OCRResult
+from tests.webhook_mocks import StubWebhookClient
+
+
+# Page images shared by every test; the worker only reads them
+_TEST_IMAGES = [Image.new('RGB', (100, 100), color='white') for _ in range(4)]
+
+
+def _progress_calls(webhook_client, progress=None, low=None, high=None):
+    """
+    Progress updates queued on the webhook client, in order
+
+    Args:
+        webhook_client: StubWebhookClient
+        progress: Only updates with exactly this progress
+        low: Only updates with progress >= low
+        high: Only updates with progress <= high
+
+    Returns:
+        Keyword arguments of the matching send_progress calls
+    """
+    updates = []
+    for update in webhook_client.progress:
+        value = update.get('progress')
+        if progress is not None and value != progress:
+            continue
+        if low is not None and (value is None or value < low):
+            continue
+        if high is not None and (value is None or value > high):
+            continue
+        updates.append(update)
+    return updates
 
 
 class TestWorkerProgressWebhooks:
@@ -24,33 +56,25 @@ class TestWorkerProgressWebhooks:
         manager.store_result = AsyncMock()
         manager.redis = AsyncMock()
         manager.redis.hgetall = AsyncMock(return_value={
-            b"language": b"eng",
-            b"document_id": b"doc-123"
+            "language": "eng",
+            "document_id": "doc-123"
         })
         return manager
 
     @pytest.fixture
     def mock_webhook_client(self):
-        """Create mock webhook client"""
-        client = AsyncMock()
-        client.send_webhook = AsyncMock(return_value=True)
-        return client
+        """Create webhook client stub recording sent webhooks"""
+        return StubWebhookClient()
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_document_processor(self):
-        """Create mock document processor"""
+        """Create mock document processor, shared by the module's tests"""
         processor = Mock()
         # Create a simple mock document with 4 pages
         mock_doc = Mock()
         mock_doc.page_count = 4
         mock_doc.dpi = 300
-
-        # Create 4 simple test images
-        images = []
-        for _ in range(4):
-            img = Image.new('RGB', (100, 100), color='white')
-            images.append(img)
-        mock_doc.images = images
+        mock_doc.images = _TEST_IMAGES
 
         # Add native_text for PDFs (empty means OCR will be used)
         mock_doc.native_text = []
@@ -58,9 +82,9 @@ class TestWorkerProgressWebhooks:
         processor.process = Mock(return_value=mock_doc)
         return processor
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_ocr_service(self):
-        """Create mock OCR service"""
+        """Create mock OCR service, shared by the module's tests"""
         service = Mock()
         mock_result = Mock()
         mock_result.text = "Sample OCR text"
@@ -94,13 +118,10 @@ class TestWorkerProgressWebhooks:
                         await worker._process_task("task-123")
 
                 # Verify progress webhook was sent at 25%
-                progress_calls = [
-                    call for call in mock_webhook_client.send_webhook.call_args_list
-                    if call[1].get('progress') == 25 and call[1].get('status') == 'processing'
-                ]
+                progress_calls = _progress_calls(mock_webhook_client, progress=25)
 
                 assert len(progress_calls) >= 1, "Worker should send progress webhook at 25%"
-                call_kwargs = progress_calls[0][1]
+                call_kwargs = progress_calls[0]
                 assert call_kwargs['task_id'] == "task-123"
                 assert call_kwargs['document_id'] == "doc-123"
                 assert 'current_operation' in call_kwargs
@@ -130,13 +151,16 @@ class TestWorkerProgressWebhooks:
                         await worker._process_task("task-123")
 
                 # Check if any progress webhook was sent around 50%
-                progress_calls = [
-                    call for call in mock_webhook_client.send_webhook.call_args_list
-                    if call[1].get('status') == 'processing' and
-                       45 <= call[1].get('progress', 0) <= 55
-                ]
+                progress_calls = _progress_calls(mock_webhook_client, low=45, high=55)
 
                 assert len(progress_calls) >= 1, "Worker should send progress webhook around 50%"
+                assert progress_calls[0]['current_operation'] == "Performing OCR on page 2/4"
+
+                # The task hash keeps the per-page status message
+                mock_redis_manager.update_task_progress.assert_any_call(
+                    "task-123", 50, "Processed page 2/4",
+                    record_history=True, operation="Performing OCR on page 2/4"
+                )
 
     @pytest.mark.asyncio
     async def test_worker_sends_progress_webhook_at_75_percent(
@@ -164,10 +188,7 @@ class TestWorkerProgressWebhooks:
                         await worker._process_task("task-123")
 
                 # Check for progress webhook at 75%
-                progress_calls = [
-                    call for call in mock_webhook_client.send_webhook.call_args_list
-                    if call[1].get('progress') == 75 and call[1].get('status') == 'processing'
-                ]
+                progress_calls = _progress_calls(mock_webhook_client, progress=75)
 
                 assert len(progress_calls) >= 1, "Worker should send progress webhook at 75%"
 
@@ -197,16 +218,19 @@ class TestWorkerProgressWebhooks:
 
                 # Verify completion webhook was sent
                 completion_calls = [
-                    call for call in mock_webhook_client.send_webhook.call_args_list
-                    if call[1].get('status') == 'completed'
+                    sent for sent in mock_webhook_client.sent
+                    if sent.get('status') == 'completed'
                 ]
 
                 assert len(completion_calls) == 1, "Worker should send completion webhook"
-                call_kwargs = completion_calls[0][1]
+                call_kwargs = completion_calls[0]
                 assert call_kwargs['task_id'] == "task-123"
                 assert call_kwargs['document_id'] == "doc-123"
                 assert 'result' in call_kwargs
 
+                # The task hash is read once and reused for every webhook
+                assert mock_redis_manager.redis.hgetall.await_count == 1
+
     @pytest.mark.asyncio
     async def test_worker_sends_progress_webhooks_in_order(
         self,
@@ -234,9 +258,7 @@ class TestWorkerProgressWebhooks:
 
                 # Extract all progress values from webhook calls
                 progress_values = [
-                    call[1].get('progress')
-                    for call in mock_webhook_client.send_webhook.call_args_list
-                    if call[1].get('status') == 'processing' and call[1].get('progress') is not None
+                    update['progress'] for update in _progress_calls(mock_webhook_client, low=0)
                 ]
 
                 # Verify progress values are in ascending order
@@ -272,17 +294,14 @@ class TestWorkerProgressWebhooks:
                         await worker._process_task("task-123")
 
                 # Check that all progress webhooks include current_operation
-                progress_calls = [
-                    call for call in mock_webhook_client.send_webhook.call_args_list
-                    if call[1].get('status') == 'processing'
-                ]
+                progress_calls = _progress_calls(mock_webhook_client)
 
-                for call in progress_calls:
-                    assert 'current_operation' in call[1], \
+                for update in progress_calls:
+                    assert 'current_operation' in update, \
                         "All progress webhooks should include current_operation"
-                    assert call[1]['current_operation'] is not None, \
+                    assert update['current_operation'] is not None, \
                         "current_operation should not be None"
-                    assert len(call[1]['current_operation']) > 0, \
+                    assert len(update['current_operation']) > 0, \
                         "current_operation should be descriptive"
 
     @pytest.mark.asyncio
@@ -293,8 +312,7 @@ class TestWorkerProgressWebhooks:
         mock_ocr_service
     ):
         """Test worker continues processing even if progress webhooks fail"""
-        failing_webhook_client = AsyncMock()
-        failing_webhook_client.send_webhook = AsyncMock(side_effect=Exception("Webhook failed"))
+        failing_webhook_client = StubWebhookClient(error=Exception("Webhook failed"))
 
         with patch('app.worker.get_redis_queue_manager', return_value=mock_redis_manager):
             with patch('app.worker.WebhookClient') as mock_webhook_class:
@@ -314,3 +332,94 @@ class TestWorkerProgressWebhooks:
 
                 # Verify result was still stored despite webhook failures
                 mock_redis_manager.store_result.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_worker_ocr_pages_run_concurrently(
+        self,
+        mock_redis_manager,
+        mock_webhook_client,
+        mock_document_processor
+    ):
+        """Test pages are OCRed in parallel threads and results keep page order"""
+        # Each page blocks until a second page is being OCRed alongside it,
+        # which can only happen if pages run concurrently
+        barrier = threading.Barrier(2, timeout=5)
+        page_counter = iter(range(1, 5))
+        lock = threading.Lock()
+
+        def extract_text(*args, **kwargs):
+            with lock:
+                page = next(page_counter)
+            barrier.wait()
+            result = Mock()
+            result.text = f"Page {page}"
+            result.confidence = 90.0
+            return result
+
+        # Own OCR service, so the shared fixture is left untouched
+        ocr_service = Mock()
+        ocr_service.extract_text = Mock(side_effect=extract_text)
+
+        with patch('app.worker.get_redis_queue_manager', return_value=mock_redis_manager):
+            with patch('app.worker.WebhookClient') as mock_webhook_class:
+                mock_webhook_class.from_env.return_value = mock_webhook_client
+
+                worker = OCRWorker(redis_url="redis://localhost", poll_interval=1.0, page_concurrency=2)
+                worker.document_processor = mock_document_processor
+                worker.ocr_service = ocr_service
+                worker.webhook_client = mock_webhook_client
+                worker.metadata_extractor = None
+                worker.document_categorizer = None
+
+                with patch('os.path.exists', return_value=True):
+                    with patch('builtins.open', create=True):
+                        await worker._process_task("task-123")
+
+                assert ocr_service.extract_text.call_count == 4
+                result = mock_redis_manager.store_result.call_args[0][1]
+                assert [page["page"] for page in result.pages] == [1, 2, 3, 4]
+
+                # Progress still climbs monotonically as pages finish
+                page_progress = [
+                    call[0][1] for call in mock_redis_manager.update_task_progress.call_args_list
+                    if call[0][2].startswith("Processed page")
+                ]
+                assert page_progress == [37, 50, 62, 75]
+
+    @pytest.mark.asyncio
+    async def test_worker_records_each_milestone_in_one_redis_call(
+        self,
+        mock_redis_manager,
+        mock_webhook_client,
+        mock_document_processor,
+        mock_ocr_service
+    ):
+        """Test progress updates are pipelined instead of status + history writes"""
+        with patch('app.worker.get_redis_queue_manager', return_value=mock_redis_manager):
+            with patch('app.worker.WebhookClient') as mock_webhook_class:
+                mock_webhook_class.from_env.return_value = mock_webhook_client
+
+                worker = OCRWorker(redis_url="redis://localhost", poll_interval=1.0)
+                worker.document_processor = mock_document_processor
+                worker.ocr_service = mock_ocr_service
+                worker.webhook_client = mock_webhook_client
+                worker.metadata_extractor = Mock()
+                worker.metadata_extractor.extract = Mock(return_value={})
+                worker.document_categorizer = None
+
+                with patch('os.path.exists', return_value=True):
+                    with patch('builtins.open', create=True):
+                        await worker._process_task("task-123")
+
+                # Only the initial transition to PROCESSING checks the task exists
+                mock_redis_manager.update_task_status.assert_called_once()
+                mock_redis_manager.record_progress_update.assert_not_called()
+
+                # Every webhook milestone recorded its history in the same call
+                milestones = [
+                    call[0][1]
+                    for call in mock_redis_manager.update_task_progress.call_args_list
+                    if call[1].get('record_history')
+                ]
+                sent = [update['progress'] for update in _progress_calls(mock_webhook_client)]
+                assert milestones == sent == [25, 50, 75]
@@ -0,0 +1,119 @@
+"""
+Mock webhook backend for WebhookClient tests
+"""
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import httpx
+
+
+WEBHOOK_CALLBACK_URL = "http://backend:8000/api/webhooks/ocr/callback"
+
+
+class MockCall(NamedTuple):
+    """A request received by MockBackend and the response it produced"""
+    request: httpx.Request
+    response: Optional[httpx.Response]
+
+
+class MockCalls(list):
+    """Recorded calls, with the most recent one as .last"""
+
+    @property
+    def last(self) -> MockCall:
+        return self[-1]
+
+
+class MockBackend:
+    """
+    Webhook callback endpoint served through httpx.MockTransport
+
+    Pass .transport to WebhookClient(transport=...) so requests never touch
+    the network and no global patching of httpx is needed. Mirrors the bits
+    of a respx route the tests relied on: mock(return_value=, side_effect=),
+    side_effect (a response, an exception, a list of either, or a callable
+    taking the request), called, call_count and calls.last.request.
+    Requests to any other method or URL get a 404.
+    """
+
+    def __init__(self, url: str = WEBHOOK_CALLBACK_URL, method: str = "POST"):
+        self.url = url
+        self.method = method
+        self.return_value: Optional[httpx.Response] = None
+        self._side_effect = None
+        self.calls: List[MockCall] = MockCalls()
+        self.transport = httpx.MockTransport(self._handle)
+
+    def mock(self, return_value=None, side_effect=None) -> 'MockBackend':
+        """Set the response or side effect and return the backend, like respx"""
+        self.return_value = return_value
+        self.side_effect = side_effect
+        return self
+
+    @property
+    def side_effect(self):
+        return self._side_effect
+
+    @side_effect.setter
+    def side_effect(self, value):
+        # Lists are consumed one item per request
+        self._side_effect = iter(value) if isinstance(value, (list, tuple)) else value
+
+    @property
+    def called(self) -> bool:
+        return bool(self.calls)
+
+    @property
+    def call_count(self) -> int:
+        return len(self.calls)
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        if request.method != self.method or str(request.url) != self.url:
+            response = httpx.Response(404)
+            self.calls.append(MockCall(request, response))
+            return response
+
+        effect = self._side_effect
+        if effect is None:
+            effect = self.return_value or httpx.Response(200)
+        elif hasattr(effect, '__next__'):
+            effect = next(effect)
+        elif callable(effect) and not isinstance(effect, type):
+            effect = effect(request)
+
+        if isinstance(effect, BaseException) or (
+            isinstance(effect, type) and issubclass(effect, BaseException)
+        ):
+            self.calls.append(MockCall(request, None))
+            raise effect
+
+        self.calls.append(MockCall(request, effect))
+        return effect
+
+
+class StubWebhookClient:
+    """
+    Recording stand-in for WebhookClient in worker tests
+
+    Keeps the keyword arguments of every send_webhook() and send_progress()
+    call in .sent and .progress, in call order. With error set, both raise
+    it instead, like a client whose backend is unreachable.
+    """
+
+    def __init__(self, error: Optional[BaseException] = None):
+        self.error = error
+        self.sent: List[Dict[str, Any]] = []
+        self.progress: List[Dict[str, Any]] = []
+
+    async def send_webhook(self, **kwargs) -> bool:
+        if self.error is not None:
+            raise self.error
+        self.sent.append(kwargs)
+        return True
+
+    def send_progress(self, **kwargs) -> None:
+        if self.error is not None:
+            raise self.error
+        self.progress.append(kwargs)
+
+    async def aclose(self):
+        pass